@@ -0,0 +1,48 @@
+"""Micro-benchmark of validating the inputs of a ``BlockRunData`` payload one
+value at a time versus in a single batched pydantic-core call.
+
+    python benchmarks/batched_inputs.py
+"""
+
+import timeit
+
+from smartspace.blocks.lists import CreateList
+from smartspace.models import BlockRunData
+
+
+def _payload(input_count: int) -> BlockRunData:
+    return BlockRunData.model_validate(
+        {
+            "name": "CreateList",
+            "version": "1.0.0",
+            "function": "build",
+            "context": None,
+            "state": None,
+            "dynamic_ports": None,
+            "dynamic_output_pins": None,
+            "dynamic_input_pins": None,
+            "inputs": [
+                {"target": {"port": "build", "pin": f"items.{i}"}, "value": i}
+                for i in range(input_count)
+            ],
+        }
+    )
+
+
+def main():
+    for input_count in (10, 100, 1000):
+        inputs = _payload(input_count).inputs
+        for batched in (False, True):
+
+            def run():
+                CreateList()._set_inputs(inputs, batched=batched)
+
+            timer = timeit.Timer(run)
+            number, _ = timer.autorange()
+            best = min(timer.repeat(number=number, repeat=5)) / number
+            mode = "batched" if batched else "per-value"
+            print(f"{input_count:>5} inputs, {mode:>9}: {best * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Micro-benchmark of constructing a block and calling ``_load()`` with many
+inputs, as every ``run_block`` request does.
+
+    python benchmarks/block_load.py [input_count]
+"""
+
+import sys
+import timeit
+
+from smartspace.blocks.lists import CreateList
+from smartspace.models import BlockPinRef, InputValue
+
+
+def main(input_count: int = 50):
+    inputs = [
+        InputValue(target=BlockPinRef(port="build", pin=f"items.{i}"), value=i)
+        for i in range(input_count)
+    ]
+
+    def run():
+        block = CreateList()
+        block._load(inputs=inputs)
+
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(number=number, repeat=5)) / number
+    print(f"CreateList() + _load() with {input_count} inputs: {best * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
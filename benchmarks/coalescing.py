@@ -0,0 +1,52 @@
+"""End-to-end cost of running ForEach over N items through BlockFunctionCall,
+dumping every message as the debug CLI does, with and without output
+coalescing.
+
+    python benchmarks/coalescing.py [items]
+"""
+
+import asyncio
+import sys
+import time
+
+from smartspace.blocks.loops import ForEach
+from smartspace.core import MessageCoalescing
+from smartspace.models import BlockPinRef, InputValue
+
+
+async def _run(items: int, coalescing: MessageCoalescing | None) -> tuple[int, float]:
+    block = ForEach()
+    block._load(
+        inputs=[
+            InputValue(
+                target=BlockPinRef(port="foreach", pin="items"),
+                value=list(range(items)),
+            )
+        ]
+    )
+
+    start = time.perf_counter()
+    messages = [
+        m.model_dump(by_alias=True, mode="json")
+        async for m in await block._run_function("foreach", coalescing)
+    ]
+    elapsed = time.perf_counter() - start
+
+    assert sum(len(m["outputs"]) for m in messages) == items + 1
+    return len(messages), elapsed
+
+
+async def main(items: int):
+    await _run(100, None)
+
+    for name, coalescing in [
+        ("no coalescing", None),
+        ("coalescing (1000 outputs)", MessageCoalescing()),
+        ("coalescing (unbounded)", MessageCoalescing(max_outputs=items + 1)),
+    ]:
+        count, elapsed = await _run(items, coalescing)
+        print(f"{name:26s}: {count:6d} messages, {elapsed * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
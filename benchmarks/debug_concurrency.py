@@ -0,0 +1,76 @@
+"""Throughput of the debug CLI's run_block handling against a local stand-in
+debug server, for N invocations of a block that waits 50ms (as one calling an
+LLM or an HTTP API would), with different limits on the runs in flight.
+
+    python benchmarks/debug_concurrency.py [invocations]
+"""
+
+import asyncio
+import sys
+
+from pysignalr.client import SignalRClient
+
+from smartspace.cli.debug import DebugOptions, DebugProtocol, DebugRunner
+from smartspace.core import Block, BlockSet, step
+from smartspace.models import BlockPinRef, BlockRunData, InputValue
+from smartspace.tests.signalr_server import LocalSignalRServer
+
+
+class Wait(Block):
+    @step(output_name="waited")
+    async def wait(self, seconds: float) -> float:
+        await asyncio.sleep(seconds)
+        return seconds
+
+
+REQUEST = BlockRunData(
+    name="Wait",
+    version="1.0.0",
+    function="wait",
+    context=None,
+    state=None,
+    inputs=[InputValue(target=BlockPinRef(port="wait", pin="seconds"), value=0.05)],
+    dynamic_ports=None,
+    dynamic_output_pins=None,
+    dynamic_input_pins=None,
+).model_dump(by_alias=True, mode="json")
+
+
+async def _run(options: DebugOptions, invocations: int) -> float:
+    async with LocalSignalRServer() as server:
+        client = SignalRClient(server.url, protocol=DebugProtocol(), headers={})
+        runner = DebugRunner(client, options)
+        runner.block_set = BlockSet()
+        runner.block_set.add(Wait)
+        task = asyncio.ensure_future(client.run())
+
+        await server.connected.wait()
+        start = asyncio.get_running_loop().time()
+        invocation_ids = [
+            await server.invoke("run_block", [REQUEST]) for _ in range(invocations)
+        ]
+        await asyncio.gather(
+            *(server.completion(i, timeout=600) for i in invocation_ids)
+        )
+        elapsed = asyncio.get_running_loop().time() - start
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.1)
+
+    return elapsed
+
+
+async def main(invocations: int):
+    for name, options in [
+        ("serialized, no delay", DebugOptions(delay_after_run=0)),
+        ("10 in flight", DebugOptions(max_concurrent_runs=10, delay_after_run=0)),
+        ("100 in flight", DebugOptions(max_concurrent_runs=100, delay_after_run=0)),
+        ("no limit", DebugOptions(max_concurrent_runs=0, delay_after_run=0)),
+    ]:
+        elapsed = await _run(options, invocations)
+        print(f"{name:21s}: {elapsed:6.2f}s, {invocations / elapsed:7.1f} runs/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
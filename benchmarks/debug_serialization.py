@@ -0,0 +1,141 @@
+"""Time to serialize the run messages of a search/retrieval block into the
+SignalR CompletionMessage the debug CLI sends, for messages holding WebChunks
+and FileChunks:
+
+- model dumps: ``model_dump(by_alias=True, mode="json")`` of each
+  BlockRunMessage, encoded with the stdlib JSON encoder
+- record dumps: ``MessageRecord.dump()``, encoded with the stdlib JSON encoder
+- fragments: ``MessageRecord.dump_json()``, written as JSONFragments by
+  ``encode_json``
+
+    python benchmarks/debug_serialization.py [messages]
+"""
+
+import datetime
+import sys
+import time
+from typing import Any, Callable
+
+from pysignalr.messages import CompletionMessage
+from pysignalr.protocol.json import MessageEncoder
+
+from smartspace.cli.debug import DebugProtocol, JSONFragment
+from smartspace.core import MessageRecord, OutputRecord
+from smartspace.models import (
+    FileChunk,
+    FileChunks,
+    FileWithContent,
+    WebChunks,
+    WebDataChunk,
+    WebDataComplete,
+)
+
+
+def _web_chunks(i: int) -> WebChunks:
+    parent = WebDataComplete(
+        id=f"web-{i}",
+        url=f"https://example.com/articles/{i}",
+        title=f"Article {i}",
+        content="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 60,
+        snippet="Lorem ipsum dolor sit amet " * 6,
+        summary="Consectetur adipiscing elit " * 12,
+        metadata={"fetched_at": datetime.datetime(2024, 5, 1, 12), "rank": i},
+    )
+    return WebChunks(
+        parent=parent,
+        chunks=[
+            WebDataChunk(
+                index=j,
+                position=j * 400,
+                content="Lorem ipsum dolor sit amet, consectetur. " * 10,
+                name=parent.title,
+                parentInfo=parent.as_info(),
+            )
+            for j in range(8)
+        ],
+    )
+
+
+def _file_chunks(i: int) -> FileChunks:
+    parent = FileWithContent(
+        id=f"file-{i}", name=f"report-{i}.pdf", content="Quarterly numbers. " * 200
+    )
+    return FileChunks(
+        parent=parent,
+        chunks=[
+            FileChunk(
+                index=j,
+                position=j * 500,
+                content="Quarterly numbers. " * 25,
+                name=parent.name,
+                parentInfo=parent.as_info(),
+            )
+            for j in range(8)
+        ],
+    )
+
+
+def _records(count: int) -> list[MessageRecord]:
+    return [
+        MessageRecord(
+            outputs=[
+                OutputRecord("web", "", [_web_chunks(i * 5 + j) for j in range(5)]),
+                OutputRecord("files", "", [_file_chunks(i * 5 + j) for j in range(5)]),
+                OutputRecord("raw", "", b"raw bytes payload " * 20),
+            ]
+        )
+        for i in range(count)
+    ]
+
+
+def _stdlib(data: dict[str, Any]) -> bytes:
+    return MessageEncoder().encode(data).encode()
+
+
+def _time(fn: Callable[[], str], repeat: int = 5) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best, len(result)
+
+
+def main(count: int):
+    records = _records(count)
+    stdlib, fast = DebugProtocol(_stdlib), DebugProtocol()
+
+    for name, fn in [
+        (
+            "model dumps",
+            lambda: stdlib.encode(
+                CompletionMessage(
+                    "1",
+                    [
+                        r.to_message().model_dump(by_alias=True, mode="json")
+                        for r in records
+                    ],
+                )
+            ),
+        ),
+        (
+            "record dumps",
+            lambda: stdlib.encode(CompletionMessage("1", [r.dump() for r in records])),
+        ),
+        (
+            "fragments",
+            lambda: fast.encode(
+                CompletionMessage("1", [JSONFragment(r.dump_json()) for r in records])
+            ),
+        ),
+    ]:
+        elapsed, size = _time(fn)
+        print(
+            f"{name:13s}: {elapsed * 1000:7.1f}ms, "
+            f"{count / elapsed:8.0f} messages/s, {size / 1024 / 1024:6.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,75 @@
+"""Time to first message and total time of a run_block invocation against a
+local stand-in debug server, with completion and stream delivery, for a block
+that emits N tokens over about a second.
+
+    python benchmarks/debug_streaming.py [tokens]
+"""
+
+import asyncio
+import sys
+
+from pysignalr.client import SignalRClient
+
+from smartspace.cli.debug import DebugOptions, DebugProtocol, DebugRunner
+from smartspace.core import Block, BlockSet, OutputChannel, step
+from smartspace.models import BlockPinRef, BlockRunData, InputValue
+from smartspace.tests.signalr_server import LocalSignalRServer
+
+
+class Tokens(Block):
+    tokens: OutputChannel[str]
+
+    @step()
+    async def generate(self, count: int):
+        for i in range(count):
+            await asyncio.sleep(1 / count)
+            self.tokens.send(f"token {i} ")
+
+
+async def _run(options: DebugOptions, count: int):
+    request = BlockRunData(
+        name="Tokens",
+        version="1.0.0",
+        function="generate",
+        context=None,
+        state=None,
+        inputs=[
+            InputValue(target=BlockPinRef(port="generate", pin="count"), value=count)
+        ],
+        dynamic_ports=None,
+        dynamic_output_pins=None,
+        dynamic_input_pins=None,
+    ).model_dump(by_alias=True, mode="json")
+
+    async with LocalSignalRServer() as server:
+        client = SignalRClient(server.url, protocol=DebugProtocol(), headers={})
+        runner = DebugRunner(client, options)
+        runner.block_set = BlockSet()
+        runner.block_set.add(Tokens)
+        task = asyncio.ensure_future(client.run())
+
+        await server.connected.wait()
+        start = asyncio.get_running_loop().time()
+        invocation_id = await server.invoke("run_block", [request])
+        await server.completion(invocation_id, timeout=60)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.1)
+
+    received = [t for t, _ in server.messages(invocation_id)]
+    first, last = received[0] - start, received[-1] - start
+    name = "stream" if options.stream else "completion"
+    print(
+        f"{name:10s}: first message after {first * 1000:7.1f}ms, "
+        f"completed after {last * 1000:7.1f}ms, {len(received)} websocket messages"
+    )
+
+
+async def main(count: int):
+    for stream in (False, True):
+        await _run(DebugOptions(stream=stream, delay_after_run=0), count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100))
@@ -0,0 +1,60 @@
+"""Time to create the ports of a block with N dynamic ports, each with a dynamic
+output pin, and a step with N dynamic input pins.
+
+    python benchmarks/dynamic_pins.py [sizes...]
+"""
+
+import sys
+import time
+from typing import Any
+
+from smartspace.core import Block, Tool, step
+from smartspace.models import BlockPinRef
+
+
+class SendValues(Tool[..., None]):
+    def run(self, *values: Any) -> None: ...
+
+
+class ManyDynamicPins(Block):
+    tools: list[SendValues]
+
+    @step()
+    async def run(self, *values: Any): ...
+
+
+def _load(size: int) -> float:
+    dynamic_ports = [f"tools.{i}" for i in range(size)]
+    dynamic_output_pins = [
+        BlockPinRef(port=f"tools.{i}", pin="values.0") for i in range(size)
+    ]
+    dynamic_input_pins = [
+        BlockPinRef(port="run", pin=f"values.{i}") for i in range(size)
+    ]
+
+    start = time.perf_counter()
+    block = ManyDynamicPins()
+    block._load(
+        dynamic_ports=dynamic_ports,
+        dynamic_input_pins=dynamic_input_pins,
+        dynamic_output_pins=dynamic_output_pins,
+    )
+    elapsed = time.perf_counter() - start
+
+    assert len(block.tools) == size
+    return elapsed
+
+
+def main(sizes: list[int]):
+    _load(10)
+
+    for size in sizes:
+        elapsed = _load(size)
+        print(
+            f"{size:6d} dynamic ports: {elapsed * 1000:9.2f}ms "
+            f"({elapsed / size * 1e6:7.2f}us per port)"
+        )
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [10, 100, 1000, 10000])
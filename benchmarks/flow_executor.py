@@ -0,0 +1,106 @@
+"""Throughput of FlowExecutor on a fan-out flow: ForEach sends N items over a
+channel to a block that waits 10ms for each of them (as one calling an LLM or
+an HTTP API would), and to Collect, which gathers them. Shows the runs per
+second with different limits on the runs in flight, and where the time goes
+without the wait.
+
+    python benchmarks/flow_executor.py [items]
+"""
+
+import asyncio
+import cProfile
+import pstats
+import sys
+from typing import Annotated, Any
+
+from smartspace.blocks.loops import Collect, ForEach
+from smartspace.core import Block, BlockSet, Input, step
+from smartspace.flow_executor import FlowExecutor
+from smartspace.models import (
+    Connection,
+    FlowBlock,
+    FlowDefinition,
+    FlowInput,
+    FlowOutput,
+    FlowPinRef,
+)
+
+
+class Work(Block):
+    @step(output_name="done")
+    async def work(
+        self, item: Any, seconds: Annotated[float, Input(sticky=True)]
+    ) -> Any:
+        await asyncio.sleep(seconds)
+        return item
+
+
+def _connection(source: tuple, target: tuple) -> Connection:
+    fields = ("node", "port", "pin")
+    return Connection(
+        source=FlowPinRef(**dict(zip(fields, source))),
+        target=FlowPinRef(**dict(zip(fields, target))),
+    )
+
+
+FLOW = FlowDefinition(
+    inputs={
+        "items": FlowInput.from_type(list[Any]),
+        "seconds": FlowInput.from_type(float),
+    },
+    outputs={
+        "last": FlowOutput.from_type(Any),
+        "items": FlowOutput.from_type(list[Any]),
+    },
+    variables={},
+    constants={},
+    blocks={
+        "foreach": FlowBlock(name="ForEach", version="1.0.0"),
+        "work": FlowBlock(name="Work", version="1.0.0"),
+        "collect": FlowBlock(name="Collect", version="1.0.0"),
+    },
+    connections=[
+        _connection(("items",), ("foreach", "foreach", "items")),
+        _connection(("foreach", "item", ""), ("work", "work", "item")),
+        _connection(("seconds",), ("work", "work", "seconds")),
+        _connection(("work", "work", "done"), ("last",)),
+        _connection(("foreach", "item", ""), ("collect", "collect", "item")),
+        _connection(("collect", "items", ""), ("items",)),
+    ],
+)
+
+
+def _block_set() -> BlockSet:
+    block_set = BlockSet()
+    for block_type in (ForEach, Work, Collect):
+        block_set.add(block_type)
+
+    return block_set
+
+
+async def main(items: int):
+    inputs = {"items": list(range(items)), "seconds": 0.01}
+
+    for name, limit in [("100 in flight", 100), ("no limit", 0)]:
+        executor = FlowExecutor(FLOW, _block_set(), max_concurrent_runs=limit)
+        start = asyncio.get_running_loop().time()
+        result = await executor.run(inputs)
+        elapsed = asyncio.get_running_loop().time() - start
+        runs = sum(result.runs.values())
+        print(f"{name:13s}: {elapsed:6.2f}s, {runs / elapsed:8.1f} runs/s")
+
+    executor = FlowExecutor(FLOW, _block_set())
+    profile = cProfile.Profile()
+    profile.enable()
+    start = asyncio.get_running_loop().time()
+    result = await executor.run({**inputs, "seconds": 0})
+    elapsed = asyncio.get_running_loop().time() - start
+    profile.disable()
+
+    runs = sum(result.runs.values())
+    print(f"no wait      : {elapsed:6.2f}s, {runs / elapsed:8.1f} runs/s (profiled)")
+    pstats.Stats(profile).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,70 @@
+"""Throughput of full run_block cycles (instance, _load, run, collect messages)
+for hot stateless blocks, with a new instance per run and with the BlockSet
+instance pool.
+
+    python benchmarks/instance_pool.py [runs]
+"""
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+from smartspace.blocks.conditionals import If
+from smartspace.blocks.json_blocks import Get
+from smartspace.blocks.lists import Count, JoinStrings
+from smartspace.core import Block, BlockSet
+from smartspace.models import BlockPinRef, InputValue
+
+
+def _input(port: str, pin: str, value: Any) -> InputValue:
+    return InputValue(target=BlockPinRef(port=port, pin=pin), value=value)
+
+
+CASES: list[tuple[type[Block], str, list[InputValue]]] = [
+    (Get, "get", [_input("path", "", "$.a"), _input("get", "data", {"a": 1})]),
+    (
+        If,
+        "create_response",
+        [_input("condition", "", True), _input("create_response", "value", 1)],
+    ),
+    (Count, "count", [_input("count", "items", [1, 2, 3])]),
+    (
+        JoinStrings,
+        "join",
+        [_input("separator", "", ","), _input("join", "strings", ["a", "b"])],
+    ),
+]
+
+
+async def _run_many(
+    block_set: BlockSet, block_type: type[Block], function: str, inputs, runs: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        with block_set.instance(block_type) as block:
+            block._load(inputs=inputs)
+            [m async for m in await block._run_function(function)]
+
+    return time.perf_counter() - start
+
+
+async def main(runs: int):
+    for block_type, function, inputs in CASES:
+        block_set = BlockSet()
+        block_set.add(block_type)
+        await _run_many(block_set, block_type, function, inputs, 100)
+        fresh = await _run_many(block_set, block_type, function, inputs, runs)
+
+        block_set.enable_instance_pool()
+        await _run_many(block_set, block_type, function, inputs, 100)
+        pooled = await _run_many(block_set, block_type, function, inputs, runs)
+
+        print(
+            f"{block_type.name:>12}: new instance {runs / fresh:8.0f} runs/s, "
+            f"pooled {runs / pooled:8.0f} runs/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
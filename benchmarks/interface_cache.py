@@ -0,0 +1,62 @@
+"""Compares cold and warm ``smartspace.blocks.load()`` with an InterfaceCache.
+
+Module imports are excluded by loading the block set once up front, and every
+run starts from classes with no generated interface, as a fresh worker would.
+
+    python benchmarks/interface_cache.py [path]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+import smartspace.blocks
+from smartspace.interface_cache import InterfaceCache
+
+
+def _reset(block_set):
+    for versions in block_set.all.values():
+        for block_type in versions.values():
+            block_type._class_interface = None
+            block_type._type_adapters_ready = False
+            block_type._input_pin_type_adapters = {}
+            block_type._output_pin_type_adapters = {}
+            block_type._state_type_adapters = {}
+
+
+async def main(path: str | None, runs: int = 5):
+    block_set = await smartspace.blocks.load(path)
+    block_count = sum(len(versions) for versions in block_set.all.values())
+
+    with tempfile.TemporaryDirectory() as cache_path:
+        timings: dict[str, list[float]] = {"no cache": [], "cold": [], "warm": []}
+
+        for _ in range(runs):
+            _reset(block_set)
+            start = time.perf_counter()
+            for versions in (await smartspace.blocks.load(path)).all.values():
+                for block_type in versions.values():
+                    block_type._get_interface()
+            timings["no cache"].append(time.perf_counter() - start)
+
+            cache = InterfaceCache(cache_path)
+            cache.clear()
+            _reset(block_set)
+            start = time.perf_counter()
+            await smartspace.blocks.load(path, interface_cache=cache)
+            timings["cold"].append(time.perf_counter() - start)
+
+            cache = InterfaceCache(cache_path)
+            _reset(block_set)
+            start = time.perf_counter()
+            await smartspace.blocks.load(path, interface_cache=cache)
+            timings["warm"].append(time.perf_counter() - start)
+
+    print(f"{block_count} blocks ({cache.hits} cached), best of {runs} runs")
+    for name, values in timings.items():
+        print(f"  {name:<10} {min(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
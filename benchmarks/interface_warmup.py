@@ -0,0 +1,49 @@
+"""Compares warming up the interfaces of a block set serially and in a process
+pool, starting from an empty cache each time.
+
+    python benchmarks/interface_warmup.py [path] [processes]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import smartspace.blocks
+from smartspace.interface_cache import InterfaceCache
+
+
+def _reset(block_types):
+    for block_type in block_types:
+        block_type._class_interface = None
+        block_type._type_adapters_ready = False
+
+
+async def main(path: str | None, processes: int):
+    block_set = await smartspace.blocks.load(path)
+    block_types = [
+        block_type
+        for versions in block_set.all.values()
+        for block_type in versions.values()
+    ]
+
+    for label, warmup_processes in (("serial", 1), ("parallel", processes)):
+        with tempfile.TemporaryDirectory() as cache_path:
+            _reset(block_types)
+            report = InterfaceCache(cache_path).warmup(
+                block_types, processes=warmup_processes
+            )
+            print(f"{label:>8}: {report}")
+
+            _reset(block_types)
+            report = InterfaceCache(cache_path).warmup(block_types)
+            print(f"{'warm':>8}: {report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None,
+            int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1,
+        )
+    )
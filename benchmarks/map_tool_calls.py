@@ -0,0 +1,56 @@
+"""Map over N items in process with run_block, its tool implemented by a sync
+callable, an async callable that waits 1ms, and a block function, and with the
+synchronous config, where each item waits for the previous one.
+
+    python benchmarks/map_tool_calls.py [items]
+"""
+
+import asyncio
+import sys
+import time
+
+from smartspace.blocks.loops import Map
+from smartspace.core import Block, step
+from smartspace.flow_executor import BlockTool, run_block
+
+
+class Square(Block):
+    @step(output_name="squared")
+    async def square(self, item: int) -> int:
+        return item * item
+
+
+async def wait_and_square(item: int) -> int:
+    await asyncio.sleep(0.001)
+    return item * item
+
+
+async def main(items: int):
+    values = list(range(items))
+    expected = [i * i for i in values]
+
+    for name, tool, synchronous in [
+        ("sync callable", lambda item: item * item, False),
+        ("async callable", wait_and_square, False),
+        ("block function", BlockTool(Square, "square"), False),
+        ("synchronous", lambda item: item * item, True),
+    ]:
+        start = time.perf_counter()
+        result = await run_block(
+            Map,
+            "map",
+            {"items": values},
+            tools={"run": tool},
+            config={"synchronous": synchronous},
+        )
+        elapsed = time.perf_counter() - start
+
+        assert result.outputs["results"] == expected
+        print(
+            f"{name:14s}: {elapsed:6.2f}s, {items / elapsed:8.1f} items/s, "
+            f"{elapsed / items * 1e6:6.1f} us/item"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
@@ -0,0 +1,61 @@
+"""Peak memory and time of running ForEach over N items with a slow consumer,
+with the default unbounded message queue and with bounded queues.
+
+    python benchmarks/message_backpressure.py [items]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from smartspace.blocks.loops import ForEach
+from smartspace.models import BlockPinRef, InputValue
+
+
+async def _consume(items: list[str], max_queued_messages: int):
+    block = ForEach()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="foreach", pin="items"), value=items)
+        ]
+    )
+
+    call = await block._run_function("foreach", None, max_queued_messages)
+    count = 0
+    async for record in call.records():
+        record.dump_json()
+        count += 1
+        if count % 100 == 0:
+            # A consumer that yields to the event loop, as one that sends the
+            # messages over a connection does
+            await asyncio.sleep(0)
+
+    return call.queue_stats()
+
+
+async def _run(items: list[str], max_queued_messages: int):
+    start = time.perf_counter()
+    stats = await _consume(items, max_queued_messages)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await _consume(items, max_queued_messages)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    name = f"bounded ({max_queued_messages})" if max_queued_messages else "unbounded"
+    print(
+        f"{name:16s}: {elapsed * 1000:8.1f}ms, peak {peak / 1024 / 1024:6.1f}MiB, "
+        f"max {stats.max_messages} queued messages, {stats.waits} waits"
+    )
+
+
+async def main(count: int):
+    items = [f"item {i}" for i in range(count)]
+    for max_queued_messages in [0, 1000, 100]:
+        await _run(items, max_queued_messages)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,62 @@
+"""Cost of running ForEach over N items and serializing every message, through
+the pydantic models (as the debug CLI used to) and through MessageRecords.
+
+    python benchmarks/message_records.py [items]
+"""
+
+import asyncio
+import sys
+import time
+
+from smartspace.blocks.loops import ForEach
+from smartspace.models import BlockPinRef, InputValue
+
+
+def _block(items: int) -> ForEach:
+    block = ForEach()
+    block._load(
+        inputs=[
+            InputValue(
+                target=BlockPinRef(port="foreach", pin="items"),
+                value=[{"id": i, "name": f"item {i}"} for i in range(items)],
+            )
+        ]
+    )
+    return block
+
+
+async def _models(call) -> int:
+    return len([m.model_dump(by_alias=True, mode="json") async for m in call])
+
+
+async def _models_json(call) -> int:
+    return sum([len(m.model_dump_json(by_alias=True)) async for m in call])
+
+
+async def _records(call) -> int:
+    return len([m.dump() async for m in call.records()])
+
+
+async def _records_json(call) -> int:
+    return sum([len(m.dump_json()) async for m in call.records()])
+
+
+async def main(items: int):
+    for name, run in [
+        ("models, model_dump", _models),
+        ("records, dump", _records),
+        ("models, model_dump_json", _models_json),
+        ("records, dump_json", _records_json),
+    ]:
+        await run(await _block(100)._run_function("foreach"))
+        call = await _block(items)._run_function("foreach")
+        start = time.perf_counter()
+        await run(call)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:24s}: {elapsed * 1000:8.1f}ms ({elapsed / items * 1e6:5.1f}us/message)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
@@ -0,0 +1,68 @@
+"""Memory held by the per-pin objects of a block with a large dynamic output
+list port (UnpackList), after its ports are created and after every output has
+sent a value, and the time to create its ports.
+
+    python benchmarks/output_memory.py [sizes...]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from smartspace.blocks.lists import UnpackList
+from smartspace.models import BlockPinRef, InputValue
+
+
+def _load(dynamic_ports: list[str]) -> UnpackList:
+    block = UnpackList()
+    block._load(dynamic_ports=dynamic_ports)
+    return block
+
+
+async def _unpack(block: UnpackList, size: int):
+    block._load(
+        inputs=[
+            InputValue(
+                target=BlockPinRef(port="unpack", pin="list"), value=list(range(size))
+            )
+        ]
+    )
+    messages = [m async for m in await block._run_function("unpack")]
+    assert sum(len(m.outputs) for m in messages) == size
+
+
+def main(sizes: list[int]):
+    _load([f"items.{i}" for i in range(10)])
+
+    for size in sizes:
+        dynamic_ports = [f"items.{i}" for i in range(size)]
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        block = _load(dynamic_ports)
+        loaded = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        _load(dynamic_ports)
+        elapsed = time.perf_counter() - start
+
+        asyncio.run(_unpack(block, size))
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        block = _load(dynamic_ports)
+        asyncio.run(_unpack(block, size))
+        del block._messages[:]
+        sent = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        print(
+            f"{size:6d} outputs: {loaded / size:6.1f} bytes/output loaded, "
+            f"{sent / size:6.1f} bytes/output after sending, "
+            f"load {elapsed * 1000:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [10, 1000, 10000])
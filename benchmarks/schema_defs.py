@@ -0,0 +1,72 @@
+"""Reports the size of the registerblock payload of a block set with per-pin
+$defs, with definitions hoisted per block, and hoisted for the whole set. A
+retrieval-style block with several pins of the chunk and thread message models
+is added to the set, as such blocks are where definitions repeat the most.
+
+    python benchmarks/schema_defs.py [path]
+"""
+
+import asyncio
+import json
+import sys
+
+import pydantic_core
+
+import smartspace.blocks
+from smartspace.core import Block, Output, step
+from smartspace.models import FileChunks, ThreadMessage, WebChunks
+from smartspace.schema_defs import compact_block_set, compact_interface
+
+
+class Retrieve(Block):
+    web: Output[WebChunks]
+    files: Output[FileChunks]
+    history: Output[list[ThreadMessage]]
+
+    @step()
+    async def search(
+        self,
+        query: str,
+        web: WebChunks,
+        files: FileChunks,
+        messages: list[ThreadMessage],
+    ) -> FileChunks: ...
+
+
+async def main(path: str | None):
+    block_set = await smartspace.blocks.load(path)
+    block_set.add(Retrieve)
+    payload = pydantic_core.to_jsonable_python(
+        {
+            name: {
+                version: block_type.interface()
+                for version, block_type in versions.items()
+            }
+            for name, versions in block_set.all.items()
+        }
+    )
+
+    per_block = {
+        name: {
+            version: compact_interface(interface)
+            for version, interface in versions.items()
+        }
+        for name, versions in payload.items()
+    }
+
+    for label, data in (
+        ("per-pin $defs", payload),
+        ("block $defs", per_block),
+        ("block set $defs", compact_block_set(payload)),
+    ):
+        print(f"{label:>16}: {len(json.dumps(data)):8d} bytes")
+
+    retrieve = payload["Retrieve"]["1.0.0"]
+    print(
+        f"Retrieve alone: {len(json.dumps(retrieve))} -> "
+        f"{len(json.dumps(compact_interface(retrieve)))} bytes"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
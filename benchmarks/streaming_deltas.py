@@ -0,0 +1,77 @@
+"""JSON bytes sent for a StreamingOutput that is updated with every token of a
+long text, with full snapshots and with delta encoding, and the time taken to
+produce and dump the messages. The delta runs check that the text rebuilt from
+the messages equals the finalized value.
+
+    python benchmarks/streaming_deltas.py [tokens]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import Annotated
+
+from smartspace.core import Block, Metadata, StreamingOutput, step
+from smartspace.models import BlockPinRef, InputValue, apply_streaming_message
+
+
+class Answer(Block):
+    full: StreamingOutput[str]
+    deltas: Annotated[StreamingOutput[str], Metadata(delta=True)]
+    rare_keyframes: Annotated[
+        StreamingOutput[str], Metadata(delta=True, delta_keyframe_interval=1000)
+    ]
+
+    @step()
+    async def generate(self, pin: str, tokens: int):
+        output: StreamingOutput[str] = getattr(self, pin)
+        text = ""
+        for i in range(tokens):
+            text += f"word{i % 97} "
+            output.update(text)
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+
+        output.finalize(text)
+
+
+async def _run(pin: str, tokens: int) -> tuple[int, float]:
+    block = Answer()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="generate", pin="pin"), value=pin),
+            InputValue(target=BlockPinRef(port="generate", pin="tokens"), value=tokens),
+        ]
+    )
+
+    start = time.perf_counter()
+    dumps = [
+        m.dump_json() async for m in (await block._run_function("generate")).records()
+    ]
+    elapsed = time.perf_counter() - start
+
+    value = None
+    for dump in dumps:
+        for output in json.loads(dump)["outputs"]:
+            if output["source"]["port"] == pin:
+                value = apply_streaming_message(value, output["value"])
+                final = output["value"]["data"]
+
+    assert value == final
+
+    return sum(len(d) for d in dumps), elapsed
+
+
+async def main(tokens: int):
+    for name, pin in [
+        ("full snapshots", "full"),
+        ("deltas", "deltas"),
+        ("deltas, 1000/keyframe", "rare_keyframes"),
+    ]:
+        size, elapsed = await _run(pin, tokens)
+        print(f"{name:22s}: {size / 1024:10.1f}KiB, {elapsed * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000))
@@ -0,0 +1,66 @@
+"""Messages and JSON bytes sent for a StreamingOutput that receives a token
+every millisecond, as an LLM response would, with and without a throttle. The
+consumer dumps every message as the debug CLI does.
+
+    python benchmarks/streaming_throttle.py [tokens]
+"""
+
+import asyncio
+import sys
+import time
+from typing import Annotated
+
+from smartspace.core import Block, Metadata, StreamingOutput, step
+from smartspace.models import BlockPinRef, InputValue
+
+
+class Completion(Block):
+    text: StreamingOutput[str]
+    throttled: Annotated[StreamingOutput[str], Metadata(max_updates_per_second=20)]
+    sized: Annotated[StreamingOutput[str], Metadata(min_bytes_changed=200)]
+
+    @step()
+    async def generate(self, pin: str, tokens: int):
+        output: StreamingOutput[str] = getattr(self, pin)
+        text = ""
+        for i in range(tokens):
+            text += f"token{i} "
+            output.update(text)
+            await asyncio.sleep(0.001)
+
+        output.finalize(text)
+
+
+async def _run(pin: str, tokens: int) -> tuple[int, int, float]:
+    block = Completion()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="generate", pin="pin"), value=pin),
+            InputValue(target=BlockPinRef(port="generate", pin="tokens"), value=tokens),
+        ]
+    )
+
+    start = time.perf_counter()
+    dumps = [
+        m.dump_json() async for m in (await block._run_function("generate")).records()
+    ]
+    elapsed = time.perf_counter() - start
+
+    return len(dumps), sum(len(d) for d in dumps), elapsed
+
+
+async def main(tokens: int):
+    for name, pin in [
+        ("unthrottled", "text"),
+        ("20 updates/s", "throttled"),
+        ("200 bytes changed", "sized"),
+    ]:
+        count, size, elapsed = await _run(pin, tokens)
+        print(
+            f"{name:18s}: {count:5d} messages, {size / 1024:9.1f}KiB, "
+            f"{elapsed * 1000:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,39 @@
+"""Micro-benchmark of the per-item work of a tool round trip: calling a tool and
+creating the callback call, as ``Map`` does for every item.
+
+    python benchmarks/tool_calls.py
+"""
+
+import timeit
+from typing import Any
+
+from smartspace.core import Block, Tool, callback, step
+
+
+class Mapper(Block):
+    class MapTool(Tool):
+        def run(self, item: Any) -> Any: ...
+
+    tool: MapTool
+
+    @step()
+    async def map(self, items: list[Any]): ...
+
+    @callback()
+    async def collect(self, result: Any, index: int): ...
+
+
+def main():
+    block = Mapper()
+
+    def run():
+        block.tool.call(1).then(lambda result: block.collect(result, index=0))
+
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(number=number, repeat=5)) / number
+    print(f"tool call + callback: {best * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Measures interface generation for the built-in blocks: wall time, memory
+allocated while generating, and the type registry's interning stats.
+
+    python benchmarks/type_registry.py [path]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+import smartspace.blocks
+from smartspace.utils.type_registry import type_registry
+
+
+async def main(path: str | None):
+    block_set = await smartspace.blocks.load(path)
+    block_types = [
+        block_type
+        for versions in block_set.all.values()
+        for block_type in versions.values()
+    ]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for block_type in block_types:
+        block_type._get_interface()
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{len(block_types)} blocks")
+    print(f"interface generation: {elapsed * 1000:.0f} ms")
+    print(f"retained allocations: {allocated / 1024:.0f} KiB")
+    print(type_registry.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
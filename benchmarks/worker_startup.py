@@ -0,0 +1,90 @@
+"""Measures worker start-up over the built-in ``smartspace.blocks`` package, each
+scenario in a fresh interpreter:
+
+- ``generate``: generate every interface, as a worker without a cache does.
+- ``cached``: restore every interface from a warm InterfaceCache and create
+  one instance of each block, as a warm worker serving its first requests does.
+
+Reports the time after imports, the peak RSS and the type registry's stats.
+
+    python benchmarks/worker_startup.py
+"""
+
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def _run(scenario: str, cache_path: str):
+    import smartspace.blocks
+    from smartspace.interface_cache import InterfaceCache
+    from smartspace.utils.type_registry import type_registry
+
+    block_set = await smartspace.blocks.load()
+    block_types = [
+        block_type
+        for versions in block_set.all.values()
+        for block_type in versions.values()
+    ]
+
+    start = time.perf_counter()
+    if scenario == "generate":
+        for block_type in block_types:
+            block_type._get_interface()
+    else:
+        cache = InterfaceCache(cache_path)
+        for block_type in block_types:
+            cache.load(block_type)
+        for block_type in block_types:
+            block_type()
+    elapsed = time.perf_counter() - start
+
+    stats = type_registry.stats()
+    print(
+        json.dumps(
+            {
+                "ms": elapsed * 1000,
+                "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "adapters": stats.adapters,
+                "deferred": stats.deferred,
+                "materialized": stats.materialized,
+            }
+        )
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_path:
+        # Warm the cache
+        subprocess.run(
+            [sys.executable, __file__, "cached", cache_path],
+            check=True,
+            capture_output=True,
+        )
+
+        for scenario in ("generate", "cached"):
+            output = subprocess.run(
+                [sys.executable, __file__, scenario, cache_path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(
+                f"{scenario:>8}: {result['ms']:6.0f} ms, "
+                f"peak RSS {result['rss_kib'] / 1024:.1f} MiB, "
+                f"{result['adapters']} adapters built, "
+                f"{result['deferred']} deferred, "
+                f"{result['materialized']} materialized"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(_run(sys.argv[1], sys.argv[2]))
+    else:
+        main()
@@ -1,15 +1,19 @@
 import concurrent.futures
 import inspect
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
 import smartspace.core
 import smartspace.utils.utils
 
+if TYPE_CHECKING:
+    from smartspace.interface_cache import InterfaceCache
+
 
 async def load(
     path: str | None = None,
     block_set: smartspace.core.BlockSet | None = None,
     force_reload: bool = False,
+    interface_cache: "InterfaceCache | None" = None,
 ) -> smartspace.core.BlockSet:
     import asyncio
     import functools
@@ -96,4 +100,9 @@ async def load(
                     block_type = cast(type[smartspace.core.Block], item)
                     block_set.add(block_type)
 
+    if interface_cache is not None:
+        for versions in block_set.all.values():
+            for block_type in versions.values():
+                interface_cache.load(block_type)
+
     return block_set
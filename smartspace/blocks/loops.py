@@ -136,6 +136,6 @@ class ForEach(OperatorBlock, Generic[ItemT]):
     @step()
     async def foreach(self, items: list[ItemT]):
         for item in items:
-            self.item.send(item)
+            await self.item.asend(item)
 
         self.item.close()
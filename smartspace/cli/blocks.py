@@ -1,6 +1,6 @@
 import asyncio
 import json
-from typing import List
+from typing import Annotated, Iterable, List, Mapping
 
 import pydantic_core
 import requests
@@ -8,10 +8,6 @@ import typer
 from pydantic import TypeAdapter
 
 from smartspace.cli.models import PublishedBlockSet
-from smartspace.core import BlockSet
-from smartspace.models import (
-    BlockRunData,
-)
 
 app = typer.Typer()
 
@@ -120,26 +116,75 @@ def publish(name: str, path: str = ""):
         os.remove(file_name)
 
 
+@app.command("profile-load")
+def profile_load(
+    path: Annotated[str, typer.Argument()] = "", top: int = 10, json_path: str = ""
+):
+    import smartspace.blocks
+    from smartspace.interface_profiler import profile_block_set
+
+    block_set = asyncio.run(smartspace.blocks.load(path or None, force_reload=True))
+    profile = profile_block_set(
+        [
+            block_type
+            for versions in block_set.all.values()
+            for block_type in versions.values()
+        ]
+    )
+
+    print(profile.report(top))
+
+    if json_path:
+        with open(json_path, "w") as f:
+            f.write(profile.model_dump_json(indent=2))
+
+        print(f"Profile written to '{json_path}'")
+
+
 @app.command()
-def debug(path: str = "", poll: bool = False):
+def debug(
+    path: str = "",
+    poll: bool = False,
+    warmup: bool = False,
+    pool: List[str] = [],
+    coalesce: bool = False,
+    max_queued_messages: int = 0,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            help="Send run messages to the server in chunks as they are produced, "
+            "through the runblockmessages hub method. Needs a debug server that "
+            "supports it."
+        ),
+    ] = False,
+    max_concurrent_runs: int = 1,
+    block_limit: List[str] = [],
+    delay_after_run: float = 5,
+):
     import asyncio
     import os
     from contextlib import suppress
 
     from pysignalr.client import SignalRClient
-    from pysignalr.messages import (
-        CompletionMessage,
-        HandshakeMessage,
-        InvocationMessage,
-        Message,
-    )
-    from pysignalr.protocol.json import JSONProtocol, MessageEncoder
+    from pysignalr.messages import CompletionMessage
     from watchdog.events import FileSystemEvent, FileSystemEventHandler
     from watchdog.observers import Observer
     from watchdog.observers.polling import PollingObserver
 
     import smartspace.blocks
     import smartspace.cli.auth
+    from smartspace.cli.debug import (
+        DebugOptions,
+        DebugProtocol,
+        DebugRunner,
+        parse_block_limits,
+    )
+    from smartspace.interface_cache import InterfaceCache
+
+    try:
+        block_limits = parse_block_limits(block_limit)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--block-limit")
 
     config = get_config()
 
@@ -147,83 +192,26 @@ def debug(path: str = "", poll: bool = False):
 
     print(f"Debugging blocks in '{root_path}'")
 
-    message_encoder = MessageEncoder()
-
-    class MyJSONProtocol(JSONProtocol):
-        def encode(self, message: Message | HandshakeMessage) -> str:
-            if isinstance(message, CompletionMessage):
-                data = message.dump()
-                if "error" in data and data["error"] is None:
-                    del data["error"]
-                return message_encoder.encode(data)
-            else:
-                return JSONProtocol.encode(self, message)
-
     client = SignalRClient(
         url=f"{config['config_api_url']}debug"
         if config["config_api_url"].endswith("/")
         else f"{config['config_api_url']}/debug",
         headers={"Authorization": f"Bearer {smartspace.cli.auth.get_token()}"},
-        protocol=MyJSONProtocol(),
+        protocol=DebugProtocol(),
+    )
+    runner = DebugRunner(
+        client,
+        DebugOptions(
+            stream=stream,
+            coalesce=coalesce,
+            max_queued_messages=max_queued_messages,
+            max_concurrent_runs=max_concurrent_runs,
+            block_limits=block_limits,
+            delay_after_run=delay_after_run,
+        ),
     )
 
-    block_set: BlockSet = BlockSet()
-
-    running = (
-        asyncio.Lock()
-    )  # temp fix to deal with server issue when running blocks in parallel
-
-    async def on_message_override(message: Message):
-        if isinstance(message, InvocationMessage) and message.target == "run_block":
-            async with running:
-                request = BlockRunData.model_validate(message.arguments[0])
-
-                print(
-                    f"Running '{request.name}({request.version}).{request.function}()'"
-                )
-
-                block_type = block_set.find(request.name, request.version)
-
-                if not block_type:
-                    raise Exception(
-                        f"Could not find block with name {request.name} and version {request.version}"
-                    )
-
-                block_instance = block_type()
-
-                block_instance._load(
-                    context=request.context,
-                    state=request.state,
-                    inputs=request.inputs,
-                    dynamic_ports=request.dynamic_ports,
-                    dynamic_output_pins=request.dynamic_output_pins,
-                    dynamic_input_pins=request.dynamic_input_pins,
-                )
-
-                messages: List[dict] = []
-
-                async for m in await block_instance._run_function(request.function):
-                    messages.append(m.model_dump(by_alias=True, mode="json"))
-
-                invocation_id = getattr(message, "invocation_id", None) or getattr(
-                    message, "invocationId", ""
-                )
-
-                message = CompletionMessage(
-                    invocation_id,
-                    messages,
-                    headers=client._headers,
-                )
-                print(
-                    f"Finished '{request.name}({request.version}).{request.function}()'"
-                )
-                await client._transport.send(message)
-                await asyncio.sleep(5)
-        else:
-            await SignalRClient._on_message(client, message)
-
-    client._on_message = on_message_override
-    client._transport._callback = on_message_override
+    interface_cache = InterfaceCache() if warmup else None
 
     async def on_close() -> None:
         print("Disconnected from the server")
@@ -235,82 +223,57 @@ def debug(path: str = "", poll: bool = False):
         await register_blocks(root_path)
 
     async def register_blocks(path: str):
-        nonlocal block_set
+        block_set = runner.block_set
 
         new_block_set = await smartspace.blocks.load(path, force_reload=True)
-        old_blocks = block_set.all
-
-        found_blocks = {
-            block_name: {
-                version: block_type.interface()
-                for version, block_type in versions.items()
-            }
-            for block_name, versions in new_block_set.all.items()
-        }
-
-        new_blocks = {
-            found_block_name: {
-                version: block_interface
-                for version, block_interface in found_block_versions.items()
-                if not any(
-                    [
-                        old_block_name == found_block_name and version in old_versions
-                        for old_block_name, old_versions in old_blocks.items()
-                    ]
-                )
+        if pool:
+            new_block_set.enable_instance_pool(pool)
+
+        if interface_cache:
+
+            def _progress(done: int, total: int):
+                print(f"\rWarming up block interfaces {done}/{total}", end="")
+
+            report = await asyncio.to_thread(
+                interface_cache.warmup,
+                [
+                    block_type
+                    for versions in new_block_set.all.values()
+                    for block_type in versions.values()
+                ],
+                progress=_progress,
+            )
+            print(f"\r{report}")
+
+        diff = block_set.diff(new_block_set)
+
+        def _get_interfaces(blocks: Mapping[str, Iterable[str]]):
+            return {
+                block_name: {
+                    version: new_block_set.all[block_name][version].interface()
+                    for version in versions
+                }
+                for block_name, versions in blocks.items()
             }
-            for found_block_name, found_block_versions in found_blocks.items()
-        }
-
-        removed_blocks = {
-            old_block_name: [
-                old_version
-                for old_version in old_versions.keys()
-                if old_block_name not in found_blocks
-                or old_version not in found_blocks[old_block_name]
-            ]
-            for old_block_name, old_versions in old_blocks.items()
-        }
-
-        updated_blocks = {
-            found_block_name: {
-                version: block_interface
-                for version, block_interface in found_block_versions.items()
-                if any(
-                    [
-                        old_block_name == found_block_name
-                        and version in old_versions
-                        and block_interface != old_versions[version].interface()
-                        for old_block_name, old_versions in old_blocks.items()
-                    ]
-                )
-            }
-            for found_block_name, found_block_versions in found_blocks.items()
-        }
 
-        has_updated_blocks = False
+        for block_name, versions in diff.updated.items():
+            for version, ports in versions.items():
+                changed_ports = f": {', '.join(ports)}" if ports else ""
+                print(f"Updating {block_name} ({version}){changed_ports}")
 
-        for block_name, versions in updated_blocks.items():
-            for version, interface in versions.items():
-                has_updated_blocks = True
-                print(f"Updating {block_name} ({version})")
-
-        if has_updated_blocks:
-            data = pydantic_core.to_jsonable_python(updated_blocks)
+        if diff.updated:
+            data = pydantic_core.to_jsonable_python(_get_interfaces(diff.updated))
             await client.send("registerblock", [data])
 
-        has_new_blocks = False
-
-        for block_name, versions in new_blocks.items():
-            for version, interface in versions.items():
-                has_new_blocks = True
+        for block_name, versions in diff.added.items():
+            for version in versions:
                 print(f"Registering {block_name} ({version})")
 
-        if has_new_blocks:
-            data = pydantic_core.to_jsonable_python(new_blocks)
+        if diff.added:
+            data = pydantic_core.to_jsonable_python(_get_interfaces(diff.added))
             await client.send("registerblock", [data])
 
-        for block_name, removed_versions in removed_blocks.items():
+        for block_name, removed_versions in diff.removed.items():
             for version in removed_versions:
                 print(f"Removing {block_name} ({version})")
                 await client.send(
@@ -320,7 +283,7 @@ def debug(path: str = "", poll: bool = False):
         if not len(new_block_set.all):
             print("Found no blocks")
 
-        block_set = new_block_set
+        runner.block_set = new_block_set
 
     client.on_open(on_open)
     client.on_close(on_close)
@@ -0,0 +1,255 @@
+"""Runs blocks for the SmartSpace debug server.
+
+The debug server invokes ``run_block`` on the ``smartspace blocks debug``
+client. ``DebugRunner`` handles those invocations: it runs the requested block
+function and sends its messages back, either all at once in the
+``CompletionMessage`` of the invocation or, with ``stream``, in chunks as the
+function produces them, followed by an empty ``CompletionMessage``.
+
+``run_block`` is a normal (not a streaming) invocation, so a SignalR hub does
+not accept stream items for it. Chunks are instead sent by invoking the
+``runblockmessages`` hub method with the invocation id and a list of messages,
+so ``stream`` needs a server that implements that method. A chunk holds the
+messages that were ready when it was sent, so a chunk is sent as soon as the
+function produces a message and messages produced while the connection is busy
+are batched together.
+
+Each invocation runs as its own task, so runs can overlap. ``DebugOptions``
+limits how many are in flight at once, overall and per block name.
+
+Run messages are serialized once, straight to JSON, with
+``MessageRecord.dump_json()``, and written into the SignalR messages as
+``JSONFragment``s by ``DebugProtocol``.
+"""
+
+import asyncio
+import contextlib
+import types
+from typing import Any, Callable, Mapping, NamedTuple
+
+import pydantic_core
+from pysignalr.client import SignalRClient
+from pysignalr.messages import (
+    CompletionMessage,
+    HandshakeMessage,
+    InvocationMessage,
+    Message,
+)
+from pysignalr.protocol.json import JSONProtocol
+
+from smartspace.core import BlockSet, MessageCoalescing
+from smartspace.models import BlockRunData
+
+
+class JSONFragment(bytes):
+    """UTF-8 JSON that has already been encoded, which ``encode_json`` writes
+    into a message as it is."""
+
+
+def _has_fragments(value: Any) -> bool:
+    return isinstance(value, JSONFragment) or (
+        isinstance(value, list) and any(_has_fragments(v) for v in value)
+    )
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, JSONFragment):
+        return value
+
+    if isinstance(value, list) and _has_fragments(value):
+        return b"[" + b",".join(_encode_value(v) for v in value) + b"]"
+
+    return pydantic_core.to_json(value)
+
+
+def encode_json(data: dict[str, Any]) -> bytes:
+    """Encodes the dict of a SignalR message to UTF-8 JSON with pydantic-core.
+    Its values, and the items of its (nested) list values, can be JSONFragments."""
+    return (
+        b"{"
+        + b",".join(
+            pydantic_core.to_json(key) + b":" + _encode_value(value)
+            for key, value in data.items()
+        )
+        + b"}"
+    )
+
+
+class DebugProtocol(JSONProtocol):
+    """The SignalR JSON protocol, with messages encoded by ``encoder``, which is
+    given the dict of a message and returns UTF-8 JSON. The default,
+    ``encode_json``, accepts JSONFragments."""
+
+    def __init__(self, encoder: Callable[[dict[str, Any]], bytes] = encode_json):
+        super().__init__()
+        self.encoder = encoder
+
+    def encode(self, message: Message | HandshakeMessage) -> str:
+        data = message.dump()
+        if isinstance(message, CompletionMessage):
+            if "error" in data and data["error"] is None:
+                del data["error"]
+            return self.encoder(data).decode()
+        else:
+            return self.encoder(data).decode() + self.record_separator
+
+
+# The hub method that receives the chunks of messages of a run with ``stream``
+RUN_BLOCK_MESSAGES = "runblockmessages"
+
+
+class DebugOptions(NamedTuple):
+    # Sends messages in chunks as they are produced, which the server must support
+    stream: bool = False
+    # The most messages in a chunk
+    max_chunk_messages: int = 100
+    coalesce: bool = False
+    max_queued_messages: int = 0
+    # The most runs in flight at once, 0 for no limit
+    max_concurrent_runs: int = 1
+    # Block name -> the most runs of that block in flight at once
+    block_limits: Mapping[str, int] = types.MappingProxyType({})
+    # How long a run keeps its slot after it completes
+    delay_after_run: float = 5
+
+
+def parse_block_limits(values: list[str]) -> dict[str, int]:
+    """Parses ``name=limit`` values into block limits."""
+    limits: dict[str, int] = {}
+    for value in values:
+        name, _, limit = value.rpartition("=")
+        if not name or not limit.isdigit() or int(limit) < 1:
+            raise ValueError(
+                f"Invalid block limit '{value}', expected 'name=limit' with a limit of at least 1"
+            )
+
+        limits[name] = int(limit)
+
+    return limits
+
+
+def _get_invocation_id(message: InvocationMessage) -> str:
+    return getattr(message, "invocation_id", None) or getattr(
+        message, "invocationId", ""
+    )
+
+
+class DebugRunner:
+    def __init__(self, client: SignalRClient, options: DebugOptions = DebugOptions()):
+        self.client = client
+        self.options = options
+        self.block_set = BlockSet()
+
+        # The server used to have issues with blocks running in parallel, so by
+        # default runs are serialized, with a delay after each one
+        self._runs = (
+            asyncio.Semaphore(options.max_concurrent_runs)
+            if options.max_concurrent_runs > 0
+            else None
+        )
+        self._block_runs = {
+            name: asyncio.Semaphore(limit)
+            for name, limit in options.block_limits.items()
+        }
+        self._tasks: set[asyncio.Task] = set()
+
+        client._on_message = self.on_message  # type: ignore
+        client._transport._callback = self.on_message
+
+    async def on_message(self, message: Message):
+        # The transport awaits this for each message before it reads the next
+        # one, so runs are started as tasks rather than awaited
+        if isinstance(message, InvocationMessage) and message.target == "run_block":
+            request = BlockRunData.model_validate(message.arguments[0])
+            task = asyncio.ensure_future(
+                self._run(_get_invocation_id(message), request)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            await SignalRClient._on_message(self.client, message)
+
+    async def join(self):
+        """Waits for the runs in flight to complete."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, invocation_id: str, request: BlockRunData):
+        async with contextlib.AsyncExitStack() as slots:
+            # Waits for a slot for the block before taking one of the overall
+            # slots, so runs of other blocks can use them in the meantime
+            block_runs = self._block_runs.get(request.name)
+            if block_runs is not None:
+                await slots.enter_async_context(block_runs)
+
+            if self._runs is not None:
+                await slots.enter_async_context(self._runs)
+
+            try:
+                await self.run_block(invocation_id, request)
+            except Exception as e:
+                print(
+                    f"Failed '{request.name}({request.version}).{request.function}()': {e}"
+                )
+                await self.client._transport.send(
+                    CompletionMessage(
+                        invocation_id, error=str(e), headers=self.client._headers
+                    )
+                )
+
+            await asyncio.sleep(self.options.delay_after_run)
+
+    async def run_block(self, invocation_id: str, request: BlockRunData):
+        print(f"Running '{request.name}({request.version}).{request.function}()'")
+
+        block_type = self.block_set.find(request.name, request.version)
+
+        if not block_type:
+            raise Exception(
+                f"Could not find block with name {request.name} and version {request.version}"
+            )
+
+        messages: list[JSONFragment] = []
+
+        with self.block_set.instance(block_type) as block_instance:
+            block_instance._load(
+                context=request.context,
+                state=request.state,
+                inputs=request.inputs,
+                dynamic_ports=request.dynamic_ports,
+                dynamic_output_pins=request.dynamic_output_pins,
+                dynamic_input_pins=request.dynamic_input_pins,
+            )
+
+            call = await block_instance._run_function(
+                request.function,
+                MessageCoalescing() if self.options.coalesce else None,
+                self.options.max_queued_messages,
+            )
+            async for m in call.records():
+                messages.append(JSONFragment(m.dump_json()))
+                if self.options.stream and (
+                    call.values.empty()
+                    or len(messages) >= self.options.max_chunk_messages
+                ):
+                    await self._send_chunk(invocation_id, messages)
+                    messages = []
+
+        if messages and self.options.stream:
+            await self._send_chunk(invocation_id, messages)
+            messages = []
+
+        print(f"Finished '{request.name}({request.version}).{request.function}()'")
+        await self.client._transport.send(
+            CompletionMessage(invocation_id, messages, headers=self.client._headers)
+        )
+
+    async def _send_chunk(self, invocation_id: str, messages: list[JSONFragment]):
+        await self.client._transport.send(
+            InvocationMessage(
+                None,
+                RUN_BLOCK_MESSAGES,
+                [invocation_id, messages],
+                headers=self.client._headers,
+            )
+        )
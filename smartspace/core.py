@@ -1,33 +1,43 @@
 import abc
 import asyncio
 import asyncio.queues
+import contextlib
 import contextvars
 import copy
 import enum
+import functools
 import inspect
 import json
+import time
 import types
 import typing
+import weakref
 from typing import (
     Annotated,
     Any,
+    AsyncIterator,
     Awaitable,
     Callable,
     ClassVar,
     Concatenate,
     Generic,
+    Iterable,
+    Iterator,
     Literal,
     Mapping,
     NamedTuple,
     ParamSpec,
+    Sequence,
     TypeVar,
     cast,
 )
 
+import pydantic_core
 import semantic_version
 from more_itertools import first
-from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from pydantic import BaseModel, ConfigDict, ValidationError
 from pydantic._internal._generics import get_args, get_origin
+from pydantic_core import SchemaValidator, core_schema
 
 from smartspace.enums import (
     BlockCategory,
@@ -57,8 +67,11 @@ from smartspace.models import (
     SmartSpaceWorkspace,
     StateInterface,
     StateValue,
+    StreamingDelta,
     ThreadMessage,
+    _get_block_content_hash,
 )
+from smartspace.utils.type_registry import TypeAdapterLike, type_registry
 from smartspace.utils.utils import _get_type_adapter, _issubclass
 
 B = TypeVar("B", bound="Block")
@@ -84,9 +97,9 @@ def _get_pin_type_from_parameter_kind(kind: inspect._ParameterKind) -> PinType:
 
 class FunctionPins(NamedTuple):
     inputs: dict[str, InputPinInterface]
-    input_adapters: dict[str, TypeAdapter]
-    output: tuple[OutputPinInterface | None, TypeAdapter | None]
-    generics: dict[str, TypeAdapter]
+    input_adapters: dict[str, TypeAdapterLike]
+    output: tuple[OutputPinInterface | None, TypeAdapterLike | None]
+    generics: dict[str, TypeVar]
 
 
 class InputInfo(NamedTuple):
@@ -120,8 +133,8 @@ def _get_generics(t: type) -> list[TypeVar]:
 def _get_function_pins(fn: Callable, port_name: str | None = None) -> FunctionPins:
     signature = inspect.signature(fn)
     inputs: dict[str, InputPinInterface] = {}
-    input_adapters: dict[str, TypeAdapter] = {}
-    generics: dict[str, TypeAdapter] = {}
+    input_adapters: dict[str, TypeAdapterLike] = {}
+    generics: dict[str, TypeVar] = {}
 
     for name, param in signature.parameters.items():
         if name == "self":
@@ -222,10 +235,10 @@ def _get_function_pins(fn: Callable, port_name: str | None = None) -> FunctionPi
 
 
 class ToolPins(NamedTuple):
-    input: tuple[InputPinInterface | None, TypeAdapter | None]
+    input: tuple[InputPinInterface | None, TypeAdapterLike | None]
     outputs: dict[str, OutputPinInterface]
-    output_adapters: dict[str, TypeAdapter]
-    generics: dict[str, TypeAdapter]
+    output_adapters: dict[str, TypeAdapterLike]
+    generics: dict[str, TypeVar]
 
 
 def _get_tool_pins(
@@ -236,8 +249,8 @@ def _get_tool_pins(
     generic_names = generic_names or []
     signature = inspect.signature(fn)
     outputs: dict[str, OutputPinInterface] = {}
-    output_adapters: dict[str, TypeAdapter] = {}
-    generics: dict[str, TypeAdapter] = {}
+    output_adapters: dict[str, TypeAdapterLike] = {}
+    generics: dict[str, TypeVar] = {}
 
     for name, param in signature.parameters.items():
         if name == "self":
@@ -340,6 +353,13 @@ def _get_default(cls, field_name) -> tuple[bool, Any]:
     return (False, None)
 
 
+def _copy_default(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool, enum.Enum)):
+        return value
+
+    return copy.deepcopy(value)
+
+
 class Metadata:
     def __init__(
         self,
@@ -382,7 +402,9 @@ def _get_input_pin_from_metadata(
     port_name: str,
     field_name: str,
     parent: type | None = None,
-) -> tuple[tuple[InputPinInterface | None, TypeAdapter | None], dict[str, TypeAdapter]]:
+) -> tuple[
+    tuple[InputPinInterface | None, TypeAdapterLike | None], dict[str, TypeAdapterLike]
+]:
     config: Config | None = None
     _input: Input | None = None
     state: State | None = None
@@ -506,11 +528,16 @@ def _get_state_from_metadata(
     )
 
 
+# The models that stand in for type vars are created once per type var, so that
+# mapped types are stable and can be interned by the type registry
+_type_var_models: dict[tuple[TypeVar, str, int], type[BaseModel]] = {}
+
+
 def _map_type_vars(
     original_type: type,
     mode: Literal["schema", "validation"],
-) -> tuple[type, dict[TypeVar, TypeAdapter]]:
-    type_var_defs: dict[TypeVar, TypeAdapter] = {}
+) -> tuple[type, dict[str, TypeVar]]:
+    type_var_defs: dict[str, TypeVar] = {}
 
     def _inner(new_type: type | TypeVar, depth: int) -> type:
         origin = get_origin(new_type)
@@ -523,14 +550,18 @@ def _map_type_vars(
             return _inner(new_type, depth + 1)
 
         if isinstance(new_type, TypeVar):
+            model = _type_var_models.get((new_type, mode, 2))
+            if model is None:
+
+                class TempTypeVarModel2(BaseModel):
+                    model_config = ConfigDict(title=new_type.__name__)
+                    if mode == "validation":
+                        __pydantic_core_schema__ = {"type": "any"}
 
-            class TempTypeVarModel2(BaseModel):
-                model_config = ConfigDict(title=new_type.__name__)
-                if mode == "validation":
-                    __pydantic_core_schema__ = {"type": "any"}
+                model = _type_var_models[(new_type, mode, 2)] = TempTypeVarModel2
 
-            type_var_defs[new_type] = TypeAdapter(new_type)
-            return TempTypeVarModel2
+            type_var_defs[new_type.__name__] = new_type
+            return model
 
         if depth > 10:
             return new_type
@@ -540,16 +571,18 @@ def _map_type_vars(
         if args:
             for arg in args:
                 if isinstance(arg, TypeVar):
-                    if arg not in type_var_defs:
+                    model = _type_var_models.get((arg, mode, 1))
+                    if model is None:
 
                         class TempTypeVarModel(BaseModel):
                             model_config = ConfigDict(title=arg.__name__)
                             if mode == "validation":
                                 __pydantic_core_schema__ = {"type": "any"}
 
-                        type_var_defs[arg] = TypeAdapter(arg)
+                        model = _type_var_models[(arg, mode, 1)] = TempTypeVarModel
 
-                    new_args.append(TempTypeVarModel)
+                    type_var_defs[arg.__name__] = arg
+                    new_args.append(model)
                 else:
                     new_args.append(_inner(arg, depth + 1))
 
@@ -577,18 +610,38 @@ def _map_type_vars(
 
 
 class JsonSchemaWithGenerics(NamedTuple):
-    type_adapter: TypeAdapter
+    type_adapter: TypeAdapterLike
     schema: dict[str, Any]
-    generics: dict[str, TypeAdapter]
+    generics: dict[str, TypeVar]
+
+
+_skip_json_schemas: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "skip_json_schemas", default=False
+)
 
 
 def _get_json_schema_with_generics(t: type) -> JsonSchemaWithGenerics:
+    if _skip_json_schemas.get():
+        new_t, type_var_map = _map_type_vars(t, mode="validation")
+        return JsonSchemaWithGenerics(
+            type_adapter=type_registry.lazy_type_adapter(
+                Any if new_t == inspect._empty else new_t
+            ),
+            schema={},
+            generics=type_var_map,
+        )
+
     new_t, type_var_map = _map_type_vars(t, mode="schema")
-    generics = {name.__name__: adapter for name, adapter in type_var_map.items()}
-    json_schema = TypeAdapter(Any if new_t == inspect._empty else new_t).json_schema()
+    generics = type_var_map
+    # The interned schema is shared, and pin interfaces can be modified
+    json_schema = copy.deepcopy(
+        type_registry.json_schema(Any if new_t == inspect._empty else new_t)
+    )
 
     new_t, _ = _map_type_vars(t, mode="validation")
-    type_adapter = TypeAdapter(Any if new_t == inspect._empty else new_t)
+    type_adapter = type_registry.lazy_type_adapter(
+        Any if new_t == inspect._empty else new_t
+    )
 
     if "$defs" in json_schema:
         definitions: dict[str, dict[str, Any]] = json_schema["$defs"]
@@ -618,10 +671,33 @@ def _get_json_schema_with_generics(t: type) -> JsonSchemaWithGenerics:
     )
 
 
+def _get_generic_pin(type_var: TypeVar) -> InputPinInterface:
+    """The hidden pin through which the type of a generic is set, which defaults
+    to the schema of the TypeVar."""
+    if _skip_json_schemas.get():
+        json_schema: dict[str, Any] = {}
+        default: dict[str, Any] = {}
+    else:
+        json_schema = copy.deepcopy(type_registry.json_schema(dict[str, Any]))
+        default = copy.deepcopy(type_registry.json_schema(type_var))
+
+    return InputPinInterface(
+        metadata={"generic": True, "hidden": True},
+        sticky=True,
+        json_schema=json_schema,
+        generics={},
+        type=PinType.SINGLE,
+        required=False,
+        default=default,
+        channel=False,
+        virtual=False,
+    )
+
+
 class PinsSet(NamedTuple):
     inputs: dict[str, InputPinInterface]
     outputs: dict[str, OutputPinInterface]
-    generics: dict[str, TypeAdapter]
+    generics: dict[str, TypeVar]
 
 
 def _get_pins(
@@ -641,7 +717,7 @@ def _get_pins(
 
     inputs: dict[str, InputPinInterface] = {}
     outputs: dict[str, OutputPinInterface] = {}
-    generics: dict[str, TypeAdapter] = {}
+    generics: dict[str, TypeVar] = {}
 
     for base_type in all_bases:
         o = get_origin(base_type)
@@ -683,23 +759,13 @@ def _get_pins(
             block_type._set_input_pin_type_adapter(port_name, "return", input_adapter)
             inputs["return"] = _input
 
-        for generic_name, generic_schema in _generics.items():
-            type_adapter = TypeAdapter(dict[str, Any])
+        for generic_name, type_var in _generics.items():
+            type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
             block_type._set_input_pin_type_adapter(
                 port_name, generic_name, type_adapter
             )
 
-            inputs[generic_name] = InputPinInterface(
-                metadata={"generic": True, "hidden": True},
-                sticky=True,
-                json_schema=type_adapter.json_schema(),
-                generics={},
-                type=PinType.SINGLE,
-                required=False,
-                default=generic_schema.json_schema(),
-                channel=False,
-                virtual=False,
-            )
+            inputs[generic_name] = _get_generic_pin(type_var)
 
     (input_pin, input_adapter), _generics = _get_input_pin_from_metadata(
         base_type,
@@ -737,23 +803,13 @@ def _get_pins(
 
             type_adapter, schema, _generics = _get_json_schema_with_generics(args[0])
             block_type._set_output_pin_type_adapter(port_name, field_name, type_adapter)
-            for generic_name, generic_schema in _generics.items():
-                type_adapter = TypeAdapter(dict[str, Any])
+            for generic_name, type_var in _generics.items():
+                type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
                 block_type._set_input_pin_type_adapter(
                     port_name, generic_name, type_adapter
                 )
 
-                inputs[generic_name] = InputPinInterface(
-                    metadata={"generic": True, "hidden": True},
-                    sticky=True,
-                    json_schema=type_adapter.json_schema(),
-                    generics={},
-                    type=PinType.SINGLE,
-                    required=False,
-                    default=generic_schema.json_schema(),
-                    channel=False,
-                    virtual=False,
-                )
+                inputs[generic_name] = _get_generic_pin(type_var)
 
             outputs[field_name] = OutputPinInterface(
                 metadata=metadata,
@@ -792,23 +848,13 @@ def _get_pins(
                     block_type._set_output_pin_type_adapter(
                         port_name, field_name, type_adapter
                     )
-                    for generic_name, generic_schema in _generics.items():
-                        type_adapter = TypeAdapter(dict[str, Any])
+                    for generic_name, type_var in _generics.items():
+                        type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
                         block_type._set_input_pin_type_adapter(
                             port_name, generic_name, type_adapter
                         )
 
-                        inputs[generic_name] = InputPinInterface(
-                            metadata={"generic": True, "hidden": True},
-                            sticky=True,
-                            json_schema=type_adapter.json_schema(),
-                            generics={},
-                            type=PinType.SINGLE,
-                            required=False,
-                            default=generic_schema.json_schema(),
-                            channel=False,
-                            virtual=False,
-                        )
+                        inputs[generic_name] = _get_generic_pin(type_var)
 
                     outputs[field_name] = OutputPinInterface(
                         metadata=metadata,
@@ -838,23 +884,15 @@ def _get_pins(
                             port_name, field_name, input_adapter
                         )
                         inputs[field_name] = input_pin
-                        for generic_name, generic_schema in _generics.items():
-                            type_adapter = TypeAdapter(dict[str, Any])
+                        for generic_name, type_var in _generics.items():
+                            type_adapter = type_registry.lazy_type_adapter(
+                                dict[str, Any]
+                            )
                             block_type._set_input_pin_type_adapter(
                                 port_name, generic_name, type_adapter
                             )
 
-                            inputs[generic_name] = InputPinInterface(
-                                metadata={"generic": True, "hidden": True},
-                                sticky=True,
-                                json_schema=type_adapter.json_schema(),
-                                generics={},
-                                type=PinType.SINGLE,
-                                required=False,
-                                default=generic_schema.json_schema(),
-                                channel=False,
-                                virtual=False,
-                            )
+                            inputs[generic_name] = _get_generic_pin(type_var)
 
         elif o is list:
             list_args = get_args(field_type)
@@ -878,23 +916,13 @@ def _get_pins(
                         port_name, field_name, type_adapter
                     )
 
-                    for generic_name, generic_schema in _generics.items():
-                        type_adapter = TypeAdapter(dict[str, Any])
+                    for generic_name, type_var in _generics.items():
+                        type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
                         block_type._set_input_pin_type_adapter(
                             port_name, generic_name, type_adapter
                         )
 
-                        inputs[generic_name] = InputPinInterface(
-                            metadata={"generic": True, "hidden": True},
-                            sticky=True,
-                            json_schema=type_adapter.json_schema(),
-                            generics={},
-                            type=PinType.SINGLE,
-                            required=False,
-                            default=generic_schema.json_schema(),
-                            channel=False,
-                            virtual=False,
-                        )
+                        inputs[generic_name] = _get_generic_pin(type_var)
 
                     outputs[field_name] = OutputPinInterface(
                         metadata=metadata,
@@ -924,23 +952,15 @@ def _get_pins(
                             port_name, field_name, input_adapter
                         )
                         inputs[field_name] = input_pin
-                        for generic_name, generic_schema in _generics.items():
-                            type_adapter = TypeAdapter(dict[str, Any])
+                        for generic_name, type_var in _generics.items():
+                            type_adapter = type_registry.lazy_type_adapter(
+                                dict[str, Any]
+                            )
                             block_type._set_input_pin_type_adapter(
                                 port_name, generic_name, type_adapter
                             )
 
-                            inputs[generic_name] = InputPinInterface(
-                                metadata={"generic": True, "hidden": True},
-                                sticky=True,
-                                json_schema=type_adapter.json_schema(),
-                                generics={},
-                                type=PinType.SINGLE,
-                                required=False,
-                                default=generic_schema.json_schema(),
-                                channel=False,
-                                virtual=False,
-                            )
+                            inputs[generic_name] = _get_generic_pin(type_var)
 
         (input_pin, input_adapter), _generics = _get_input_pin_from_metadata(
             field_annotation,
@@ -952,23 +972,13 @@ def _get_pins(
         if isinstance(input_pin, InputPinInterface) and input_adapter:
             inputs[field_name] = input_pin
             block_type._set_input_pin_type_adapter(port_name, field_name, input_adapter)
-            for generic_name, generic_schema in _generics.items():
-                type_adapter = TypeAdapter(dict[str, Any])
+            for generic_name, type_var in _generics.items():
+                type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
                 block_type._set_input_pin_type_adapter(
                     port_name, generic_name, type_adapter
                 )
 
-                inputs[generic_name] = InputPinInterface(
-                    metadata={"generic": True, "hidden": True},
-                    sticky=True,
-                    json_schema=type_adapter.json_schema(),
-                    generics={},
-                    type=PinType.SINGLE,
-                    required=False,
-                    default=generic_schema.json_schema(),
-                    channel=False,
-                    virtual=False,
-                )
+                inputs[generic_name] = _get_generic_pin(type_var)
 
     for field_name, field_annotation in annotations.items():
         field_metadata = getattr(field_annotation, "__metadata__", [])
@@ -1029,7 +1039,7 @@ def _get_ports_and_state(block_type: "type[Block]") -> PortsAndState:
 
     ports: dict[str, PortInterface] = {}
     state: dict[str, StateInterface] = {}
-    generics: dict[str, TypeAdapter] = {}
+    generics: dict[str, TypeVar] = {}
 
     for port_name, port_annotation in annotations.items():
         port_annotations = getattr(port_annotation, "__metadata__", None)
@@ -1111,25 +1121,13 @@ def _get_ports_and_state(block_type: "type[Block]") -> PortsAndState:
             if s:
                 state[port_name] = s
 
-    for generic_name, generic_schema in generics.items():
-        type_adapter = TypeAdapter(dict[str, Any])
+    for generic_name, type_var in generics.items():
+        type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
         block_type._set_input_pin_type_adapter(generic_name, "", type_adapter)
 
         ports[generic_name] = PortInterface(
             metadata={},
-            inputs={
-                "": InputPinInterface(
-                    metadata={"generic": True, "hidden": True},
-                    sticky=True,
-                    json_schema=type_adapter.json_schema(),
-                    generics={},
-                    type=PinType.SINGLE,
-                    required=False,
-                    default=generic_schema.json_schema(),
-                    channel=False,
-                    virtual=False,
-                )
-            },
+            inputs={"": _get_generic_pin(type_var)},
             outputs={},
             type=PortType.SINGLE,
             is_function=False,
@@ -1156,76 +1154,521 @@ class BlockControlMessage(enum.Enum):
     DONE = "Done"
 
 
-block_messages: contextvars.ContextVar[
-    asyncio.queues.Queue[BlockRunMessage | BlockControlMessage]
-] = contextvars.ContextVar("block_messages")
+class OutputRecord(NamedTuple):
+    """An output as it is queued while a block function runs. Channel and
+    streaming outputs set ``event``, and their value is sent wrapped in an
+    OutputChannelMessage or StreamingOutputMessage."""
 
+    port: str
+    pin: str
+    value: Any
+    event: ChannelEvent | StreamingEvent | None = None
 
-class OutputChannel(Generic[T]):
-    def __init__(self, pin: BlockPinRef):
-        self.pin = pin
+    def to_model(self) -> OutputValue:
+        if self.event is None:
+            value = self.value
+        elif isinstance(self.event, StreamingEvent):
+            value = StreamingOutputMessage(event=self.event, data=self.value)
+        else:
+            value = OutputChannelMessage(event=self.event, data=self.value)
 
-    def send(self, value: T):
-        messages = block_messages.get()
-        messages.put_nowait(
-            BlockRunMessage(
-                outputs=[
-                    OutputValue(
-                        source=self.pin,
-                        value=OutputChannelMessage(
-                            data=value,
-                            event=ChannelEvent.DATA,
-                        ),
-                    )
-                ],
-                inputs=[],
-                redirects=[],
-                states=[],
-            )
+        return OutputValue(
+            source=BlockPinRef(port=self.port, pin=self.pin),
+            value=value,
         )
 
-    def close(self):
-        messages = block_messages.get()
-        messages.put_nowait(
-            BlockRunMessage(
-                outputs=[
-                    OutputValue(
-                        source=self.pin,
-                        value=OutputChannelMessage(
-                            data=None,
-                            event=ChannelEvent.CLOSE,
-                        ),
-                    )
-                ],
-                inputs=[],
-                redirects=[],
-                states=[],
-            )
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "source": {"port": self.port, "pin": self.pin},
+            "value": self.value
+            if self.event is None
+            else {"event": self.event, "data": self.value},
+        }
+
+
+class InputRecord(NamedTuple):
+    port: str
+    pin: str
+    value: Any
+
+    def to_model(self) -> InputValue:
+        return InputValue(
+            target=BlockPinRef(port=self.port, pin=self.pin),
+            value=self.value,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"target": {"port": self.port, "pin": self.pin}, "value": self.value}
+
+
+class RedirectRecord(NamedTuple):
+    source_port: str
+    source_pin: str
+    target_port: str
+    target_pin: str
+
+    def to_model(self) -> PinRedirect:
+        return PinRedirect(
+            source=BlockPinRef(port=self.source_port, pin=self.source_pin),
+            target=BlockPinRef(port=self.target_port, pin=self.target_pin),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "source": {"port": self.source_port, "pin": self.source_pin},
+            "target": {"port": self.target_port, "pin": self.target_pin},
+        }
+
+
+class StateRecord(NamedTuple):
+    state: str
+    value: Any
+
+    def to_model(self) -> StateValue:
+        return StateValue(state=self.state, value=self.value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"state": self.state, "value": self.value}
+
+
+class MessageRecord(NamedTuple):
+    """The internal form of a BlockRunMessage. Block functions queue records,
+    which are only converted to the pydantic models when they are read through
+    ``BlockFunctionCall`` or ``Block.get_messages()``. ``dump()`` and
+    ``dump_json()`` serialize a record exactly as
+    ``to_message().model_dump(by_alias=True, mode="json")`` would, without
+    building the models."""
+
+    outputs: Sequence[OutputRecord] = ()
+    inputs: Sequence[InputRecord] = ()
+    redirects: Sequence[RedirectRecord] = ()
+    states: Sequence[StateRecord] = ()
+
+    def to_message(self) -> BlockRunMessage:
+        return BlockRunMessage(
+            outputs=[o.to_model() for o in self.outputs],
+            inputs=[i.to_model() for i in self.inputs],
+            redirects=[r.to_model() for r in self.redirects],
+            states=[s.to_model() for s in self.states],
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "outputs": [o.to_dict() for o in self.outputs],
+            "errors": [],
+            "inputs": [i.to_dict() for i in self.inputs],
+            "redirects": [r.to_dict() for r in self.redirects],
+            "states": [s.to_dict() for s in self.states],
+        }
+
+    def dump(self) -> dict[str, Any]:
+        return pydantic_core.to_jsonable_python(self.to_dict(), by_alias=True)
+
+    def dump_json(self) -> bytes:
+        return pydantic_core.to_json(self.to_dict(), by_alias=True)
+
+
+class MessageQueueStats(NamedTuple):
+    max_messages: int
+    max_outputs: int
+    waits: int
+    wait_seconds: float
+    superseded_snapshots: int = 0
+
+
+class BlockMessageQueue(asyncio.queues.Queue[MessageRecord | BlockControlMessage]):
+    """The queue between a running block function and its consumer.
+
+    With a maxsize, ``put`` (used by ``Output.asend`` and the other async sends)
+    waits while the queue is full, which applies backpressure to the function.
+    ``put_nowait`` (used by the synchronous sends) never raises ``QueueFull``
+    and always queues the message. The queue records the most messages and
+    outputs it held at once, and how long producers waited for space.
+
+    Throttled streaming outputs queue their snapshots with ``put_snapshot``,
+    which replaces the pin's previous snapshot if it has not been read yet, and
+    register snapshots they are holding back with ``defer``, so they can be
+    sent with ``flush_deferred`` when the function returns or raises.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.max_messages = 0
+        self.max_outputs = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.superseded_snapshots = 0
+        self._outputs = 0
+        self._puts = 0
+        self._gets = 0
+        # Key of a streaming pin -> the number of the put of its last snapshot
+        self._snapshots: dict[Any, int] = {}
+        self._deferred: dict[Any, Callable[[], None]] = {}
+
+    def put_nowait(self, item: MessageRecord | BlockControlMessage):
+        maxsize, self._maxsize = self._maxsize, 0
+        try:
+            super().put_nowait(item)
+        finally:
+            self._maxsize = maxsize
+
+        self._puts += 1
+        if isinstance(item, MessageRecord):
+            self._outputs += len(item.outputs)
+
+        self.max_messages = max(self.max_messages, self.qsize())
+        self.max_outputs = max(self.max_outputs, self._outputs)
+
+    def get_nowait(self) -> MessageRecord | BlockControlMessage:
+        item = super().get_nowait()
+        self._gets += 1
+        if isinstance(item, MessageRecord):
+            self._outputs -= len(item.outputs)
+
+        return item
+
+    def snapshot_queued(self, key: Any) -> bool:
+        """Whether the last snapshot queued with the key has not been read yet."""
+        put = self._snapshots.get(key)
+        return put is not None and put >= self._gets
+
+    def put_snapshot(self, key: Any, record: MessageRecord):
+        """Queues a snapshot of a streaming output, or replaces the previous
+        snapshot queued with the same key if it has not been read yet. The
+        record must hold a single output."""
+        if self.snapshot_queued(key):
+            self._queue[self._snapshots[key] - self._gets] = record  # type: ignore
+            self.superseded_snapshots += 1
+            return
+
+        self.put_nowait(record)
+        self._snapshots[key] = self._puts - 1
+
+    def defer(self, key: Any, flush: Callable[[], None] | None):
+        """Registers (or with None, unregisters) a function that sends a
+        snapshot that is being held back."""
+        if flush is None:
+            self._deferred.pop(key, None)
+        else:
+            self._deferred[key] = flush
+
+    def flush_deferred(self):
+        for flush in list(self._deferred.values()):
+            flush()
+
+        self._deferred.clear()
+
+    async def put(self, item: MessageRecord | BlockControlMessage):
+        if not self.full():
+            return self.put_nowait(item)
+
+        self.waits += 1
+        start = time.perf_counter()
+        try:
+            await super().put(item)
+        finally:
+            self.wait_seconds += time.perf_counter() - start
+
+    def stats(self) -> MessageQueueStats:
+        return MessageQueueStats(
+            max_messages=self.max_messages,
+            max_outputs=self.max_outputs,
+            waits=self.waits,
+            wait_seconds=self.wait_seconds,
+            superseded_snapshots=self.superseded_snapshots,
+        )
+
+
+block_messages: contextvars.ContextVar[BlockMessageQueue] = contextvars.ContextVar(
+    "block_messages"
+)
+
+
+class _OutputPin:
+    """Base for the objects that send values to an output pin.
+
+    Blocks can have thousands of output pins (a ``list[Output[Any]]`` port gets
+    one per item), so these objects are slotted, and the pin can be given as a
+    ``(port, pin)`` tuple, in which case the ``BlockPinRef`` is only built when
+    it is first used.
+    """
+
+    __slots__ = ("_ref", "_pin")
+
+    def __init__(self, pin: BlockPinRef | tuple[str, str]):
+        if isinstance(pin, tuple):
+            self._ref = pin
+            self._pin: BlockPinRef | None = None
+        else:
+            self._ref = (pin.port, pin.pin)
+            self._pin = pin
+
+    @property
+    def pin(self) -> BlockPinRef:
+        if self._pin is None:
+            self._pin = BlockPinRef(port=self._ref[0], pin=self._ref[1])
+
+        return self._pin
+
+    def _send(self, value: Any, event: ChannelEvent | StreamingEvent | None):
+        port, pin = self._ref
+        block_messages.get().put_nowait(
+            MessageRecord(outputs=[OutputRecord(port, pin, value, event)])
+        )
+
+    async def _asend(self, value: Any, event: ChannelEvent | StreamingEvent | None):
+        port, pin = self._ref
+        await block_messages.get().put(
+            MessageRecord(outputs=[OutputRecord(port, pin, value, event)])
         )
 
 
-class Output(Generic[T]):
-    def __init__(self, pin: BlockPinRef):
-        self.pin = pin
+class OutputChannel(_OutputPin, Generic[T]):
+    __slots__ = ()
 
     def send(self, value: T):
+        self._send(value, ChannelEvent.DATA)
+
+    async def asend(self, value: T):
+        """Sends the value, waiting for space if the run's message queue is
+        bounded and full."""
+        await self._asend(value, ChannelEvent.DATA)
+
+    def close(self):
+        self._send(None, ChannelEvent.CLOSE)
+
+
+class Output(_OutputPin, Generic[T]):
+    __slots__ = ()
+
+    def send(self, value: T):
+        self._send(value, None)
+
+    async def asend(self, value: T):
+        """Sends the value, waiting for space if the run's message queue is
+        bounded and full."""
+        await self._asend(value, None)
+
+
+class StreamingThrottle(NamedTuple):
+    """Limits how many snapshots a StreamingOutput sends. Set it on a pin with
+    ``Metadata(max_updates_per_second=..., min_bytes_changed=...)``.
+
+    A snapshot is held back if it comes less than ``1 / max_updates_per_second``
+    seconds after the last one that was sent, or if its size differs from the
+    last one that was sent by less than ``min_bytes_changed`` (the length of
+    strings and bytes, or of the JSON of other values). A held snapshot is
+    replaced by newer ones, and is sent once the interval has passed, before
+    ``finalize`` and when the function returns. A snapshot that has been sent
+    but not yet read from the run's message queue is replaced in the queue.
+    """
+
+    max_updates_per_second: float | None = None
+    min_bytes_changed: int | None = None
+
+    @staticmethod
+    def from_metadata(metadata: Mapping[str, Any]) -> "StreamingThrottle | None":
+        throttle = StreamingThrottle(
+            max_updates_per_second=metadata.get("max_updates_per_second"),
+            min_bytes_changed=metadata.get("min_bytes_changed"),
+        )
+        if throttle == StreamingThrottle():
+            return None
+
+        if (
+            throttle.max_updates_per_second is not None
+            and throttle.max_updates_per_second <= 0
+        ):
+            raise Exception("max_updates_per_second must be greater than 0")
+
+        return throttle
+
+
+class StreamingDeltas(NamedTuple):
+    """Sends the snapshots of a StreamingOutput of text as deltas. Set it on a
+    pin with ``Metadata(delta=True)``, and optionally
+    ``delta_keyframe_interval``.
+
+    Each update after the first is sent as a DELTA message holding a
+    StreamingDelta: the length of the prefix it shares with the previous
+    snapshot and the text after it. After ``keyframe_interval`` deltas, and
+    whenever a snapshot is not a string or shares nothing with the previous
+    one, the full snapshot is sent as an UPDATE. ``finalize`` always sends the
+    full value. Consumers rebuild the snapshots with
+    ``smartspace.models.apply_streaming_message``.
+    """
+
+    keyframe_interval: int = 100
+
+    @staticmethod
+    def from_metadata(metadata: Mapping[str, Any]) -> "StreamingDeltas | None":
+        if not metadata.get("delta"):
+            return None
+
+        deltas = StreamingDeltas(
+            keyframe_interval=metadata.get("delta_keyframe_interval", 100)
+        )
+        if deltas.keyframe_interval < 1:
+            raise Exception("delta_keyframe_interval must be at least 1")
+
+        return deltas
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    if b.startswith(a):
+        return len(a)
+
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+class _DeltaEncoder:
+    __slots__ = ("keyframe_interval", "base", "last", "deltas")
+
+    def __init__(self, deltas: StreamingDeltas):
+        self.keyframe_interval = deltas.keyframe_interval
+        # The snapshot before the last one sent, and the last one sent
+        self.base: Any = None
+        self.last: Any = None
+        self.deltas = 0
+
+    def encode(
+        self, snapshot: Any, replace: bool = False
+    ) -> tuple[Any, StreamingEvent]:
+        """Returns the value and event to send for a snapshot. With ``replace``
+        the message replaces the last one sent before it was read, so it is
+        encoded relative to the snapshot before that one."""
+        if replace:
+            previous = self.base
+        else:
+            previous = self.base = self.last
+
+        self.last = snapshot
+
+        if (
+            isinstance(snapshot, str)
+            and isinstance(previous, str)
+            and self.deltas < self.keyframe_interval
+        ):
+            offset = _common_prefix_length(previous, snapshot)
+            if offset:
+                self.deltas += 1
+                return (
+                    StreamingDelta(offset=offset, text=snapshot[offset:]),
+                    StreamingEvent.DELTA,
+                )
+
+        self.deltas = 0
+        return snapshot, StreamingEvent.UPDATE
+
+
+def _snapshot_size(snapshot: Any) -> int:
+    if isinstance(snapshot, (str, bytes, bytearray)):
+        return len(snapshot)
+
+    return len(pydantic_core.to_json(snapshot))
+
+
+_NO_SNAPSHOT: Any = object()
+
+
+class _SnapshotThrottler:
+    __slots__ = (
+        "throttle",
+        "ref",
+        "encoder",
+        "interval",
+        "last_time",
+        "last_size",
+        "held",
+        "held_size",
+        "timer",
+    )
+
+    def __init__(
+        self,
+        ref: tuple[str, str],
+        throttle: StreamingThrottle,
+        encoder: _DeltaEncoder | None = None,
+    ):
+        self.throttle = throttle
+        self.ref = ref
+        self.encoder = encoder
+        self.interval = (
+            1 / throttle.max_updates_per_second
+            if throttle.max_updates_per_second
+            else 0.0
+        )
+        self.last_time = -float("inf")
+        self.last_size: int | None = None
+        self.held: Any = _NO_SNAPSHOT
+        self.held_size = 0
+        self.timer: asyncio.TimerHandle | None = None
+
+    def update(self, snapshot: Any):
+        size = _snapshot_size(snapshot) if self.throttle.min_bytes_changed else 0
+        loop = asyncio.get_running_loop()
+        wait = self.last_time + self.interval - loop.time()
         messages = block_messages.get()
-        messages.put_nowait(
-            BlockRunMessage(
-                outputs=[
-                    OutputValue(
-                        source=self.pin,
-                        value=value,
-                    )
-                ],
-                inputs=[],
-                redirects=[],
-                states=[],
-            )
+
+        if (
+            self.last_size is not None
+            and self.throttle.min_bytes_changed
+            and abs(size - self.last_size) < self.throttle.min_bytes_changed
+        ):
+            self._hold(snapshot, size, messages)
+        elif wait > 0:
+            self._hold(snapshot, size, messages)
+            if self.timer is None:
+                self.timer = loop.call_later(wait, self.flush)
+        else:
+            self._send(snapshot, size, messages)
+
+    def flush(self):
+        self.close()
+        if self.held is not _NO_SNAPSHOT:
+            self._send(self.held, self.held_size, block_messages.get())
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _hold(self, snapshot: Any, size: int, messages: BlockMessageQueue):
+        if self.held is _NO_SNAPSHOT:
+            messages.defer(self, self.flush)
+
+        self.held = snapshot
+        self.held_size = size
+
+    def _send(self, snapshot: Any, size: int, messages: BlockMessageQueue):
+        if self.held is not _NO_SNAPSHOT:
+            self.held = _NO_SNAPSHOT
+            messages.defer(self, None)
+
+        self.close()
+        self.last_time = asyncio.get_running_loop().time()
+        self.last_size = size
+
+        if self.encoder is not None:
+            value, event = self.encoder.encode(snapshot, messages.snapshot_queued(self))
+        else:
+            value, event = snapshot, StreamingEvent.UPDATE
+
+        port, pin = self.ref
+        messages.put_snapshot(
+            self, MessageRecord(outputs=[OutputRecord(port, pin, value, event)])
         )
 
 
-class StreamingOutput(Generic[T]):
+class StreamingOutput(_OutputPin, Generic[T]):
     """An output that represents a single logical value arriving in parts.
 
     Call ``update(snapshot)`` repeatedly during streaming; each snapshot
@@ -1236,54 +1679,63 @@ class StreamingOutput(Generic[T]):
     After ``finalize`` is called, further ``update`` / ``finalize`` calls
     are silently dropped — the pin is single-shot from the flow's
     perspective.
+
+    With a ``StreamingThrottle`` (see its docstring), superseded snapshots are
+    dropped rather than sent, and the latest one is always sent before the
+    final value. With ``StreamingDeltas``, snapshots of text are sent as deltas
+    to the previous snapshot.
     """
 
-    def __init__(self, pin: BlockPinRef):
-        self.pin = pin
+    __slots__ = ("_finalized", "_throttler", "_encoder")
+
+    def __init__(
+        self,
+        pin: BlockPinRef | tuple[str, str],
+        throttle: StreamingThrottle | None = None,
+        deltas: StreamingDeltas | None = None,
+    ):
+        super().__init__(pin)
         self._finalized = False
+        self._encoder = _DeltaEncoder(deltas) if deltas is not None else None
+        self._throttler = (
+            _SnapshotThrottler(self._ref, throttle, self._encoder)
+            if throttle is not None
+            else None
+        )
 
     def update(self, snapshot: T):
         if self._finalized:
             return
-        messages = block_messages.get()
-        messages.put_nowait(
-            BlockRunMessage(
-                outputs=[
-                    OutputValue(
-                        source=self.pin,
-                        value=StreamingOutputMessage(
-                            event=StreamingEvent.UPDATE,
-                            data=snapshot,
-                        ),
-                    )
-                ],
-                inputs=[],
-                redirects=[],
-                states=[],
-            )
-        )
+        if self._throttler is not None:
+            self._throttler.update(snapshot)
+            return
+        if self._encoder is not None:
+            self._send(*self._encoder.encode(snapshot))
+            return
+        self._send(snapshot, StreamingEvent.UPDATE)
+
+    async def aupdate(self, snapshot: T):
+        """Sends the snapshot, waiting for space if the run's message queue is
+        bounded and full. Throttled snapshots never wait, as a snapshot still in
+        the queue is replaced rather than followed by another one."""
+        if self._finalized:
+            return
+        if self._throttler is not None:
+            self._throttler.update(snapshot)
+            return
+        if self._encoder is not None:
+            await self._asend(*self._encoder.encode(snapshot))
+            return
+        await self._asend(snapshot, StreamingEvent.UPDATE)
 
     def finalize(self, value: T):
         if self._finalized:
             return
         self._finalized = True
-        messages = block_messages.get()
-        messages.put_nowait(
-            BlockRunMessage(
-                outputs=[
-                    OutputValue(
-                        source=self.pin,
-                        value=StreamingOutputMessage(
-                            event=StreamingEvent.FINALIZE,
-                            data=value,
-                        ),
-                    )
-                ],
-                inputs=[],
-                redirects=[],
-                states=[],
-            )
-        )
+        if self._throttler is not None:
+            self._throttler.flush()
+            self._throttler.close()
+        self._send(value, StreamingEvent.FINALIZE)
 
 
 class BlockError(Exception):
@@ -1309,9 +1761,172 @@ class ReadOnlyDict(Mapping):
         return iter(self._data)
 
 
+class InputPinView(NamedTuple):
+    type: PinType
+    default: Any
+    sticky: bool
+    required: bool
+    channel: bool
+    virtual: bool
+
+
+class OutputPinView(NamedTuple):
+    type: PinType
+    channel: bool
+    streaming: bool
+    channel_group_id: str | None
+    throttle: StreamingThrottle | None = None
+    deltas: StreamingDeltas | None = None
+
+
+class PortView(NamedTuple):
+    type: PortType
+    is_function: bool
+    inputs: Mapping[str, InputPinView]
+    outputs: Mapping[str, OutputPinView]
+
+
+class InterfaceView(NamedTuple):
+    """A frozen view of the runtime-relevant parts of a BlockInterface.
+
+    Views are built once per class and shared by every instance, so blocks
+    never need to deep copy their interface. Use Block.interface() to get a
+    mutable copy of the full interface.
+    """
+
+    source: BlockInterface
+    ports: Mapping[str, PortView]
+    state: tuple[str, ...]
+
+    @staticmethod
+    def from_interface(interface: BlockInterface) -> "InterfaceView":
+        return InterfaceView(
+            source=interface,
+            ports=types.MappingProxyType(
+                {
+                    port_name: PortView(
+                        type=port.type,
+                        is_function=port.is_function,
+                        inputs=types.MappingProxyType(
+                            {
+                                pin_name: InputPinView(
+                                    type=pin.type,
+                                    default=pin.default,
+                                    sticky=pin.sticky,
+                                    required=pin.required,
+                                    channel=pin.channel,
+                                    virtual=pin.virtual,
+                                )
+                                for pin_name, pin in port.inputs.items()
+                            }
+                        ),
+                        outputs=types.MappingProxyType(
+                            {
+                                pin_name: OutputPinView(
+                                    type=pin.type,
+                                    channel=pin.channel,
+                                    streaming=pin.streaming,
+                                    channel_group_id=pin.channel_group_id,
+                                    throttle=StreamingThrottle.from_metadata(
+                                        pin.metadata
+                                    )
+                                    if pin.streaming
+                                    else None,
+                                    deltas=StreamingDeltas.from_metadata(pin.metadata)
+                                    if pin.streaming
+                                    else None,
+                                )
+                                for pin_name, pin in port.outputs.items()
+                            }
+                        ),
+                    )
+                    for port_name, port in interface.ports.items()
+                }
+            ),
+            state=tuple(interface.state.keys()),
+        )
+
+
+class InterfaceHashes(NamedTuple):
+    """The content hashes of a block class's interface and of each of its ports.
+    Like InterfaceView, they are computed once per class interface, which is
+    never handed out to be modified."""
+
+    source: BlockInterface
+    block: str
+    ports: Mapping[str, str]
+
+    @staticmethod
+    def from_interface(interface: BlockInterface) -> "InterfaceHashes":
+        ports = {name: port.content_hash for name, port in interface.ports.items()}
+        return InterfaceHashes(
+            source=interface,
+            block=_get_block_content_hash(interface, ports),
+            ports=types.MappingProxyType(ports),
+        )
+
+
+class BlockSetDiff(NamedTuple):
+    added: dict[str, list[str]]
+    removed: dict[str, list[str]]
+    # Block name -> version -> names of the ports that were added, removed or
+    # changed. Empty when only block level fields (metadata, state...) changed
+    updated: dict[str, dict[str, list[str]]]
+
+
+class BlockInstancePool:
+    """Keeps constructed block instances for reuse. Released instances are reset
+    to the state they had after __init__, without running it again, so that
+    each run starts from a fresh-looking instance."""
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+        self._instances: dict[type[Block], list[Block]] = {}
+        self._attributes: dict[type[Block], frozenset[str]] = {}
+
+    def acquire(self, block_type: "type[Block]") -> "Block":
+        instances = self._instances.get(block_type)
+        if instances:
+            self.reused += 1
+            return instances.pop()
+
+        self.created += 1
+        block = block_type()
+        if block_type not in self._attributes:
+            self._attributes[block_type] = frozenset(block.__dict__)
+
+        return block
+
+    def release(self, block: "Block"):
+        block_type = type(block)
+        instances = self._instances.setdefault(block_type, [])
+        if len(instances) >= self.max_size:
+            return
+
+        # Instances created before the block's interface changed are dropped
+        if block._plan is not block_type._get_instance_plan():
+            return
+
+        block._reset(self._attributes[block_type])
+        instances.append(block)
+
+    @contextlib.contextmanager
+    def instance(self, block_type: "type[Block]") -> "Iterator[Block]":
+        """Acquires an instance for the body of the with statement. It is only
+        released back into the pool if the body did not raise, as a failed run
+        can leave the instance in any state."""
+        block = self.acquire(block_type)
+        yield block
+        self.release(block)
+
+
 class BlockSet:
     def __init__(self):
         self._blocks: dict[str, dict[str, type[Block]]] = {}
+        self._instance_pool: BlockInstancePool | None = None
+        self._pooled_blocks: frozenset[str] | None = None
 
     @property
     def all(self) -> "Mapping[str, dict[str, type[Block]]]":
@@ -1336,6 +1951,71 @@ class BlockSet:
 
         return versions[best_version]
 
+    def enable_instance_pool(
+        self, block_names: Iterable[str] | None = None, max_size: int = 16
+    ) -> BlockInstancePool:
+        """Reuses instances of the named blocks (all blocks if None) created with
+        instance(). Only suitable for blocks that keep no state outside of their
+        ports, State() attributes and attributes set while running."""
+        self._instance_pool = BlockInstancePool(max_size)
+        self._pooled_blocks = frozenset(block_names) if block_names else None
+        return self._instance_pool
+
+    def instance(
+        self, block_type: "type[Block]"
+    ) -> "contextlib.AbstractContextManager[Block]":
+        """Gets an instance of the block for a single run, from the instance pool
+        if it is enabled for the block."""
+        if self._instance_pool is not None and (
+            self._pooled_blocks is None or block_type.name in self._pooled_blocks
+        ):
+            return self._instance_pool.instance(block_type)
+
+        return contextlib.nullcontext(block_type())
+
+    def interface_hashes(self) -> dict[str, dict[str, str]]:
+        """Gets the content hash of the interface of every block."""
+        return {
+            name: {
+                version: block_type._get_interface_hashes().block
+                for version, block_type in versions.items()
+            }
+            for name, versions in self._blocks.items()
+        }
+
+    def diff(self, other: "BlockSet") -> BlockSetDiff:
+        """Compares the blocks in this set with the blocks in other, using interface
+        content hashes, and returns the changes from this set to other."""
+        added: dict[str, list[str]] = {}
+        removed: dict[str, list[str]] = {}
+        updated: dict[str, dict[str, list[str]]] = {}
+
+        for name, versions in other._blocks.items():
+            for version, block_type in versions.items():
+                old_block_type = self._blocks.get(name, {}).get(version)
+                if old_block_type is None:
+                    added.setdefault(name, []).append(version)
+                    continue
+
+                old_hashes = old_block_type._get_interface_hashes()
+                new_hashes = block_type._get_interface_hashes()
+                if old_hashes.block == new_hashes.block:
+                    continue
+
+                updated.setdefault(name, {})[version] = [
+                    port_name
+                    for port_name in {**old_hashes.ports, **new_hashes.ports}
+                    if old_hashes.ports.get(port_name)
+                    != new_hashes.ports.get(port_name)
+                ]
+
+        for name, versions in self._blocks.items():
+            for version in versions:
+                if version not in other._blocks.get(name, {}):
+                    removed.setdefault(name, []).append(version)
+
+        return BlockSetDiff(added=added, removed=removed, updated=updated)
+
 
 class MetaBlock(type):
     def __new__(cls, name, bases, attrs):
@@ -1355,12 +2035,16 @@ class MetaBlock(type):
         self._semantic_version: semantic_version.Version | None = None
         self._all_annotations_cache: dict[str, type] | None = None
         self._class_interface: BlockInterface | None = None
-        self._input_pin_type_adapters: dict[str, dict[str, TypeAdapter]] = {}
-        self._output_pin_type_adapters: dict[str, dict[str, TypeAdapter]] = {}
-        self._state_type_adapters: dict[str, TypeAdapter] = {}
+        self._interface_view: InterfaceView | None = None
+        self._interface_hashes: InterfaceHashes | None = None
+        self._instance_plan: "InstancePlan | None" = None
+        self._type_adapters_ready = False
+        self._input_pin_type_adapters: dict[str, dict[str, TypeAdapterLike]] = {}
+        self._output_pin_type_adapters: dict[str, dict[str, TypeAdapterLike]] = {}
+        self._state_type_adapters: dict[str, TypeAdapterLike] = {}
 
     def _set_input_pin_type_adapter(
-        self, port: str, pin: str, type_adapter: TypeAdapter
+        self, port: str, pin: str, type_adapter: TypeAdapterLike
     ):
         if port not in self._input_pin_type_adapters:
             self._input_pin_type_adapters[port] = {}
@@ -1368,7 +2052,7 @@ class MetaBlock(type):
         self._input_pin_type_adapters[port][pin] = type_adapter
 
     def _set_output_pin_type_adapter(
-        self, port: str, pin: str, type_adapter: TypeAdapter
+        self, port: str, pin: str, type_adapter: TypeAdapterLike
     ):
         if port not in self._output_pin_type_adapters:
             self._output_pin_type_adapters[port] = {}
@@ -1411,25 +2095,13 @@ class MetaBlock(type):
                         is_function=True,
                     )
 
-                    for generic_name, generic_schema in generics.items():
-                        type_adapter = TypeAdapter(dict[str, Any])
+                    for generic_name, type_var in generics.items():
+                        type_adapter = type_registry.lazy_type_adapter(dict[str, Any])
                         cls._set_input_pin_type_adapter(generic_name, "", type_adapter)
 
                         ports[generic_name] = PortInterface(
                             metadata={},
-                            inputs={
-                                "": InputPinInterface(
-                                    metadata={"generic": True, "hidden": True},
-                                    sticky=True,
-                                    json_schema=type_adapter.json_schema(),
-                                    generics={},
-                                    type=PinType.SINGLE,
-                                    required=False,
-                                    default=generic_schema.json_schema(),
-                                    channel=False,
-                                    virtual=False,
-                                )
-                            },
+                            inputs={"": _get_generic_pin(type_var)},
                             outputs={},
                             type=PortType.SINGLE,
                             is_function=False,
@@ -1496,9 +2168,57 @@ class MetaBlock(type):
                 state=state,
                 block_class=cls.block_class,
             )
+            cls._type_adapters_ready = True
 
         return cls._class_interface
 
+    def _get_interface_view(cls) -> InterfaceView:
+        interface = cls._get_interface()
+        if cls._interface_view is None or cls._interface_view.source is not interface:
+            cls._interface_view = InterfaceView.from_interface(interface)
+
+        return cls._interface_view
+
+    def _get_interface_hashes(cls) -> InterfaceHashes:
+        interface = cls._get_interface()
+        if (
+            cls._interface_hashes is None
+            or cls._interface_hashes.source is not interface
+        ):
+            cls._interface_hashes = InterfaceHashes.from_interface(interface)
+
+        return cls._interface_hashes
+
+    def _get_instance_plan(cls) -> "InstancePlan":
+        cls._ensure_type_adapters()
+        if (
+            cls._instance_plan is None
+            or cls._instance_plan.interface is not cls._get_interface_view()
+        ):
+            cls._instance_plan = _compile_instance_plan(cls)
+
+        return cls._instance_plan
+
+    def _ensure_type_adapters(cls):
+        """Builds the pin type adapters for a class whose interface was restored
+        from an InterfaceCache, without regenerating any JSON schemas."""
+        if cls._type_adapters_ready:
+            return
+
+        cached_interface = cls._class_interface
+        cls._class_interface = None
+        cls._input_pin_type_adapters = {}
+        cls._output_pin_type_adapters = {}
+        cls._state_type_adapters = {}
+
+        token = _skip_json_schemas.set(cached_interface is not None)
+        try:
+            cls._get_interface()
+        finally:
+            _skip_json_schemas.reset(token)
+            if cached_interface is not None:
+                cls._class_interface = cached_interface
+
     @property
     def semantic_version(cls):
         if not cls._semantic_version:
@@ -1525,11 +2245,21 @@ class MetaBlock(type):
         return cls._all_annotations_cache
 
 
+def _set_list_item(items: list[Any], index: int, value: Any):
+    if len(items) < index:
+        items.extend([None] * (index - len(items)))
+        items.append(value)
+    elif len(items) == index:
+        items.append(value)
+    else:
+        items[index] = value
+
+
 def _set_input_pin_value_on_port(
     port: Any,
     pin_name: str,
     pin_index: str | None,
-    pin_interface: InputPinInterface,
+    pin_interface: InputPinView,
     value: Any,
 ):
     if pin_interface.type == PinType.SINGLE:
@@ -1545,13 +2275,7 @@ def _set_input_pin_value_on_port(
             pin_list = []
             setattr(port, pin_name, pin_list)
 
-        if len(pin_list) < pin_index_int:
-            pin_list.extend([None] * (pin_index_int - len(pin_list)))
-            pin_list.append(value)
-        elif len(pin_list) == pin_index_int:
-            pin_list.append(value)
-        else:
-            pin_list[pin_index_int] = value
+        _set_list_item(pin_list, pin_index_int, value)
 
     elif pin_interface.type == PinType.DICTIONARY:
         pin_dict = getattr(port, pin_name, None)
@@ -1562,29 +2286,348 @@ def _set_input_pin_value_on_port(
         pin_dict[pin_index] = value
 
 
+class InputRoute(NamedTuple):
+    validate: Callable[[Any], Any]
+    set_value: Callable[["Block", Any], None]
+    adapter: TypeAdapterLike
+
+
+class InputBatch(NamedTuple):
+    """Validates every value of a request in a single pydantic-core call.
+
+    Each value is validated against its pin's schema and falls back to the raw
+    value when it does not match, the same result as validating the values one
+    at a time, but without raising and catching a ValidationError per value.
+    """
+
+    validator: SchemaValidator
+    setters: tuple[Callable[["Block", Any], None], ...]
+
+    @staticmethod
+    def from_routes(routes: "tuple[InputRoute, ...]") -> "InputBatch":
+        # Schemas of model types carry their own definitions, which cannot be
+        # nested side by side when pins share a model, so they are merged into a
+        # single definitions schema around the tuple
+        definitions: dict[str, core_schema.CoreSchema] = {}
+        schemas: list[core_schema.CoreSchema] = []
+        for route in routes:
+            schema = route.adapter.core_schema
+            if schema["type"] == "definitions":
+                for definition in schema["definitions"]:
+                    definitions.setdefault(definition["ref"], definition)  # type: ignore
+                schema = schema["schema"]
+
+            schemas.append(
+                core_schema.union_schema(
+                    [schema, core_schema.any_schema()], mode="left_to_right"
+                )
+            )
+
+        schema = core_schema.tuple_schema(schemas)
+        if definitions:
+            schema = core_schema.definitions_schema(schema, list(definitions.values()))
+
+        return InputBatch(
+            validator=SchemaValidator(schema),
+            setters=tuple(route.set_value for route in routes),
+        )
+
+
+def _ignore_input(block: "Block", value: Any): ...
+
+
+def _get_list_port_index(port_index: str) -> int:
+    try:
+        return int(port_index)
+    except ValueError:
+        raise ValueError("Indexes on list Ports must be valid integers")
+
+
+def _compile_input_route(
+    block_type: MetaBlock,
+    interface: InterfaceView,
+    target_port: str,
+    target_pin: str,
+) -> InputRoute:
+    port_path = target_port.split(".")
+    port_name = port_path[0]
+    port_index = port_path[1] if len(port_path) > 1 else ""
+
+    pin_path = target_pin.split(".")
+    pin_name = pin_path[0]
+    pin_index = pin_path[1] if len(pin_path) > 1 else ""
+
+    adapter = block_type._input_pin_type_adapters[port_name][pin_name]
+
+    def validate(value: Any) -> Any:
+        try:
+            return adapter.validate_python(value)
+        except ValidationError:
+            return value
+
+    port_interface = interface.ports.get(port_name)
+    pin_interface = port_interface.inputs.get(pin_name) if port_interface else None
+
+    if port_interface is None or pin_interface is None:
+        return InputRoute(validate, _ignore_input, adapter)
+
+    if port_interface.is_function:
+
+        def set_function_input(block: "Block", value: Any):
+            pending_inputs = getattr(block, port_name)._pending_inputs
+            if pin_name not in pending_inputs:
+                pending_inputs[pin_name] = {}
+            pending_inputs[pin_name][pin_index] = value
+
+        return InputRoute(validate, set_function_input, adapter)
+
+    if pin_name == "":
+        assert pin_interface.type == PinType.SINGLE
+
+        if port_interface.type == PortType.LIST:
+            port_index_int = _get_list_port_index(port_index)
+            return InputRoute(
+                validate,
+                lambda block, value: _set_list_item(
+                    getattr(block, port_name), port_index_int, value
+                ),
+                adapter,
+            )
+
+        if port_interface.type == PortType.DICTIONARY:
+            return InputRoute(
+                validate,
+                lambda block, value: getattr(block, port_name).__setitem__(
+                    port_index, value
+                ),
+                adapter,
+            )
+
+        return InputRoute(
+            validate, lambda block, value: setattr(block, port_name, value), adapter
+        )
+
+    if port_interface.type == PortType.LIST:
+        port_index_int = _get_list_port_index(port_index)
+
+        def get_port(block: "Block") -> Any:
+            return getattr(block, port_name)[port_index_int]
+
+    elif port_interface.type == PortType.DICTIONARY:
+
+        def get_port(block: "Block") -> Any:
+            return getattr(block, port_name)[port_index]
+
+    else:
+
+        def get_port(block: "Block") -> Any:
+            return getattr(block, port_name)
+
+    return InputRoute(
+        validate,
+        lambda block, value: _set_input_pin_value_on_port(
+            get_port(block),
+            pin_name=pin_name,
+            pin_index=pin_index,
+            pin_interface=pin_interface,
+            value=value,
+        ),
+        adapter,
+    )
+
+
+class InputRouter:
+    """Maps InputValue targets to compiled InputRoutes for a block class.
+
+    Routes to pins that are not indexed are compiled up front, routes to
+    indexed paths (e.g. "items.3") are compiled on first use and kept in an
+    LRU cache, so routing an input is a dictionary lookup in both cases.
+    """
+
+    def __init__(
+        self,
+        block_type: MetaBlock,
+        interface: InterfaceView,
+        maxsize: int | None = 4096,
+    ):
+        compile_route = functools.partial(_compile_input_route, block_type, interface)
+        self._routes: dict[tuple[str, str], InputRoute] = {}
+        self._get_indexed_route = functools.lru_cache(maxsize=maxsize)(compile_route)
+        self._get_batch = functools.lru_cache(maxsize=256)(self._compile_batch)
+
+        for port_name, port in interface.ports.items():
+            if port.type != PortType.SINGLE:
+                continue
+
+            for pin_name, pin in port.inputs.items():
+                if pin.type == PinType.SINGLE:
+                    self._routes[(port_name, pin_name)] = compile_route(
+                        port_name, pin_name
+                    )
+
+    def get(self, port: str, pin: str) -> InputRoute:
+        route = self._routes.get((port, pin))
+        if route is None:
+            route = self._get_indexed_route(port, pin)
+
+        return route
+
+    def _compile_batch(self, targets: tuple[tuple[str, str], ...]) -> InputBatch:
+        return InputBatch.from_routes(tuple(self.get(*target) for target in targets))
+
+    def get_batch(self, targets: tuple[tuple[str, str], ...]) -> InputBatch:
+        """Gets the InputBatch for a sequence of (port, pin) targets. Batches are
+        cached per input shape, so repeated requests reuse the same validator."""
+        return self._get_batch(targets)
+
+
+class InstancePlan(NamedTuple):
+    """Everything Block.__init__ needs that is identical for every instance of a
+    block class. Compiled once per class by MetaBlock._get_instance_plan."""
+
+    interface: InterfaceView
+    functions: tuple[str, ...]
+    dynamic_ports: tuple[str, ...]
+    ports: tuple[tuple[str, Callable[["Block"], Any]], ...]
+    defaults: Mapping[str, Mapping[str, Any]]
+    input_router: InputRouter
+
+
+def _create_output(
+    pin: OutputPinView, ref: tuple[str, str]
+) -> Output | OutputChannel | StreamingOutput:
+    if pin.channel:
+        return OutputChannel(ref)
+    elif pin.streaming:
+        return StreamingOutput(ref, pin.throttle, pin.deltas)
+    else:
+        return Output(ref)
+
+
+def _index_dynamic_pins(
+    index: dict[tuple[str, str], dict[str, list[str]]],
+    pins: list[BlockPinRef],
+):
+    for pin in pins:
+        port_name, _, port_index = pin.port.partition(".")
+        pin_name, _, pin_index = pin.pin.partition(".")
+        index.setdefault((port_name, port_index), {}).setdefault(pin_name, []).append(
+            pin_index
+        )
+
+
+def _compile_port_factory(
+    port_name: str,
+    port: PortView,
+    defaults: Mapping[str, Any],
+) -> Callable[["Block"], Any]:
+    if port.type == PortType.LIST:
+        return lambda block: []
+
+    if port.type == PortType.DICTIONARY:
+        return lambda block: {}
+
+    if len(port.inputs) + len(port.outputs) == 1:
+        if "" in port.inputs:
+            default = defaults[""]
+            return lambda block: _copy_default(default)
+
+        if "" in port.outputs:
+            pin = port.outputs[""]
+            return lambda block: _create_output(pin, (port_name, ""))
+
+    return lambda block: block._create_port(port_name, "")
+
+
+def _compile_instance_plan(block_type: MetaBlock) -> InstancePlan:
+    interface = block_type._get_interface_view()
+
+    defaults: dict[str, Mapping[str, Any]] = {}
+    for port_name, port in interface.ports.items():
+        adapters = block_type._input_pin_type_adapters.get(port_name, {})
+        defaults[port_name] = types.MappingProxyType(
+            {
+                pin_name: None
+                if pin.default is None
+                else adapters[pin_name].validate_python(pin.default)
+                for pin_name, pin in port.inputs.items()
+            }
+        )
+
+    return InstancePlan(
+        interface=interface,
+        functions=tuple(
+            attribute_name
+            for attribute_name in dir(block_type)
+            if _issubclass(type(getattr(block_type, attribute_name)), BlockFunction)
+        ),
+        dynamic_ports=tuple(
+            port_name
+            for port_name, port in interface.ports.items()
+            if port.type == PortType.LIST or port.type == PortType.DICTIONARY
+        ),
+        ports=tuple(
+            (port_name, _compile_port_factory(port_name, port, defaults[port_name]))
+            for port_name, port in interface.ports.items()
+        ),
+        defaults=types.MappingProxyType(defaults),
+        input_router=InputRouter(block_type, interface),
+    )
+
+
 class Block(metaclass=MetaBlock):
     error: Annotated[Output[BlockErrorModel], Metadata(hidden=True)]
 
     def __init__(self):
-        self._interface = self.interface()
+        plan = self.__class__._get_instance_plan()
+        self._plan = plan
+        self._interface = plan.interface
 
         self._has_run = False
-        self._messages: list[BlockRunMessage] = []
-        self._dynamic_ports: dict[str, list[str]] = {}
-        self._dynamic_inputs: list[tuple[tuple[str, str], tuple[str, str]]] = []
-        self._dynamic_outputs: list[tuple[tuple[str, str], tuple[str, str]]] = []
+        self._messages: list[MessageRecord] = []
+        self._dynamic_ports: dict[str, list[str]] = {
+            port_name: [] for port_name in plan.dynamic_ports
+        }
+        # Dynamic pin indexes, by (port name, port index) and then by pin name
+        self._dynamic_inputs: dict[tuple[str, str], dict[str, list[str]]] = {}
+        self._dynamic_outputs: dict[tuple[str, str], dict[str, list[str]]] = {}
         self._tools: list[Tool] = []
 
-        for attribute_name in dir(self):
-            attribute = getattr(self, attribute_name)
+        for function_name in plan.functions:
+            setattr(self, function_name, getattr(self, function_name).create(self))
+
+        for port_name, create_port in plan.ports:
+            setattr(self, port_name, create_port(self))
+
+    def _reset(self, attributes: frozenset[str]):
+        """Resets the block to the state it had after __init__, which set the given
+        instance attributes, so that it can run again."""
+        for name in [name for name in self.__dict__ if name not in attributes]:
+            del self.__dict__[name]
+
+        plan = self._plan
+        self._has_run = False
+        self._messages = []
+        self._dynamic_ports = {port_name: [] for port_name in plan.dynamic_ports}
+        self._dynamic_inputs = {}
+        self._dynamic_outputs = {}
+        self._tools = []
 
-            if _issubclass(type(attribute), BlockFunction):
-                new_attribute = attribute.create(self)
-                setattr(self, attribute_name, new_attribute)
+        for function_name in plan.functions:
+            getattr(self, function_name)._pending_inputs = {}
 
-        self._create_all_ports()
+        for port_name, create_port in plan.ports:
+            setattr(self, port_name, create_port(self))
 
-    def _run_function(self, name: str):
+    def _get_pin_default(self, port_name: str, pin_name: str) -> Any:
+        return _copy_default(self._plan.defaults[port_name][pin_name])
+
+    def _run_function(
+        self,
+        name: str,
+        coalescing: "MessageCoalescing | None" = None,
+        max_queued_messages: int = 0,
+    ):
         function = getattr(self, name, None)
         if function is None:
             raise ValueError(f"Could not find function '{name}'")
@@ -1592,7 +2635,7 @@ class Block(metaclass=MetaBlock):
         if not isinstance(function, BlockFunction):
             raise ValueError(f"'{name}' is not a BlockFunction")
 
-        return function._run()
+        return function._run(coalescing, max_queued_messages)
 
     def _load(
         self,
@@ -1602,6 +2645,7 @@ class Block(metaclass=MetaBlock):
         dynamic_ports: list[str] | None = None,
         dynamic_output_pins: list[BlockPinRef] | None = None,
         dynamic_input_pins: list[BlockPinRef] | None = None,
+        batch_inputs: bool = False,
     ):
         if (
             (dynamic_input_pins and len(dynamic_input_pins))
@@ -1619,13 +2663,14 @@ class Block(metaclass=MetaBlock):
             self._set_state(state)
 
         if inputs:
-            self._set_inputs(inputs)
+            self._set_inputs(inputs, batched=batch_inputs)
 
-    def get_messages(self):
-        return copy.copy(self._messages)
+    def get_messages(self) -> list[BlockRunMessage]:
+        return [m.to_message() for m in self._messages]
 
     @classmethod
-    def interface(cls):
+    def interface(cls) -> BlockInterface:
+        """Returns a mutable deep copy of the block's interface."""
         return cls._get_interface().model_copy(deep=True)
 
     def _create_all_ports(
@@ -1634,7 +2679,7 @@ class Block(metaclass=MetaBlock):
         dynamic_input_pins: list[BlockPinRef] | None = None,
         dynamic_output_pins: list[BlockPinRef] | None = None,
     ):
-        for port_name, port_interface in self.interface().ports.items():
+        for port_name, port_interface in self._interface.ports.items():
             if (
                 port_interface.type == PortType.LIST
                 or port_interface.type == PortType.DICTIONARY
@@ -1651,36 +2696,12 @@ class Block(metaclass=MetaBlock):
                     self._dynamic_ports[port_name].append(port_index)
 
         if dynamic_input_pins:
-            for i in dynamic_input_pins:
-                port_path = i.port.split(".")
-                pin_path = i.port.split(".")
-
-                port_name = port_path[0]
-                port_index = port_path[1] if len(port_path) == 2 else ""
-
-                self._dynamic_inputs.append(
-                    (
-                        (port_name, port_index),
-                        (pin_path[0], pin_path[1] if len(pin_path) == 2 else ""),
-                    )
-                )
+            _index_dynamic_pins(self._dynamic_inputs, dynamic_input_pins)
 
         if dynamic_output_pins:
-            for i in dynamic_output_pins:
-                port_path = i.port.split(".")
-                pin_path = i.port.split(".")
-
-                port_name = port_path[0]
-                port_index = port_path[1] if len(port_path) == 2 else ""
-
-                self._dynamic_outputs.append(
-                    (
-                        (port_name, port_index),
-                        (pin_path[0], pin_path[1] if len(pin_path) == 2 else ""),
-                    )
-                )
+            _index_dynamic_pins(self._dynamic_outputs, dynamic_output_pins)
 
-        for port_name, port_interface in self.interface().ports.items():
+        for port_name, port_interface in self._interface.ports.items():
             if port_interface.type == PortType.SINGLE:
                 setattr(
                     self,
@@ -1719,98 +2740,23 @@ class Block(metaclass=MetaBlock):
 
             setattr(self, s.state, value)
 
-    def _set_inputs(self, inputs: list[InputValue]):
-        for input_value in inputs:
-            port_path = input_value.target.port.split(".")
-            port_name = port_path[0]
-            if len(port_path) > 1:
-                port_index = port_path[1]
-            else:
-                port_index = ""
-
-            pin_path = input_value.target.pin.split(".")
-            pin_name = pin_path[0]
-            if len(pin_path) > 1:
-                pin_index = pin_path[1]
-            else:
-                pin_index = ""
-
-            adapter = self.__class__._input_pin_type_adapters[port_name][pin_name]
-
-            try:
-                value = adapter.validate_python(input_value.value)
-            except ValidationError:
-                value = input_value.value
-
-            if (
-                port_name in self.interface().ports
-                and pin_name in self.interface().ports[port_name].inputs
-            ):
-                port_interface = self.interface().ports[port_name]
-                pin_interface = port_interface.inputs[pin_name]
-
-                if port_interface.is_function:
-                    port: BlockFunction = getattr(self, port_name)
-                    if pin_name not in port._pending_inputs:
-                        port._pending_inputs[pin_name] = {}
-                    port._pending_inputs[pin_name][pin_index] = value
-
-                else:
-                    if pin_name == "":
-                        assert pin_interface.type == PinType.SINGLE
-
-                        if port_interface.type == PortType.SINGLE:
-                            setattr(self, port_name, value)
-
-                        elif port_interface.type == PortType.LIST:
-                            try:
-                                port_index_int = int(port_index)
-                            except ValueError:
-                                raise ValueError(
-                                    "Indexes on list Ports must be valid integers"
-                                )
-
-                            port_list: list[Any] = getattr(self, port_name)
+    def _set_inputs(self, inputs: list[InputValue], batched: bool = False):
+        input_router = self._plan.input_router
 
-                            if len(port_list) < port_index_int:
-                                port_list.extend(
-                                    [None] * (port_index_int - len(port_list))
-                                )
-                                port_list.append(value)
-                            elif len(port_list) == port_index_int:
-                                port_list.append(value)
-                            else:
-                                port_list[port_index_int] = value
-
-                        elif port_interface.type == PortType.DICTIONARY:
-                            port_dict: dict[str, Any] = getattr(self, port_name)
-                            port_dict[port_index] = value
-                    else:
-                        if port_interface.type == PortType.SINGLE:
-                            port = getattr(self, port_name)
-
-                        elif port_interface.type == PortType.LIST:
-                            try:
-                                port_index_int = int(port_index)
-                            except ValueError:
-                                raise ValueError(
-                                    "Indexes on list Ports must be valid integers"
-                                )
-
-                            port_list = getattr(self, port_name)
-                            port = port_list[port_index_int]
+        if batched:
+            batch = input_router.get_batch(
+                tuple((i.target.port, i.target.pin) for i in inputs)
+            )
+            values = batch.validator.validate_python(tuple(i.value for i in inputs))
+            for set_value, value in zip(batch.setters, values):
+                set_value(self, value)
 
-                        elif port_interface.type == PortType.DICTIONARY:
-                            port_dict = getattr(self, port_name)
-                            port = port_dict[port_index]
+            return
 
-                        _set_input_pin_value_on_port(
-                            port,
-                            pin_name=pin_name,
-                            pin_index=pin_index,
-                            pin_interface=pin_interface,
-                            value=value,
-                        )
+        for input_value in inputs:
+            target = input_value.target
+            route = input_router.get(target.port, target.pin)
+            route.set_value(self, route.validate(input_value.value))
 
     def _create_port(
         self,
@@ -1819,41 +2765,17 @@ class Block(metaclass=MetaBlock):
     ) -> Any:
         port_id = port_name if not port_index else f"{port_name}.{port_index}"
 
-        port_interface = self.interface().ports[port_name]
-        dynamic_inputs: list[tuple[str, str]] = []
-        for (_port_name, _port_index), (
-            _input_name,
-            _input_index,
-        ) in self._dynamic_inputs:
-            if _port_name == port_name and _port_index == port_index:
-                dynamic_inputs.append((_input_name, _input_index))
-
-        dynamic_outputs: list[tuple[str, str]] = []
-        for (_port_name, _port_index), (
-            _output_name,
-            _output_index,
-        ) in self._dynamic_outputs:
-            if _port_name == port_name and _port_index == port_index:
-                dynamic_outputs.append((_output_name, _output_index))
+        port_interface = self._interface.ports[port_name]
+        dynamic_inputs = self._dynamic_inputs.get((port_name, port_index), {})
+        dynamic_outputs = self._dynamic_outputs.get((port_name, port_index), {})
 
         if len(port_interface.inputs) + len(port_interface.outputs) == 1 and (
             "" in port_interface.inputs or "" in port_interface.outputs
         ):
             if "" in port_interface.inputs:
-                input_interface = port_interface.inputs[""]
-                type_adapter = self._input_pin_type_adapters[port_name][""]
-                return (
-                    None
-                    if input_interface.default is None
-                    else type_adapter.validate_python(input_interface.default)
-                )
+                return self._get_pin_default(port_name, "")
             elif "" in port_interface.outputs:
-                if port_interface.outputs[""].channel:
-                    return OutputChannel(BlockPinRef(port=port_id, pin=""))
-                elif port_interface.outputs[""].streaming:
-                    return StreamingOutput(BlockPinRef(port=port_id, pin=""))
-                else:
-                    return Output(BlockPinRef(port=port_id, pin=""))
+                return _create_output(port_interface.outputs[""], (port_id, ""))
 
         tool_port = None
         if port_interface.is_function:
@@ -1879,56 +2801,31 @@ class Block(metaclass=MetaBlock):
                 port = port_type()
 
         for input_name, input_interface in port_interface.inputs.items():
-            type_adapter = self._input_pin_type_adapters[port_name][input_name]
-
             if input_interface.type == PinType.SINGLE:
-                setattr(
-                    port,
-                    input_name,
-                    None
-                    if input_interface.default is None
-                    else type_adapter.validate_python(input_interface.default),
-                )
+                setattr(port, input_name, self._get_pin_default(port_name, input_name))
 
             elif input_interface.type == PinType.LIST:
                 _dynamic_inputs = [
-                    int(index)
-                    for _input_name, index in dynamic_inputs
-                    if _input_name == input_name
+                    int(index) for index in dynamic_inputs.get(input_name, [])
                 ]
                 inputs = [None] * (max(_dynamic_inputs, default=-1) + 1)
 
                 for index in _dynamic_inputs:
-                    inputs[index] = (
-                        None
-                        if input_interface.default is None
-                        else type_adapter.validate_python(input_interface.default)
-                    )
+                    inputs[index] = self._get_pin_default(port_name, input_name)
 
                 setattr(port, input_name, inputs)
 
             elif input_interface.type == PinType.DICTIONARY:
                 input_dict = {
-                    index: None
-                    if input_interface.default is None
-                    else type_adapter.validate_python(input_interface.default)
-                    for _input_name, index in dynamic_inputs
-                    if _input_name == input_name
+                    index: self._get_pin_default(port_name, input_name)
+                    for index in dynamic_inputs.get(input_name, [])
                 }
 
                 setattr(port, input_name, input_dict)
 
         for output_name, output_interface in port_interface.outputs.items():
             if output_interface.type == PinType.SINGLE:
-                if output_interface.channel:
-                    output = OutputChannel(BlockPinRef(port=port_id, pin=output_name))
-                elif output_interface.streaming:
-                    output = StreamingOutput(
-                        BlockPinRef(port=port_id, pin=output_name)
-                    )
-                else:
-                    output = Output(BlockPinRef(port=port_id, pin=output_name))
-
+                output = _create_output(output_interface, (port_id, output_name))
                 setattr(port, output_name, output)
 
                 if tool_port:
@@ -1936,27 +2833,16 @@ class Block(metaclass=MetaBlock):
 
             elif output_interface.type == PinType.LIST:
                 _dynamic_outputs = [
-                    int(index)
-                    for _output_name, index in dynamic_outputs
-                    if _output_name == output_name
+                    int(index) for index in dynamic_outputs.get(output_name, [])
                 ]
                 outputs: list[None | Output | OutputChannel | StreamingOutput] = [
                     None
                 ] * (max(_dynamic_outputs, default=-1) + 1)
 
                 for index in _dynamic_outputs:
-                    if output_interface.channel:
-                        outputs[index] = OutputChannel(
-                            BlockPinRef(port=port_id, pin=output_name)
-                        )
-                    elif output_interface.streaming:
-                        outputs[index] = StreamingOutput(
-                            BlockPinRef(port=port_id, pin=output_name)
-                        )
-                    else:
-                        outputs[index] = Output(
-                            BlockPinRef(port=port_id, pin=output_name)
-                        )
+                    outputs[index] = _create_output(
+                        output_interface, (port_id, output_name)
+                    )
 
                 setattr(port, output_name, outputs)
 
@@ -1966,21 +2852,9 @@ class Block(metaclass=MetaBlock):
                     )
 
             elif output_interface.type == PinType.DICTIONARY:
-                def _make_output(pin_ref: BlockPinRef):
-                    if output_interface.channel:
-                        return OutputChannel(pin_ref)
-                    if output_interface.streaming:
-                        return StreamingOutput(pin_ref)
-                    return Output(pin_ref)
-
-                output_dict: dict[
-                    str, Output | OutputChannel | StreamingOutput
-                ] = {
-                    index: _make_output(
-                        BlockPinRef(port=port_id, pin=output_name)
-                    )
-                    for _output_name, index in dynamic_outputs
-                    if _output_name == output_name
+                output_dict: dict[str, Output | OutputChannel | StreamingOutput] = {
+                    index: _create_output(output_interface, (port_id, output_name))
+                    for index in dynamic_outputs.get(output_name, [])
                 }
                 setattr(port, output_name, output_dict)
 
@@ -2021,11 +2895,11 @@ class CallbackCall(NamedTuple):
 
 
 class ToolCall(Generic[R]):
-    def __init__(self, port_name: str, outputs: list[OutputValue]):
+    def __init__(self, port_name: str, outputs: list[OutputRecord]):
         self.port_name = port_name
         self.outputs = outputs
-        self.inputs: list[InputValue] = []
-        self.redirects: list[PinRedirect] = []
+        self.inputs: list[InputRecord] = []
+        self.redirects: list[RedirectRecord] = []
 
     def then(
         self,
@@ -2036,27 +2910,10 @@ class ToolCall(Generic[R]):
         )
 
         for name, value in other_params.items():
-            self.inputs.append(
-                InputValue(
-                    target=BlockPinRef(
-                        port=callback_name,
-                        pin=name,
-                    ),
-                    value=value,
-                )
-            )
+            self.inputs.append(InputRecord(callback_name, name, value))
 
         self.redirects.append(
-            PinRedirect(
-                source=BlockPinRef(
-                    port=self.port_name,
-                    pin="return",
-                ),
-                target=BlockPinRef(
-                    port=callback_name,
-                    pin=dummy_value_param,
-                ),
-            )
+            RedirectRecord(self.port_name, "return", callback_name, dummy_value_param)
         )
 
         return self
@@ -2065,17 +2922,115 @@ class ToolCall(Generic[R]):
         messages = block_messages.get()
 
         messages.put_nowait(
-            BlockRunMessage(
+            MessageRecord(
                 outputs=self.outputs,
                 inputs=self.inputs,
                 redirects=self.redirects,
-                states=[],
             )
         )
 
         yield
 
 
+class CallPlan(NamedTuple):
+    """The parameter layout of a step, callback or tool function, analysed once
+    per function rather than on every call. The first parameter (the block or
+    tool instance) is not part of the plan."""
+
+    signature: inspect.Signature
+    parameters: tuple[inspect.Parameter, ...]
+    positional: tuple[str, ...]
+    keyword: frozenset[str]
+    var_positional: str | None
+    var_keyword: str | None
+    has_return: bool
+
+    def bind(self, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Binds the arguments of a call to the plan's parameters, in parameter
+        order and with defaults applied, like ``Signature.bind``."""
+        arguments: dict[str, Any] = dict(zip(self.positional, args))
+
+        extra_args = args[len(self.positional) :]
+        if self.var_positional is not None:
+            arguments[self.var_positional] = extra_args
+        elif extra_args:
+            return self._bind_slow(args, kwargs)
+
+        extra_kwargs: dict[str, Any] = {}
+        for name, value in kwargs.items():
+            if name in arguments:
+                return self._bind_slow(args, kwargs)
+            elif name in self.keyword:
+                arguments[name] = value
+            elif self.var_keyword is not None:
+                extra_kwargs[name] = value
+            else:
+                return self._bind_slow(args, kwargs)
+
+        if self.var_keyword is not None:
+            arguments[self.var_keyword] = extra_kwargs
+
+        bound: dict[str, Any] = {}
+        for p in self.parameters:
+            if p.name in arguments:
+                bound[p.name] = arguments[p.name]
+            elif p.default is not p.empty:
+                bound[p.name] = p.default
+            else:
+                return self._bind_slow(args, kwargs)
+
+        return bound
+
+    def _bind_slow(self, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        # Only reached for calls that do not fit the plan, so that errors are
+        # raised exactly as Signature.bind raises them
+        binding = self.signature.bind(None, *args, **kwargs)
+        binding.apply_defaults()
+        arguments = dict(binding.arguments)
+        arguments.pop(next(iter(self.signature.parameters)))
+        return arguments
+
+
+# Weakly keyed, so that the functions of reloaded block modules, and through them
+# the modules' globals, are not kept alive by their plans
+_call_plans: "weakref.WeakKeyDictionary[Callable, CallPlan]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_call_plan(fn: Callable) -> CallPlan:
+    plan = _call_plans.get(fn)
+    if plan is None:
+        plan = _call_plans[fn] = _compile_call_plan(fn)
+
+    return plan
+
+
+def _compile_call_plan(fn: Callable) -> CallPlan:
+    signature = inspect.signature(fn)
+    parameters = tuple(signature.parameters.values())[1:]
+
+    return CallPlan(
+        signature=signature,
+        parameters=parameters,
+        positional=tuple(
+            p.name
+            for p in parameters
+            if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+        ),
+        keyword=frozenset(
+            p.name
+            for p in parameters
+            if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+        ),
+        var_positional=next(
+            (p.name for p in parameters if p.kind == p.VAR_POSITIONAL), None
+        ),
+        var_keyword=next((p.name for p in parameters if p.kind == p.VAR_KEYWORD), None),
+        has_return=signature.return_annotation is not inspect._empty,
+    )
+
+
 class Tool(Generic[P, T], abc.ABC):
     metadata: ClassVar[dict] = {}
 
@@ -2087,60 +3042,34 @@ class Tool(Generic[P, T], abc.ABC):
     def run(self, *args: P.args, **kwargs: P.kwargs) -> T: ...
 
     def call(self, *args: P.args, **kwargs: P.kwargs) -> ToolCall[T]:
-        s = inspect.signature(self.__class__.run)
-        binding = s.bind(self, *args, **kwargs)
-        binding.apply_defaults()
+        plan = _get_call_plan(self.__class__.run)
+        arguments = plan.bind(args, kwargs)
 
-        single_outputs: list[OutputValue] = []
-        list_outputs: list[OutputValue] = []
-        dictionary_outputs: list[OutputValue] = []
+        single_outputs: list[OutputRecord] = []
+        list_outputs: list[OutputRecord] = []
+        dictionary_outputs: list[OutputRecord] = []
 
-        for name, p in s.parameters.items():
-            if name == "self":
-                continue
-
-            value = binding.arguments[name]
+        for p in plan.parameters:
+            name = p.name
+            value = arguments[name]
 
             if p.kind == p.POSITIONAL_OR_KEYWORD or p.kind == p.KEYWORD_ONLY:
                 single_outputs.append(
-                    OutputValue(
-                        source=BlockPinRef(
-                            port=self.port_name,
-                            pin=name,
-                        ),
-                        value=OutputChannelMessage(
-                            data=value,
-                            event=ChannelEvent.DATA,
-                        ),
-                    )
+                    OutputRecord(self.port_name, name, value, ChannelEvent.DATA)
                 )
             elif p.kind == p.VAR_POSITIONAL:
                 for i, v in enumerate(value):
                     list_outputs.append(
-                        OutputValue(
-                            source=BlockPinRef(
-                                port=self.port_name,
-                                pin=f"{name}.{i}",
-                            ),
-                            value=OutputChannelMessage(
-                                data=v,
-                                event=ChannelEvent.DATA,
-                            ),
+                        OutputRecord(
+                            self.port_name, f"{name}.{i}", v, ChannelEvent.DATA
                         )
                     )
             elif p.kind == p.VAR_KEYWORD:
                 value = cast(dict[str, Any], value)
                 for i, v in value.items():
                     dictionary_outputs.append(
-                        OutputValue(
-                            source=BlockPinRef(
-                                port=self.port_name,
-                                pin=f"{name}.{i}",
-                            ),
-                            value=OutputChannelMessage(
-                                data=v,
-                                event=ChannelEvent.DATA,
-                            ),
+                        OutputRecord(
+                            self.port_name, f"{name}.{i}", v, ChannelEvent.DATA
                         )
                     )
 
@@ -2149,29 +3078,123 @@ class Tool(Generic[P, T], abc.ABC):
         return ToolCall(port_name=self.port_name, outputs=all_outputs)
 
 
+class MessageCoalescing(NamedTuple):
+    """How BlockFunctionCall merges consecutive output-only messages.
+
+    Messages that are already queued when the consumer asks for the next one are
+    always merged. With max_delay, the consumer also waits up to that many seconds
+    for more. A merged message holds at most max_outputs outputs.
+    """
+
+    max_outputs: int = 1000
+    max_delay: float = 0
+
+
+def _is_output_only(message: MessageRecord | BlockControlMessage) -> bool:
+    return (
+        isinstance(message, MessageRecord)
+        and not message.inputs
+        and not message.redirects
+        and not message.states
+    )
+
+
 class BlockFunctionCall:
     def __init__(
         self,
-        values: asyncio.queues.Queue[BlockRunMessage | BlockControlMessage],
+        values: BlockMessageQueue,
         step: Awaitable,
+        coalescing: MessageCoalescing | None = None,
     ):
         self.values = values
         self.step = step
         self.result: Any = None
+        self.coalescing = coalescing
+        self._next: MessageRecord | BlockControlMessage | None = None
+
+    def coalesce(
+        self, max_outputs: int = 1000, max_delay: float = 0
+    ) -> "BlockFunctionCall":
+        """Merges consecutive messages that only hold outputs into a single
+        message, keeping the order of the outputs. Messages with inputs,
+        redirects or states are never merged, and the order of messages relative
+        to them is preserved."""
+        self.coalescing = MessageCoalescing(max_outputs, max_delay)
+        return self
+
+    def queue_stats(self) -> MessageQueueStats:
+        """The high-water marks of the run's message queue, and how long the
+        function waited for space in it."""
+        return self.values.stats()
+
+    async def _get_next(self) -> MessageRecord | BlockControlMessage:
+        if self._next is not None:
+            value, self._next = self._next, None
+            return value
+
+        return await self.values.get()
+
+    async def _merge(self, message: MessageRecord) -> MessageRecord:
+        coalescing = cast(MessageCoalescing, self.coalescing)
+        outputs = list(message.outputs)
+        merged = 1
+        deadline = asyncio.get_running_loop().time() + coalescing.max_delay
+
+        while len(outputs) < coalescing.max_outputs:
+            try:
+                value = self.values.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    value = await asyncio.wait_for(self.values.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if not _is_output_only(value):
+                self._next = value
+                break
+
+            outputs.extend(cast(MessageRecord, value).outputs)
+            merged += 1
+
+        if merged == 1:
+            return message
+
+        return MessageRecord(outputs=outputs)
 
     def _on_done(self, task: asyncio.Task):
         self.values.put_nowait(BlockControlMessage.DONE)
         if not task.cancelled() and not task.exception():
             self.result = task.result()
 
-    def __aiter__(self):
+    def _start(self):
         self.step_future = asyncio.tasks.ensure_future(self.step)
         self.step_future.add_done_callback(self._on_done)
 
+    def __aiter__(self):
+        self._start()
         return self
 
-    async def __anext__(self):
-        value = await self.values.get()
+    async def __anext__(self) -> BlockRunMessage:
+        return (await self._next_record()).to_message()
+
+    async def records(self) -> AsyncIterator[MessageRecord]:
+        """Iterates over the messages as MessageRecords, which can be dumped
+        without building the pydantic models."""
+        self._start()
+        while True:
+            try:
+                record = await self._next_record()
+            except StopAsyncIteration:
+                return
+
+            yield record
+
+    async def _next_record(self) -> MessageRecord:
+        value = await self._get_next()
 
         if isinstance(value, BlockControlMessage):
             if value == BlockControlMessage.DONE:
@@ -2182,7 +3205,10 @@ class BlockFunctionCall:
                 raise StopAsyncIteration
             else:
                 raise ValueError(f"Unexpected BlockControlMessage {value}")
-        elif isinstance(value, BlockRunMessage):
+        elif isinstance(value, MessageRecord):
+            if self.coalescing and _is_output_only(value):
+                return await self._merge(value)
+
             return value
         else:
             raise ValueError(f"Unexpected BlockMessage {value}")
@@ -2196,6 +3222,7 @@ class BlockFunction(Generic[B, P, T]):
     ):
         self.name = fn.__name__
         self._fn = fn
+        self._call_plan = _get_call_plan(fn)
         self._output_name = output_name or ""
         self.metadata: dict = {}
         self._block: B
@@ -2213,20 +3240,23 @@ class BlockFunction(Generic[B, P, T]):
     async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> T:
         call = await self._call_inner(*args, **kwargs)
 
-        async for m in call:
+        async for m in call.records():
             self._block._messages.append(m)
 
         return call.result
 
-    async def _run(self):
-        s = inspect.signature(self._fn)
-
+    async def _run(
+        self,
+        coalescing: MessageCoalescing | None = None,
+        max_queued_messages: int = 0,
+    ):
         positional_inputs: list[Any] = []
         var_positional_inputs: list[Any] = []
         keyword_inputs: dict[str, Any] = {}
 
-        for name, p in s.parameters.items():
-            if name == "self" or name not in self._pending_inputs:
+        for p in self._call_plan.parameters:
+            name = p.name
+            if name not in self._pending_inputs:
                 continue
 
             values = self._pending_inputs[name]
@@ -2235,7 +3265,7 @@ class BlockFunction(Generic[B, P, T]):
                 if "" in values:
                     positional_inputs.append(
                         values[""]
-                    )  # s.parameters is an ordered dict
+                    )  # parameters are in signature order
             elif p.kind == p.VAR_POSITIONAL:
                 indexed_values = {int(index): value for index, value in values.items()}
                 var_positional_inputs = [None] * (
@@ -2247,12 +3277,21 @@ class BlockFunction(Generic[B, P, T]):
             elif p.kind == p.VAR_KEYWORD:
                 keyword_inputs.update(values)
 
-        return await self._call_inner(
-            *tuple(positional_inputs + var_positional_inputs),
-            **keyword_inputs,
+        call = self._start_call(
+            tuple(positional_inputs + var_positional_inputs),
+            keyword_inputs,
+            BlockMessageQueue(max_queued_messages),
         )
+        call.coalescing = coalescing
+
+        return call
 
     async def _call_inner(self, *args: P.args, **kwargs: P.kwargs) -> BlockFunctionCall:
+        return self._start_call(args, kwargs, BlockMessageQueue())
+
+    def _start_call(
+        self, args: tuple, kwargs: dict[str, Any], messages: BlockMessageQueue
+    ) -> BlockFunctionCall:
         if self._block._has_run:
             raise BlockError(
                 message="Block has already run a function. Each instance of a block can only run once",
@@ -2260,71 +3299,40 @@ class BlockFunction(Generic[B, P, T]):
             )
 
         self._block._has_run = True
-
-        messages: asyncio.queues.Queue[BlockRunMessage | BlockControlMessage] = (
-            asyncio.queues.Queue()
-        )
         block_messages.set(messages)
 
         async def _inner() -> T:
-            result = await self._fn(
-                self._block,
-                *args,
-                **kwargs,
-            )
+            try:
+                result = await self._fn(
+                    self._block,
+                    *args,
+                    **kwargs,
+                )
+            finally:
+                # Sends the snapshots held back by throttled streaming outputs
+                # and cancels their timers, even if the function raised
+                messages.flush_deferred()
 
-            outputs: list[OutputValue] = []
-            states: list[StateValue] = []
+            outputs: list[OutputRecord] = []
+            states: list[StateRecord] = []
 
-            s = inspect.signature(self._fn)
-            if s.return_annotation is not inspect._empty:
-                outputs = [
-                    OutputValue(
-                        source=BlockPinRef(port=self.name, pin=self._output_name),
-                        value=result,
-                    )
-                ]
+            if self._call_plan.has_return:
+                outputs = [OutputRecord(self.name, self._output_name, result)]
 
-            for state_name in self._block._interface.state.keys():
+            for state_name in self._block._interface.state:
                 state_value = getattr(self._block, state_name, None)
-                states.append(
-                    StateValue(
-                        state=state_name,
-                        value=state_value,
-                    )
-                )
+                states.append(StateRecord(state_name, state_value))
 
-            messages.put_nowait(
-                BlockRunMessage(
-                    outputs=outputs,
-                    inputs=[],
-                    redirects=[],
-                    states=states,
-                )
-            )
+            messages.put_nowait(MessageRecord(outputs=outputs, states=states))
 
             tool_close_outputs = [
-                OutputValue(
-                    source=BlockPinRef(
-                        port=tool.port_name,
-                        pin=tool.output_names[0],
-                    ),
-                    value=OutputChannelMessage(
-                        data=None,
-                        event=ChannelEvent.CLOSE,
-                    ),
+                OutputRecord(
+                    tool.port_name, tool.output_names[0], None, ChannelEvent.CLOSE
                 )
                 for tool in self._block._tools
             ]
 
-            messages.put_nowait(
-                BlockRunMessage(
-                    outputs=tool_close_outputs,
-                    inputs=[],
-                    redirects=[],
-                    states=[],
-                )
-            )
+            messages.put_nowait(MessageRecord(outputs=tool_close_outputs))
 
             return result
 
@@ -2352,7 +3360,7 @@ class Callback(BlockFunction[B, P, None]):
         super().__init__(fn, None)
 
     def __call__(self, *args: P.args, **kwargs: P.kwargs) -> CallbackCall:
-        values = inspect.getcallargs(self._fn, cast(Block, None), *args, **kwargs)
+        values = self._call_plan.bind(args, kwargs)
 
         tool_result_param = ""
         direct_params: dict[str, Any] = {}
@@ -2360,7 +3368,7 @@ class Callback(BlockFunction[B, P, None]):
         for arg_name, value in values.items():
             if isinstance(value, DummyToolValue):
                 tool_result_param = arg_name
-            elif arg_name != "self":
+            else:
                 direct_params[arg_name] = value
 
         return CallbackCall(
@@ -38,10 +38,14 @@ class StreamingEvent(Enum):
                (compute consumers see the FINALIZE value).
     FINALIZE — terminal, authoritative value. Fires once. Routes to
                FlowOutputs, FlowVariables and downstream FlowBlocks.
+    DELTA    — progressive snapshot sent as a StreamingDelta relative to the
+               previous UPDATE or DELTA on the same pin. Only sent by pins
+               that opt in to delta encoding. Routes like UPDATE.
     """
 
     UPDATE = "Update"
     FINALIZE = "Finalize"
+    DELTA = "Delta"
 
 
 class BlockScope(Enum):
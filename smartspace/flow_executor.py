@@ -0,0 +1,874 @@
+"""Runs a FlowDefinition in process.
+
+``FlowExecutor`` runs the blocks of a flow from a BlockSet without the SmartSpace
+platform, so that whole flows can be load tested and profiled locally. The
+messages of each block function run are routed along the flow's connections the
+way the platform routes them:
+
+- Values sent to the input pins of a function are queued per pin, and the
+  function runs once each of its required pins has a value. Sticky pins keep
+  their last value for later runs, and the values of config ports are set on
+  every run of the block.
+- Channel outputs reach channel inputs as InputChannels, and other inputs as
+  their data. Streaming outputs only reach blocks and variables with their final
+  value, while flow outputs follow every snapshot.
+- A tool call sends the tool's outputs along the connections of the tool port.
+  The value that comes back to the tool's ``return`` pin is redirected to the
+  callback, together with the callback's other inputs, and the callback runs in
+  the state scope of the run that made the call.
+- Flow variables are sent to their readers when the execution starts, with the
+  value they were given, and again every time a value is written to them.
+- State is kept per node, and per value of the state's scope pins. Values from
+  the same channel share a scope. It is kept as the objects the block left,
+  rather than round tripped through JSON and validated again, so that a
+  callback does not copy the whole state of a block, such as the results of a
+  Map, on every call.
+
+Every function run is an asyncio task, so independent blocks run concurrently.
+Runs of blocks that have state are serialized per node, in the order they were
+started, so that no state update is lost.
+
+Tool ports can also be implemented by Python callables, which are given the
+arguments of each tool call and return its result. ``run_block`` uses them to
+run a single block function, such as ``Map.map``, with its tool calls and
+callbacks resolved in process.
+"""
+
+import asyncio
+import collections
+import contextlib
+import inspect
+import itertools
+from typing import Any, Callable, Mapping, NamedTuple, Sequence
+
+import pydantic_core
+
+from smartspace.core import (
+    Block,
+    BlockError,
+    BlockSet,
+    Callback,
+    InputRecord,
+    InterfaceView,
+    MessageRecord,
+    OutputRecord,
+    RedirectRecord,
+)
+from smartspace.enums import ChannelEvent, ChannelState, StreamingEvent
+from smartspace.models import (
+    BlockPinRef,
+    Connection,
+    FlowBlock,
+    FlowBlockConstant,
+    FlowContext,
+    FlowDefinition,
+    FlowInput,
+    FlowOutput,
+    FlowPinRef,
+    InputChannel,
+    InputValue,
+    PinType,
+    PortType,
+    StateValue,
+    apply_streaming_message,
+)
+
+# (node, port, pin), where port and pin are None for flow inputs, outputs,
+# constants and variables
+PinKey = tuple[str, str | None, str | None]
+
+
+class FlowResult(NamedTuple):
+    # Flow output name -> the last value sent to it
+    outputs: dict[str, Any]
+    variables: dict[str, Any]
+    # Node name, or "node.port" for tools implemented by callables -> how many
+    # times it ran
+    runs: dict[str, int]
+
+
+class _ToolCallFrame(NamedTuple):
+    """A tool call that is waiting for a value on the tool's ``return`` pin."""
+
+    node: str
+    port: str
+    inputs: Sequence[InputRecord]
+    redirects: Sequence[RedirectRecord]
+    # The state scope of the run that made the call
+    scope: Mapping[tuple[str, str], Any]
+
+
+class _Value(NamedTuple):
+    value: Any
+    # The tool calls the value was sent under, the innermost last
+    calls: tuple[_ToolCallFrame, ...]
+    # Identifies the value when it sets a state scope. Values sent on the same
+    # channel share an id
+    scope_id: Any
+
+
+class _Target(NamedTuple):
+    kind: str  # "block", "output" or "variable"
+    node: str
+    port: str
+    pin: str
+    channel: bool
+
+
+class _FunctionPlan(NamedTuple):
+    name: str
+    callback: bool
+    # The pins a run is given values for, and the ones it waits for
+    pins: tuple[str, ...]
+    required: frozenset[str]
+    sticky: frozenset[str]
+    defaults: Mapping[str, Any]
+
+
+class _NodePlan(NamedTuple):
+    name: str
+    block: FlowBlock
+    block_type: type[Block]
+    functions: Mapping[str, _FunctionPlan]
+    # Functions that run once when the flow starts, because nothing sends them
+    # inputs and they have no required pins
+    start_functions: tuple[str, ...]
+    tool_ports: frozenset[str]
+    # (port, pin) of an output -> its channel group
+    channel_groups: Mapping[tuple[str, str], str]
+    # State name -> the (port, pin) of its scope pins
+    state_scopes: Mapping[str, tuple[tuple[str, str], ...]]
+    state_defaults: Mapping[str, Any]
+
+
+class _Run(NamedTuple):
+    id: int
+    node: _NodePlan
+    function: str
+    calls: tuple[_ToolCallFrame, ...]
+    scope: Mapping[tuple[str, str], Any]
+
+
+def _base_name(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def _to_jsonable(value: Any) -> Any:
+    # Values cross the platform as JSON, so blocks are given what they would
+    # receive from it
+    return pydantic_core.to_jsonable_python(value, by_alias=True)
+
+
+def _compile_node(
+    name: str, block: FlowBlock, block_type: type[Block], targeted_ports: set[str]
+) -> _NodePlan:
+    view: InterfaceView = block_type._get_interface_view()
+    dynamic_pins: dict[str, list[str]] = collections.defaultdict(list)
+    for pin_ref in block.dynamic_input_pins:
+        dynamic_pins[pin_ref.port].append(pin_ref.pin)
+
+    functions: dict[str, _FunctionPlan] = {}
+    for port_name, port in view.ports.items():
+        if not port.is_function:
+            continue
+
+        single_pins = [
+            pin_name
+            for pin_name, pin in port.inputs.items()
+            if pin.type == PinType.SINGLE and not pin.virtual
+        ]
+        functions[port_name] = _FunctionPlan(
+            name=port_name,
+            callback=isinstance(getattr(block_type, port_name, None), Callback),
+            pins=tuple(single_pins + dynamic_pins[port_name]),
+            required=frozenset(
+                [p for p in single_pins if port.inputs[p].required]
+                + dynamic_pins[port_name]
+            ),
+            sticky=frozenset(
+                pin_name for pin_name, pin in port.inputs.items() if pin.sticky
+            ),
+            defaults={
+                p: port.inputs[p].default
+                for p in single_pins
+                if not port.inputs[p].required
+            },
+        )
+
+    return _NodePlan(
+        name=name,
+        block=block,
+        block_type=block_type,
+        functions=functions,
+        start_functions=tuple(
+            f.name
+            for f in functions.values()
+            if not f.callback and not f.required and f.name not in targeted_ports
+        ),
+        tool_ports=frozenset(
+            port_name
+            for port_name, port in view.ports.items()
+            if any(pin.virtual for pin in port.inputs.values())
+        ),
+        channel_groups={
+            (port_name, pin_name): pin.channel_group_id or port_name
+            for port_name, port in view.ports.items()
+            for pin_name, pin in port.outputs.items()
+            if pin.channel
+        },
+        state_scopes={
+            state_name: tuple((s.port, s.pin) for s in state.scope)
+            for state_name, state in view.source.state.items()
+        },
+        state_defaults={
+            state_name: _to_jsonable(state.default)
+            for state_name, state in view.source.state.items()
+        },
+    )
+
+
+class FlowExecutor:
+    """Runs a FlowDefinition with the blocks of a BlockSet. The flow is compiled
+    once, and each call to ``run`` executes it from the start, so an executor
+    can run the same flow many times, also concurrently.
+
+    ``tools`` maps (node, tool port) to a callable that implements the tool in
+    place of the port's connections. It is called with the arguments of the
+    tool call, can be sync or async, and its result is sent back to the tool.
+
+    ``max_concurrent_runs`` limits how many block function runs and tool calls
+    are in flight at once in each execution, 0 for no limit.
+    """
+
+    def __init__(
+        self,
+        flow: FlowDefinition,
+        block_set: BlockSet,
+        context: FlowContext | None = None,
+        max_concurrent_runs: int = 0,
+        tools: Mapping[tuple[str, str], Callable[..., Any]] | None = None,
+    ):
+        self.flow = flow
+        self.block_set = block_set
+        self.context = context
+        self.max_concurrent_runs = max_concurrent_runs
+
+        targeted_ports: dict[str, set[str]] = collections.defaultdict(set)
+        for connection in flow.connections:
+            if connection.target.port is not None:
+                targeted_ports[connection.target.node].add(connection.target.port)
+
+        self._nodes: dict[str, _NodePlan] = {}
+        for name, block in flow.blocks.items():
+            block_type = block_set.find(block.name, block.version)
+            if not block_type:
+                raise ValueError(
+                    f"Could not find block with name {block.name} and version {block.version}"
+                )
+
+            for constant in block.constants:
+                targeted_ports[name].add(constant.target.port)
+
+            self._nodes[name] = _compile_node(
+                name, block, block_type, targeted_ports[name]
+            )
+
+        self._tools: dict[str, dict[str, Callable[..., Any]]] = collections.defaultdict(
+            dict
+        )
+        for (node_name, port), tool in (tools or {}).items():
+            node = self._nodes.get(node_name)
+            if node is None or port not in node.tool_ports:
+                raise ValueError(f"Block '{node_name}' has no tool port '{port}'")
+
+            self._tools[node_name][port] = tool
+
+        self._routes: dict[PinKey, list[_Target]] = collections.defaultdict(list)
+        for connection in flow.connections:
+            source, target = connection.source, connection.target
+            self._routes[(source.node, source.port, source.pin)].append(
+                self._compile_target(target)
+            )
+
+    def _compile_target(self, target: FlowPinRef) -> _Target:
+        if target.node in self.flow.outputs:
+            return _Target("output", target.node, "", "", False)
+
+        if target.node in self.flow.variables:
+            return _Target("variable", target.node, "", "", False)
+
+        node = self._nodes.get(target.node)
+        if node is None or target.port is None or target.pin is None:
+            raise ValueError(f"Invalid connection target {target}")
+
+        port = node.block_type._get_interface_view().ports.get(_base_name(target.port))
+        pin = port.inputs.get(_base_name(target.pin)) if port else None
+        if pin is None:
+            raise ValueError(
+                f"Block '{target.node}' has no input pin '{target.port}.{target.pin}'"
+            )
+
+        return _Target("block", target.node, target.port, target.pin, pin.channel)
+
+    async def run(
+        self,
+        inputs: Mapping[str, Any] | None = None,
+        variables: Mapping[str, Any] | None = None,
+    ) -> FlowResult:
+        """Runs the flow with the given flow inputs and initial variable values,
+        until no block function is running. Raises a BlockError if a block
+        fails, after cancelling the other runs."""
+        execution = _FlowExecution(self, dict(variables or {}))
+        return await execution.run(inputs or {})
+
+
+class _FlowExecution:
+    def __init__(self, executor: FlowExecutor, variables: dict[str, Any]):
+        self.executor = executor
+        self.outputs: dict[str, Any] = {}
+        self.variables = variables
+        self.runs: collections.Counter[str] = collections.Counter()
+
+        self._ids = itertools.count()
+        self._tasks: set[asyncio.Task] = set()
+        self._queues: dict[PinKey, collections.deque[_Value]] = collections.defaultdict(
+            collections.deque
+        )
+        self._sticky: dict[PinKey, _Value] = {}
+        self._triggered: set[tuple[str, str]] = set()
+        self._config: dict[str, dict[tuple[str, str], Any]] = collections.defaultdict(
+            dict
+        )
+        # Node -> state -> scope ids -> value
+        self._states: dict[str, dict[str, dict[tuple, Any]]] = {
+            name: {state: {} for state in node.state_scopes}
+            for name, node in executor._nodes.items()
+        }
+        self._last_scope_ids: dict[PinKey, Any] = {}
+        self._locks = {
+            name: asyncio.Lock()
+            for name, node in executor._nodes.items()
+            if node.state_scopes
+        }
+        self._runs = (
+            asyncio.Semaphore(executor.max_concurrent_runs)
+            if executor.max_concurrent_runs > 0
+            else None
+        )
+
+    async def run(self, inputs: Mapping[str, Any]) -> FlowResult:
+        flow = self.executor.flow
+
+        for name, value in inputs.items():
+            self._send_input(name, value)
+
+        for name, constant in flow.constants.items():
+            self._send_input(name, constant.value)
+
+        for name, value in list(self.variables.items()):
+            self._send_input(name, value)
+
+        for node in self.executor._nodes.values():
+            for constant in node.block.constants:
+                self._deliver(
+                    node,
+                    constant.target.port,
+                    constant.target.pin,
+                    _Value(_to_jsonable(constant.value), (), next(self._ids)),
+                )
+
+            for function in node.start_functions:
+                self._start(node, node.functions[function], {})
+
+        while self._tasks:
+            done, _ = await asyncio.wait(
+                self._tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
+            self._tasks -= done
+            for task in done:
+                exception = task.exception()
+                if exception is not None:
+                    for other in self._tasks:
+                        other.cancel()
+                    await asyncio.gather(*self._tasks, return_exceptions=True)
+                    raise exception
+
+        return FlowResult(self.outputs, self.variables, dict(self.runs))
+
+    def _send_input(self, node: str, value: Any):
+        self._send((node, None, None), _to_jsonable(value), None, (), next(self._ids))
+
+    def _send(
+        self,
+        source: PinKey,
+        value: Any,
+        event: ChannelEvent | StreamingEvent | None,
+        calls: tuple[_ToolCallFrame, ...],
+        scope_id: Any,
+    ):
+        for target in self.executor._routes.get(source, ()):
+            if target.kind == "output":
+                if isinstance(event, StreamingEvent):
+                    self.outputs[target.node] = apply_streaming_message(
+                        self.outputs.get(target.node),
+                        {"event": event.value, "data": value},
+                    )
+                elif event != ChannelEvent.CLOSE:
+                    self.outputs[target.node] = value
+                continue
+
+            # Snapshots only reach flow outputs, and only channels see a close
+            if (
+                event == StreamingEvent.UPDATE
+                or event == StreamingEvent.DELTA
+                or (event == ChannelEvent.CLOSE and not target.channel)
+            ):
+                continue
+
+            if target.kind == "variable":
+                # A write reaches the variable's readers as a new value, as its
+                # initial value does when the execution starts
+                self.variables[target.node] = value
+                self._send((target.node, None, None), value, None, (), next(self._ids))
+                continue
+
+            if target.channel:
+                # Channel pins are validated as their item type, so they are
+                # given the InputChannel itself
+                target_value: Any = (
+                    InputChannel(
+                        state=ChannelState.CLOSED,
+                        event=ChannelEvent.CLOSE,
+                        data=value,
+                    )
+                    if event == ChannelEvent.CLOSE
+                    else InputChannel(
+                        state=ChannelState.OPEN, event=ChannelEvent.DATA, data=value
+                    )
+                )
+            else:
+                target_value = value
+
+            self._deliver(
+                self.executor._nodes[target.node],
+                target.port,
+                target.pin,
+                _Value(target_value, calls, scope_id),
+            )
+
+    def _deliver(self, node: _NodePlan, port: str, pin: str, value: _Value):
+        if port in node.tool_ports:
+            if pin == "return":
+                self._return(node, port, value)
+            return
+
+        function = node.functions.get(port)
+        if function is None:
+            self._config[node.name][(port, pin)] = value.value
+            return
+
+        key = (node.name, port, pin)
+        if _base_name(pin) in function.sticky:
+            self._sticky[key] = value
+            self._triggered.add((node.name, port))
+        else:
+            self._queues[key].append(value)
+
+        self._start_ready(node, function)
+
+    def _start_ready(self, node: _NodePlan, function: _FunctionPlan):
+        while True:
+            values: dict[str, _Value] = {}
+            queued = False
+            for pin in function.pins:
+                key = (node.name, function.name, pin)
+                queue = self._queues.get(key)
+                if queue:
+                    values[pin] = queue[0]
+                    queued = True
+                elif key in self._sticky:
+                    values[pin] = self._sticky[key]
+                elif pin in function.required:
+                    return
+
+            if not queued and (node.name, function.name) not in self._triggered:
+                return
+
+            self._triggered.discard((node.name, function.name))
+            for pin in values:
+                queue = self._queues.get((node.name, function.name, pin))
+                if queue:
+                    queue.popleft()
+
+            self._start(node, function, values)
+
+    def _return(self, node: _NodePlan, port: str, value: _Value):
+        for i in range(len(value.calls) - 1, -1, -1):
+            frame = value.calls[i]
+            if frame.node == node.name and frame.port == port:
+                break
+        else:
+            # Not sent under a call of this tool
+            return
+
+        calls = value.calls[:i]
+        for redirect in frame.redirects:
+            if redirect.source_port != port or redirect.source_pin != "return":
+                continue
+
+            function = node.functions[redirect.target_port]
+            inputs = {
+                input.pin: _to_jsonable(input.value)
+                for input in frame.inputs
+                if input.port == function.name
+            }
+            inputs[redirect.target_pin] = value.value
+            for pin in function.pins:
+                sticky = self._sticky.get((node.name, function.name, pin))
+                if pin not in inputs and sticky is not None:
+                    inputs[pin] = sticky.value
+
+            self._spawn(
+                _Run(next(self._ids), node, function.name, calls, frame.scope),
+                self._with_defaults(function, inputs),
+            )
+
+    def _start(
+        self, node: _NodePlan, function: _FunctionPlan, values: dict[str, _Value]
+    ):
+        calls: tuple[_ToolCallFrame, ...] = max(
+            (v.calls for v in values.values()), key=len, default=()
+        )
+
+        scope: dict[tuple[str, str], Any] = {}
+        for pins in node.state_scopes.values():
+            for port, pin in pins:
+                key = (node.name, port, pin)
+                if port == function.name and pin in values:
+                    self._last_scope_ids[key] = values[pin].scope_id
+                scope[(port, pin)] = self._last_scope_ids.get(key)
+
+        self._spawn(
+            _Run(next(self._ids), node, function.name, calls, scope),
+            self._with_defaults(function, {pin: v.value for pin, v in values.items()}),
+        )
+
+    def _with_defaults(
+        self, function: _FunctionPlan, inputs: dict[str, Any]
+    ) -> dict[str, Any]:
+        # Pending inputs are passed in signature order, so optional pins that
+        # did not get a value must still be set
+        for pin, default in function.defaults.items():
+            if pin not in inputs:
+                inputs[pin] = default
+
+        return inputs
+
+    def _spawn(self, run: _Run, inputs: dict[str, Any]):
+        self._tasks.add(asyncio.ensure_future(self._run(run, inputs)))
+
+    async def _run(self, run: _Run, inputs: dict[str, Any]):
+        node = run.node
+        async with contextlib.AsyncExitStack() as slots:
+            # The node lock is taken first, so runs waiting for it do not hold
+            # one of the execution's slots
+            lock = self._locks.get(node.name)
+            if lock is not None:
+                await slots.enter_async_context(lock)
+
+            if self._runs is not None:
+                await slots.enter_async_context(self._runs)
+
+            try:
+                await self._run_function(run, inputs)
+            except Exception as e:
+                raise BlockError(
+                    message=f"'{node.name}' failed in '{run.function}()': {e}",
+                    data={"node": node.name, "function": run.function},
+                ) from e
+
+    async def _run_function(self, run: _Run, inputs: dict[str, Any]):
+        node = run.node
+        self.runs[node.name] += 1
+
+        states = self._states[node.name]
+        # Like the platform, state that has not been set yet is loaded with
+        # its default, so that blocks never share the default of the class.
+        # State the block has set is already valid, and is set on the instance
+        # as it is, so a run does not copy all of it
+        state_values: list[StateValue] = []
+        stored_states: dict[str, Any] = {}
+        for state_name, pins in node.state_scopes.items():
+            scope_ids = tuple(run.scope.get(p) for p in pins)
+            if scope_ids in states[state_name]:
+                stored_states[state_name] = states[state_name][scope_ids]
+            else:
+                state_values.append(
+                    StateValue(state=state_name, value=node.state_defaults[state_name])
+                )
+
+        input_values = [
+            InputValue(target=BlockPinRef(port=run.function, pin=pin), value=value)
+            for pin, value in inputs.items()
+        ] + [
+            InputValue(target=BlockPinRef(port=port, pin=pin), value=value)
+            for (port, pin), value in self._config[node.name].items()
+        ]
+
+        block = node.block
+        with self.executor.block_set.instance(node.block_type) as instance:
+            instance._load(
+                context=self.executor.context,
+                state=state_values,
+                inputs=input_values,
+                dynamic_ports=block.dynamic_ports or None,
+                dynamic_output_pins=block.dynamic_output_pins or None,
+                dynamic_input_pins=block.dynamic_input_pins or None,
+            )
+            for state_name, value in stored_states.items():
+                setattr(instance, state_name, value)
+
+            call = await instance._run_function(run.function)
+            try:
+                async for record in call.records():
+                    self._route(run, record)
+            finally:
+                # Stops the function when the execution is cancelled
+                call.step_future.cancel()
+
+    def _call_tool(
+        self,
+        node: _NodePlan,
+        port: str,
+        outputs: Sequence[OutputRecord],
+        calls: tuple[_ToolCallFrame, ...],
+    ):
+        # Tool.call sends the pins in the order of the tool's parameters, with
+        # the items of *args and **kwargs pins after the others
+        pins = node.block_type._get_interface_view().ports[port].outputs
+        args: list[Any] = []
+        kwargs: dict[str, Any] = {}
+        for output in outputs:
+            if output.port != port or output.event != ChannelEvent.DATA:
+                continue
+
+            name, _, index = output.pin.partition(".")
+            value = _to_jsonable(output.value)
+            if pins[name].type == PinType.DICTIONARY:
+                kwargs[index] = value
+            else:
+                args.append(value)
+
+        self._tasks.add(
+            asyncio.ensure_future(self._run_tool(node, port, args, kwargs, calls))
+        )
+
+    async def _run_tool(
+        self,
+        node: _NodePlan,
+        port: str,
+        args: list[Any],
+        kwargs: dict[str, Any],
+        calls: tuple[_ToolCallFrame, ...],
+    ):
+        tool = self.executor._tools[node.name][port]
+        async with contextlib.AsyncExitStack() as slots:
+            if self._runs is not None:
+                await slots.enter_async_context(self._runs)
+
+            self.runs[f"{node.name}.{port}"] += 1
+            try:
+                result = tool(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                raise BlockError(
+                    message=f"Tool '{port}' of '{node.name}' failed: {e}",
+                    data={"node": node.name, "tool": port},
+                ) from e
+
+        self._return(node, port, _Value(_to_jsonable(result), calls, None))
+
+    def _route(self, run: _Run, record: MessageRecord):
+        node = run.node
+
+        for state in record.states:
+            scope_ids = tuple(run.scope.get(p) for p in node.state_scopes[state.state])
+            self._states[node.name][state.state][scope_ids] = state.value
+
+        # A message with the outputs of a tool call opens a frame, which the
+        # value sent back to the tool's return pin is redirected through
+        call_id: Any = None
+        calls = run.calls
+        tool_port = ""
+        for output in record.outputs:
+            if output.port in node.tool_ports and output.event == ChannelEvent.DATA:
+                call_id = next(self._ids)
+                tool_port = output.port
+                calls = run.calls + (
+                    _ToolCallFrame(
+                        node.name,
+                        output.port,
+                        record.inputs,
+                        record.redirects,
+                        run.scope,
+                    ),
+                )
+                break
+
+        tools = self.executor._tools.get(node.name, {})
+        if tool_port in tools:
+            self._call_tool(node, tool_port, record.outputs, calls)
+
+        for output in record.outputs:
+            # Tools implemented by callables are not routed along connections
+            if output.port in tools:
+                continue
+
+            group = node.channel_groups.get(
+                (_base_name(output.port), _base_name(output.pin))
+            )
+            if group is None:
+                scope_id: Any = next(self._ids)
+            elif call_id is not None and output.port in node.tool_ports:
+                scope_id = call_id
+            else:
+                scope_id = (run.id, group)
+
+            self._send(
+                (node.name, output.port, output.pin),
+                _to_jsonable(output.value),
+                output.event,
+                calls if output.port in node.tool_ports else run.calls,
+                scope_id,
+            )
+
+
+class BlockTool(NamedTuple):
+    """Implements a tool with a function of another block. The arguments of a
+    tool call are sent to the function's input pins of the same name, and the
+    function's output is sent back to the tool."""
+
+    block_type: type[Block]
+    function: str
+
+
+async def run_block(
+    block_type: type[Block],
+    function: str,
+    inputs: Mapping[str, Any] | None = None,
+    tools: Mapping[str, Callable[..., Any] | BlockTool] | None = None,
+    config: Mapping[str, Any] | None = None,
+    context: FlowContext | None = None,
+    max_concurrent_runs: int = 0,
+) -> FlowResult:
+    """Runs a function of a block in process, with its tool ports implemented by
+    Python callables or BlockTools, until the tool calls and their callbacks are
+    done. ``config`` sets the block's config ports.
+
+    The outputs of the result are the last values of the block's output pins,
+    named after their port, or ``port.pin`` for pins with a name.
+    """
+    view = block_type._get_interface_view()
+    if function not in view.ports or not view.ports[function].is_function:
+        raise ValueError(f"'{block_type.name}' has no function '{function}'")
+
+    block_set = BlockSet()
+    block_set.add(block_type)
+    blocks = {
+        "block": FlowBlock(
+            name=block_type.name,
+            version=block_type.version,
+            constants=[
+                FlowBlockConstant(target=BlockPinRef(port=port, pin=""), value=value)
+                for port, value in (config or {}).items()
+            ],
+        )
+    }
+    connections: list[Connection] = []
+    callables: dict[tuple[str, str], Callable[..., Any]] = {}
+
+    for port, tool in (tools or {}).items():
+        if not isinstance(tool, BlockTool):
+            callables[("block", port)] = tool
+            continue
+
+        if port not in view.ports:
+            raise ValueError(f"Block '{block_type.name}' has no tool port '{port}'")
+
+        tool_outputs = list(
+            tool.block_type._get_interface_view().ports[tool.function].outputs
+        )
+        if len(tool_outputs) != 1:
+            raise ValueError(
+                f"'{tool.block_type.name}.{tool.function}()' must have an output to implement a tool"
+            )
+
+        node = f"tools.{port}"
+        block_set.add(tool.block_type)
+        blocks[node] = FlowBlock(
+            name=tool.block_type.name, version=tool.block_type.version
+        )
+        connections.extend(
+            Connection(
+                source=FlowPinRef(node="block", port=port, pin=pin),
+                target=FlowPinRef(node=node, port=tool.function, pin=pin),
+            )
+            for pin in view.ports[port].outputs
+        )
+        connections.append(
+            Connection(
+                source=FlowPinRef(node=node, port=tool.function, pin=tool_outputs[0]),
+                target=FlowPinRef(node="block", port=port, pin="return"),
+            )
+        )
+
+    # Optional pins are sent their defaults, so the function runs even when it
+    # is only given some of its inputs
+    function_inputs = {
+        pin_name: pin.default
+        for pin_name, pin in view.ports[function].inputs.items()
+        if not pin.required and pin.type == PinType.SINGLE
+    }
+    function_inputs.update(inputs or {})
+    connections.extend(
+        Connection(
+            source=FlowPinRef(node=pin),
+            target=FlowPinRef(node="block", port=function, pin=pin),
+        )
+        for pin in function_inputs
+    )
+
+    outputs: dict[str, FlowOutput] = {}
+    for port_name, port in view.ports.items():
+        is_tool = any(pin.virtual for pin in port.inputs.values())
+        if is_tool or port.type != PortType.SINGLE:
+            continue
+
+        for pin_name in port.outputs:
+            name = f"{port_name}.{pin_name}" if pin_name else port_name
+            outputs[name] = FlowOutput(json_schema={})
+            connections.append(
+                Connection(
+                    source=FlowPinRef(node="block", port=port_name, pin=pin_name),
+                    target=FlowPinRef(node=name),
+                )
+            )
+
+    flow = FlowDefinition(
+        inputs={pin: FlowInput(json_schema={}) for pin in function_inputs},
+        outputs=outputs,
+        variables={},
+        constants={},
+        blocks=blocks,
+        connections=connections,
+    )
+    executor = FlowExecutor(
+        flow,
+        block_set,
+        context=context,
+        max_concurrent_runs=max_concurrent_runs,
+        tools=callables,
+    )
+
+    return await executor.run(function_inputs)
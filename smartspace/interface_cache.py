@@ -0,0 +1,356 @@
+"""Persistent on-disk cache for generated block interfaces.
+
+Generating a ``BlockInterface`` builds a JSON schema and a couple of
+``TypeAdapter``s for every pin, which dominates worker start-up time for large
+block sets. ``InterfaceCache`` stores the serialized interface of each block
+class on disk so that warm starts can skip schema generation entirely. The pin
+type adapters are then rebuilt lazily, without any JSON schemas, the first time
+the block is instantiated (see ``MetaBlock._ensure_type_adapters``).
+
+Entries are content-addressed. The key of a block class is a hash of:
+
+- the source of every module that defines a class in the block's MRO (which
+  includes ``smartspace.core`` itself),
+- the installed SDK version,
+- the installed pydantic version,
+- the cache format version.
+
+Editing a block, upgrading the SDK or upgrading pydantic therefore produces a
+new key and the stale entry is simply never read again. Changes to types that
+are imported from *other* modules are not part of the key; call
+``InterfaceCache.clear()`` (or delete the cache directory) after changing such
+shared models.
+
+``InterfaceCache.warmup()`` fills the cache for a whole block set up front,
+generating missing interfaces in a process pool, so that the first request
+after a deploy does not pay for interface generation.
+"""
+
+import concurrent.futures
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import pydantic
+from pydantic import ValidationError
+from pydantic_core import PydanticSerializationError
+
+from smartspace.core import Block
+from smartspace.models import BlockInterface
+
+_CACHE_FORMAT_VERSION = "1"
+
+
+def _get_default_cache_path() -> Path:
+    return Path(
+        os.environ.get("SMARTSPACE_INTERFACE_CACHE_DIR", "")
+        or os.path.join(os.path.expanduser("~"), ".smartspace", "interface_cache")
+    )
+
+
+def _get_sdk_version() -> str:
+    try:
+        return importlib.metadata.version("smartspace-ai")
+    except importlib.metadata.PackageNotFoundError:
+        return "dev"
+
+
+def _get_pin_defaults(interface: BlockInterface) -> list[tuple[str, str, Any]]:
+    return [
+        (port_name, pin_name, pin.default)
+        for port_name, port in interface.ports.items()
+        for pin_name, pin in port.inputs.items()
+    ]
+
+
+class WarmupReport(NamedTuple):
+    blocks: int
+    cached: int
+    generated: int
+    processes: int
+    seconds: float
+    failed: dict[str, str]
+
+    def __str__(self) -> str:
+        report = (
+            f"Warmed up {self.blocks} block interfaces in {self.seconds:.2f}s "
+            f"({self.cached} cached, {self.generated} generated "
+            f"in {self.processes} processes)"
+        )
+        for name, error in self.failed.items():
+            report += f"\n  Failed to generate {name}: {error}"
+
+        return report
+
+
+def _block_ref(block_type: type[Block]) -> tuple[str, str | None, str]:
+    module = sys.modules.get(block_type.__module__)
+    return (
+        block_type.__module__,
+        getattr(module, "__file__", None),
+        block_type.__qualname__,
+    )
+
+
+def _import_block_type(module_name: str, file_path: str | None, qualname: str):
+    module = sys.modules.get(module_name)
+    if module is None:
+        if file_path is None:
+            module = importlib.import_module(module_name)
+        else:
+            spec = importlib.util.spec_from_file_location(module_name, file_path)
+            if not spec or not spec.loader:
+                raise ImportError(f"Cannot import {module_name} from {file_path}")
+
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+
+    block_type = module
+    for name in qualname.split("."):
+        block_type = getattr(block_type, name)
+
+    return block_type
+
+
+def _generate_interfaces(
+    block_refs: list[tuple[str, str | None, str]],
+) -> list[tuple[bool, str]]:
+    # Runs in the warmup worker processes. Returns the serialized interface of
+    # each block, or the error that prevented generating it
+    results: list[tuple[bool, str]] = []
+    for block_ref in block_refs:
+        try:
+            block_type = _import_block_type(*block_ref)
+            interface = block_type._get_interface()
+            results.append((True, interface.model_dump_json(by_alias=True)))
+        except Exception as e:
+            results.append((False, repr(e)))
+
+    return results
+
+
+class InterfaceCache:
+    def __init__(self, path: str | os.PathLike | None = None):
+        self.path = Path(path) if path is not None else _get_default_cache_path()
+        self.hits = 0
+        self.misses = 0
+        self._source_hashes: dict[tuple[str, int, int], str] = {}
+        self._version_key = "|".join(
+            [_CACHE_FORMAT_VERSION, _get_sdk_version(), pydantic.VERSION]
+        )
+
+    def key(self, block_type: type[Block]) -> str | None:
+        """Returns the content address of the block's interface, or None if the
+        source of one of the block's modules cannot be read."""
+        digest = hashlib.sha256()
+        digest.update(self._version_key.encode())
+        digest.update(f"{block_type.__module__}:{block_type.__qualname__}".encode())
+
+        modules = {t.__module__ for t in block_type.__mro__ if t is not object}
+        for module_name in sorted(modules):
+            source_hash = self._get_source_hash(module_name)
+            if source_hash is None:
+                return None
+
+            digest.update(source_hash.encode())
+
+        return digest.hexdigest()
+
+    def get(self, block_type: type[Block]) -> BlockInterface | None:
+        key = self.key(block_type)
+        if key is None:
+            return None
+
+        try:
+            data = self._entry_path(key).read_bytes()
+        except OSError:
+            return None
+
+        try:
+            return BlockInterface.model_validate_json(data)
+        except ValidationError:
+            return None
+
+    def put(self, block_type: type[Block], interface: BlockInterface) -> bool:
+        """Stores the interface, returning False if it cannot be stored faithfully
+        (e.g. a pin default that does not survive a JSON round trip)."""
+        key = self.key(block_type)
+        if key is None:
+            return False
+
+        try:
+            data = interface.model_dump_json(by_alias=True)
+        except PydanticSerializationError:
+            return False
+
+        # Pin defaults are validated into block attributes at runtime, so they
+        # must come back from the cache exactly as they were generated
+        try:
+            restored = BlockInterface.model_validate_json(data)
+        except ValidationError:
+            return False
+
+        if _get_pin_defaults(restored) != _get_pin_defaults(interface):
+            return False
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(key)
+        temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(data)
+        os.replace(temp_path, entry_path)
+
+        return True
+
+    def load(self, block_type: type[Block]) -> BlockInterface:
+        """Gets the interface for the block, from the cache if possible, and makes
+        it the class interface. Interfaces that are generated are stored."""
+        if block_type._class_interface is not None:
+            return block_type._class_interface
+
+        interface = self.load_cached(block_type)
+        if interface is not None:
+            return interface
+
+        self.misses += 1
+        interface = block_type._get_interface()
+        self.put(block_type, interface)
+
+        return interface
+
+    def warmup(
+        self,
+        block_types: list[type[Block]],
+        processes: int | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> WarmupReport:
+        """Loads the interfaces of all the blocks, generating the ones that are not
+        cached in a pool of worker processes (os.cpu_count() by default) and
+        storing them. progress is called with (done, total) as blocks complete.
+
+        The workers are spawned rather than forked, as warmup can be called from
+        a process that is already running other threads (the debug CLI calls it
+        from a thread, while its client and file watchers run). With a single
+        CPU the interfaces are generated in this process, as a pool would only
+        add the cost of starting the workers."""
+        start = time.perf_counter()
+        total = len(block_types)
+        pending: list[type[Block]] = []
+        cached = 0
+
+        for block_type in block_types:
+            if block_type._class_interface is not None or self.load_cached(block_type):
+                cached += 1
+            else:
+                pending.append(block_type)
+
+        if progress:
+            progress(cached, total)
+
+        cpus = os.cpu_count() or 1
+        processes = min(processes or cpus, len(pending)) or 1
+        if cpus == 1:
+            processes = 1
+        generated = 0
+        failed: dict[str, str] = {}
+
+        def _merge(chunk: list[type[Block]], results: list[tuple[bool, str]]):
+            nonlocal generated
+            for block_type, (ok, data) in zip(chunk, results):
+                if not ok:
+                    failed[block_type.__qualname__] = data
+                    continue
+
+                interface = BlockInterface.model_validate_json(data)
+                if self.put(block_type, interface):
+                    self.misses += 1
+                    block_type._class_interface = interface
+                    block_type._type_adapters_ready = False
+                else:
+                    # Not serializable faithfully, so generate it in this process
+                    self.load(block_type)
+
+                generated += 1
+
+        if processes == 1:
+            for block_type in pending:
+                _merge([block_type], _generate_interfaces([_block_ref(block_type)]))
+                if progress:
+                    progress(cached + generated + len(failed), total)
+        else:
+            # Several small chunks per process, so that progress is reported
+            # regularly and slow blocks do not hold up a whole process
+            chunk_size = max(1, len(pending) // (processes * 4))
+            chunks = [
+                pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)
+            ]
+            with concurrent.futures.ProcessPoolExecutor(
+                processes, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        _generate_interfaces, [_block_ref(t) for t in chunk]
+                    ): chunk
+                    for chunk in chunks
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    _merge(futures[future], future.result())
+                    if progress:
+                        progress(cached + generated + len(failed), total)
+
+        return WarmupReport(
+            blocks=total,
+            cached=cached,
+            generated=generated,
+            processes=processes,
+            seconds=time.perf_counter() - start,
+            failed=failed,
+        )
+
+    def load_cached(self, block_type: type[Block]) -> BlockInterface | None:
+        """Makes the cached interface the class interface, if there is one."""
+        interface = self.get(block_type)
+        if interface is not None:
+            self.hits += 1
+            block_type._class_interface = interface
+            block_type._type_adapters_ready = False
+
+        return interface
+
+    def clear(self):
+        if not self.path.exists():
+            return
+
+        for entry_path in self.path.glob("*.json"):
+            entry_path.unlink(missing_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def _get_source_hash(self, module_name: str) -> str | None:
+        module = sys.modules.get(module_name)
+        file_path = getattr(module, "__file__", None)
+        if not file_path:
+            return None
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        stamp = (file_path, stat.st_mtime_ns, stat.st_size)
+        if stamp not in self._source_hashes:
+            try:
+                with open(file_path, "rb") as f:
+                    self._source_hashes[stamp] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                return None
+
+        return self._source_hashes[stamp]
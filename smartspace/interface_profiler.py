@@ -0,0 +1,236 @@
+"""Profiler for block interface generation.
+
+``InterfaceProfiler`` wraps the functions that generate block interfaces
+(``_get_ports_and_state``, ``_get_pins``, ``_get_function_pins``,
+``_get_tool_pins`` and ``_map_type_vars``) while it is active and records, for
+every call, the wall time, the number of type adapters and schemas built (type
+registry misses) and the size of the generated JSON schemas. Times are
+inclusive, so a port's time includes the time of the types it maps.
+
+``profile_block_set()`` regenerates the interfaces of a list of blocks from
+scratch under the profiler, as a fresh worker would, and also records totals per
+block and the schema size of every pin.
+"""
+
+import contextlib
+import functools
+import json
+import time
+from typing import Any, Callable, Iterator, Literal
+
+from pydantic import BaseModel
+
+import smartspace.core
+from smartspace.core import Block
+from smartspace.models import InputPinInterface, OutputPinInterface, PortInterface
+from smartspace.utils.type_registry import type_registry
+
+_PROFILED_FUNCTIONS = [
+    "_get_ports_and_state",
+    "_get_pins",
+    "_get_function_pins",
+    "_get_tool_pins",
+    "_map_type_vars",
+]
+
+
+class InterfaceProfileRecord(BaseModel):
+    kind: Literal["block", "port", "pin", "type"]
+    block: str
+    port: str | None = None
+    name: str
+    seconds: float = 0
+    adapters: int = 0
+    schema_bytes: int = 0
+
+
+class InterfaceProfile(BaseModel):
+    records: list[InterfaceProfileRecord] = []
+
+    def top(
+        self, kind: Literal["block", "port", "pin", "type"], count: int | None = None
+    ) -> list[InterfaceProfileRecord]:
+        """Gets the records of a kind, slowest (or largest, for pins) first."""
+        records = sorted(
+            (r for r in self.records if r.kind == kind),
+            key=lambda r: (r.seconds, r.schema_bytes),
+            reverse=True,
+        )
+        return records[:count] if count is not None else records
+
+    def report(self, count: int = 10) -> str:
+        blocks = self.top("block")
+        total = sum(r.seconds for r in blocks)
+        lines = [
+            f"Generated {len(blocks)} block interfaces in {total * 1000:.1f}ms "
+            f"({sum(r.adapters for r in blocks)} adapters, "
+            f"{sum(r.schema_bytes for r in blocks)} schema bytes)",
+        ]
+
+        def _table(title: str, records: list[InterfaceProfileRecord]):
+            lines.append("")
+            lines.append(title)
+            for r in records:
+                location = ".".join(p for p in (r.block, r.port) if p)
+                lines.append(
+                    f"  {r.seconds * 1000:8.2f}ms {r.adapters:4d} adapters "
+                    f"{r.schema_bytes:7d} bytes  {location}: {r.name}"
+                )
+
+        _table("Slowest blocks:", blocks[:count])
+        _table("Slowest ports:", self.top("port", count))
+        _table("Slowest types:", self.top("type", count))
+        _table("Largest pin schemas:", self.top("pin", count))
+
+        return "\n".join(lines)
+
+
+def _get_schema_bytes(value: Any) -> int:
+    if isinstance(value, PortInterface):
+        return sum(
+            _get_schema_bytes(pin)
+            for pin in [*value.inputs.values(), *value.outputs.values()]
+        )
+    elif isinstance(value, (InputPinInterface, OutputPinInterface)):
+        return len(json.dumps(value.json_schema))
+    elif isinstance(value, (tuple, list)):
+        return sum(_get_schema_bytes(v) for v in value)
+    elif isinstance(value, dict):
+        return sum(_get_schema_bytes(v) for v in value.values())
+
+    return 0
+
+
+def _get_argument(args: tuple, kwargs: dict, index: int, name: str) -> Any:
+    return args[index] if len(args) > index else kwargs.get(name)
+
+
+def _get_record(
+    name: str, args: tuple, kwargs: dict, block: str, port: str | None
+) -> InterfaceProfileRecord:
+    if name == "_get_ports_and_state":
+        return InterfaceProfileRecord(kind="port", block=block, name=name)
+    elif name == "_get_pins":
+        port_name = _get_argument(args, kwargs, 1, "port_name")
+        return InterfaceProfileRecord(
+            kind="port", block=block, port=port_name, name=name
+        )
+    elif name in ("_get_function_pins", "_get_tool_pins"):
+        fn = _get_argument(args, kwargs, 0, "fn")
+        port_name = _get_argument(args, kwargs, 1, "port_name") or fn.__name__
+        return InterfaceProfileRecord(
+            kind="port", block=block, port=port_name, name=name
+        )
+    else:
+        original_type = _get_argument(args, kwargs, 0, "original_type")
+        mode = _get_argument(args, kwargs, 1, "mode")
+        return InterfaceProfileRecord(
+            kind="type", block=block, port=port, name=f"{original_type!r} ({mode})"
+        )
+
+
+class InterfaceProfiler:
+    """Records a profile of the interfaces generated while it is active. Not
+    thread safe: interfaces must be generated from the current thread only."""
+
+    def __init__(self):
+        self.profile = InterfaceProfile()
+        self._stack: list[InterfaceProfileRecord] = []
+        self._originals: dict[str, Callable] = {}
+
+    def __enter__(self) -> "InterfaceProfiler":
+        for name in _PROFILED_FUNCTIONS:
+            fn = getattr(smartspace.core, name)
+            self._originals[name] = fn
+            setattr(smartspace.core, name, self._wrap(name, fn))
+
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, fn in self._originals.items():
+            setattr(smartspace.core, name, fn)
+
+        self._originals = {}
+
+    @contextlib.contextmanager
+    def block(self, block_type: type[Block]) -> Iterator[InterfaceProfileRecord]:
+        """Attributes everything generated inside the context to the block, and
+        records the block's totals."""
+        record = InterfaceProfileRecord(
+            kind="block", block=block_type.__name__, name=block_type.__name__
+        )
+        with self._measure(record):
+            yield record
+
+    @contextlib.contextmanager
+    def _measure(self, record: InterfaceProfileRecord) -> Iterator[None]:
+        self._stack.append(record)
+        misses = type_registry.misses
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.adapters = type_registry.misses - misses
+            self._stack.pop()
+            self.profile.records.append(record)
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def _profiled(*args, **kwargs):
+            if self._stack:
+                block, port = self._stack[-1].block, self._stack[-1].port
+            else:
+                block_type = _get_argument(args, kwargs, 0, "block_type")
+                block, port = getattr(block_type, "__name__", ""), None
+
+            record = _get_record(name, args, kwargs, block, port)
+            with self._measure(record):
+                result = fn(*args, **kwargs)
+
+            if record.kind == "port":
+                record.schema_bytes = _get_schema_bytes(result)
+
+            return result
+
+        return _profiled
+
+
+def _reset_interface(block_type: type[Block]):
+    block_type._class_interface = None
+    block_type._type_adapters_ready = False
+    block_type._input_pin_type_adapters = {}
+    block_type._output_pin_type_adapters = {}
+    block_type._state_type_adapters = {}
+
+
+def profile_block_set(
+    block_types: list[type[Block]], fresh_registry: bool = True
+) -> InterfaceProfile:
+    """Regenerates the interfaces of the blocks under the profiler. With
+    fresh_registry, the type registry is cleared first so that the blocks pay for
+    the adapters they build, as they would in a fresh worker."""
+    if fresh_registry:
+        type_registry.clear()
+
+    with InterfaceProfiler() as profiler:
+        for block_type in block_types:
+            _reset_interface(block_type)
+            with profiler.block(block_type) as record:
+                interface = block_type._get_interface()
+
+            record.schema_bytes = _get_schema_bytes(interface.ports)
+
+            for port_name, port in interface.ports.items():
+                for pin_name, pin in [*port.inputs.items(), *port.outputs.items()]:
+                    profiler.profile.records.append(
+                        InterfaceProfileRecord(
+                            kind="pin",
+                            block=block_type.__name__,
+                            port=port_name,
+                            name=pin_name,
+                            schema_bytes=_get_schema_bytes(pin),
+                        )
+                    )
+
+    return profiler.profile
@@ -1,8 +1,11 @@
 import enum
+import hashlib
+import json
 from datetime import datetime
 from typing import Annotated, Any, Generic, TypeVar, Union
 from uuid import UUID
 
+import pydantic_core
 from pydantic import BaseModel, ConfigDict, Field, model_serializer
 
 from smartspace.enums import (
@@ -287,6 +290,34 @@ class OutputPinInterface(BaseModel):
     streaming: bool = False
 
 
+def _get_content_hash_fallback(value: Any) -> str:
+    # Values with no JSON form, such as sentinel defaults, are hashed by their type,
+    # as their repr can hold their address and change from process to process
+    return f"<{type(value).__module__}.{type(value).__qualname__}>"
+
+
+def _get_content_hash(data: Any) -> str:
+    canonical = json.dumps(
+        pydantic_core.to_jsonable_python(
+            data, by_alias=True, fallback=_get_content_hash_fallback
+        ),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _get_block_content_hash(
+    interface: "BlockInterface", port_hashes: dict[str, str]
+) -> str:
+    return _get_content_hash(
+        {
+            **interface.model_dump(by_alias=True, exclude={"ports"}),
+            "ports": port_hashes,
+        }
+    )
+
+
 class PortInterface(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
@@ -296,6 +327,11 @@ class PortInterface(BaseModel):
     type: PortType
     is_function: Annotated[bool, Field(alias="isFunction")]
 
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the port's content, computed on each read."""
+        return _get_content_hash(self)
+
 
 class StateInterface(BaseModel):
     """
@@ -324,6 +360,14 @@ class BlockInterface(BaseModel):
     ports: dict[str, PortInterface]
     state: dict[str, StateInterface]
 
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the interface's content, built from the hashes of its
+        ports and computed on each read."""
+        return _get_block_content_hash(
+            self, {name: port.content_hash for name, port in self.ports.items()}
+        )
+
 
 class FlowContext(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -611,3 +655,40 @@ class StreamingOutputMessage(BaseModel, Generic[StreamingT]):
 
     event: StreamingEvent
     data: StreamingT | None
+
+
+class StreamingDelta(BaseModel):
+    """The data of a DELTA StreamingOutputMessage. The new snapshot is the
+    previous one cut at ``offset`` with ``text`` appended, so an append has an
+    ``offset`` equal to the length of the previous snapshot."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    offset: int
+    text: str
+
+    def apply(self, previous: str) -> str:
+        return previous[: self.offset] + self.text
+
+
+def apply_streaming_message(
+    current: Any, message: StreamingOutputMessage | dict[str, Any]
+) -> Any:
+    """Returns the value of a StreamingOutput pin after a message, given its
+    value after the previous message (None before the first one). The message
+    can be a model or the JSON object it is sent as."""
+    if isinstance(message, StreamingOutputMessage):
+        event, data = message.event, message.data
+    else:
+        event, data = StreamingEvent(message["event"]), message["data"]
+
+    if event != StreamingEvent.DELTA:
+        return data
+
+    if not isinstance(current, str):
+        raise ValueError("A streaming delta can only be applied to a string")
+
+    if not isinstance(data, StreamingDelta):
+        data = StreamingDelta.model_validate(data)
+
+    return data.apply(current)
@@ -0,0 +1,187 @@
+"""Compact serialization of block interfaces with shared schema definitions.
+
+Every pin's JSON schema embeds the ``$defs`` it needs, so a block with many pins
+of the same model (``WebChunks``, ``FileChunks``, ``ThreadMessage``...) repeats
+the same definitions on every pin. ``compact_interface()`` hoists the pin
+definitions into a single ``$defs`` table at the root of the serialized block
+interface, and ``compact_block_set()`` does the same for a whole
+``{name: {version: interface}}`` payload, as sent with ``registerblock``. Pin
+schemas keep their ``#/$defs/...`` references, which now resolve against the
+root of the payload.
+
+``expand_interface()`` and ``expand_block_set()`` are the inverse, for consumers
+that need self-contained pin schemas. When two pins define different schemas
+under the same name, the hoisted definitions are renamed (``Name_2``...), so
+expanded schemas are equivalent to the originals but may use those names.
+
+All functions work on serialized (JSON-compatible) interfaces, dumped either by
+alias (``schema``) or by field name (``json_schema``), and never modify their
+arguments.
+"""
+
+from typing import Any, Iterator
+
+DEFS = "$defs"
+_REF_PREFIX = "#/$defs/"
+
+
+def _rewrite_refs(value: Any, renames: dict[str, str]) -> Any:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_REF_PREFIX):
+            name = ref[len(_REF_PREFIX) :]
+            if renames.get(name, name) != name:
+                value = {**value, "$ref": _REF_PREFIX + renames[name]}
+
+        return {k: _rewrite_refs(v, renames) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_rewrite_refs(v, renames) for v in value]
+
+    return value
+
+
+def _iter_refs(value: Any) -> Iterator[str]:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_REF_PREFIX):
+            yield ref[len(_REF_PREFIX) :]
+
+        for v in value.values():
+            yield from _iter_refs(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _iter_refs(v)
+
+
+def _hoist_schema(
+    schema: dict[str, Any], definitions: dict[str, Any]
+) -> dict[str, Any]:
+    local_definitions: dict[str, Any] = schema.get(DEFS) or {}
+    if not local_definitions:
+        return schema
+
+    # A definition can only be shared if it is identical once its own references
+    # are renamed, so renames are resolved until they are stable
+    renames = {name: name for name in local_definitions}
+    for _ in range(len(local_definitions) + 1):
+        new_renames: dict[str, str] = {}
+        for name, definition in local_definitions.items():
+            rewritten = _rewrite_refs(definition, renames)
+            candidate, i = name, 1
+            while (
+                candidate in definitions and definitions[candidate] != rewritten
+            ) or candidate in new_renames.values():
+                i += 1
+                candidate = f"{name}_{i}"
+
+            new_renames[name] = candidate
+
+        if new_renames == renames:
+            break
+
+        renames = new_renames
+
+    for name, definition in local_definitions.items():
+        definitions.setdefault(renames[name], _rewrite_refs(definition, renames))
+
+    return _rewrite_refs(
+        {k: v for k, v in schema.items() if k != DEFS},
+        renames,
+    )
+
+
+def _expand_schema(
+    schema: dict[str, Any], definitions: dict[str, Any]
+) -> dict[str, Any]:
+    needed: dict[str, Any] = {}
+    pending = list(_iter_refs(schema))
+    while pending:
+        name = pending.pop(0)
+        if name in needed or name not in definitions:
+            continue
+
+        needed[name] = definitions[name]
+        pending.extend(_iter_refs(definitions[name]))
+
+    if not needed:
+        return schema
+
+    return {**schema, DEFS: needed}
+
+
+def _map_pin_schemas(interface: dict[str, Any], fn) -> dict[str, Any]:
+    ports = {}
+    for port_name, port in interface.get("ports", {}).items():
+        port = dict(port)
+        for direction in ("inputs", "outputs"):
+            pins = {}
+            for pin_name, pin in port.get(direction, {}).items():
+                key = "schema" if "schema" in pin else "json_schema"
+                pins[pin_name] = {**pin, key: fn(pin[key])} if key in pin else pin
+
+            port[direction] = pins
+
+        ports[port_name] = port
+
+    return {**interface, "ports": ports}
+
+
+def compact_interface(interface: dict[str, Any]) -> dict[str, Any]:
+    """Moves the definitions of every pin schema into a $defs table at the root
+    of the interface."""
+    definitions: dict[str, Any] = dict(interface.get(DEFS) or {})
+    compacted = _map_pin_schemas(
+        interface, lambda schema: _hoist_schema(schema, definitions)
+    )
+    if definitions:
+        compacted[DEFS] = definitions
+
+    return compacted
+
+
+def expand_interface(interface: dict[str, Any]) -> dict[str, Any]:
+    """Makes every pin schema of a compacted interface self-contained again."""
+    definitions: dict[str, Any] = interface.get(DEFS) or {}
+    expanded = _map_pin_schemas(
+        interface, lambda schema: _expand_schema(schema, definitions)
+    )
+    expanded.pop(DEFS, None)
+
+    return expanded
+
+
+def compact_block_set(
+    blocks: dict[str, dict[str, dict[str, Any]]],
+) -> dict[str, Any]:
+    """Moves the definitions of every pin schema of every block into a single $defs
+    table at the root of a {name: {version: interface}} payload."""
+    definitions: dict[str, Any] = {}
+    compacted: dict[str, Any] = {
+        name: {
+            version: _map_pin_schemas(
+                interface, lambda schema: _hoist_schema(schema, definitions)
+            )
+            for version, interface in versions.items()
+        }
+        for name, versions in blocks.items()
+        if name != DEFS
+    }
+    if definitions:
+        compacted[DEFS] = definitions
+
+    return compacted
+
+
+def expand_block_set(data: dict[str, Any]) -> dict[str, dict[str, dict[str, Any]]]:
+    """Makes every pin schema of a compacted block set payload self-contained."""
+    definitions: dict[str, Any] = data.get(DEFS) or {}
+    return {
+        name: {
+            version: _map_pin_schemas(
+                interface, lambda schema: _expand_schema(schema, definitions)
+            )
+            for version, interface in versions.items()
+        }
+        for name, versions in data.items()
+        if name != DEFS
+    }
@@ -0,0 +1,127 @@
+"""A minimal local SignalR hub that stands in for the SmartSpace debug server in
+tests. It supports negotiation and the JSON protocol handshake, can invoke
+methods on the connected client, and records every message the client sends
+together with the time it was received, including invocations of hub methods
+such as runblockmessages."""
+
+import asyncio
+import json
+import time
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+RECORD_SEPARATOR = "\x1e"
+
+
+class LocalSignalRServer:
+    def __init__(self, path: str = "/debug"):
+        self.path = path
+        self.received: list[tuple[float, dict[str, Any]]] = []
+        self.connected = asyncio.Event()
+        self._ws: web.WebSocketResponse | None = None
+        self._runner: web.AppRunner | None = None
+        self._invocations = 0
+        self._completions: dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "LocalSignalRServer":
+        app = web.Application()
+        app.router.add_post(f"{self.path}/negotiate", self._negotiate)
+        app.router.add_get(self.path, self._connect)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._ws is not None:
+            await self._ws.close()
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}{self.path}"
+
+    async def invoke(self, target: str, arguments: list[Any]) -> str:
+        """Invokes a method on the client and returns the invocation id."""
+        await asyncio.wait_for(self.connected.wait(), 10)
+        assert self._ws is not None
+
+        self._invocations += 1
+        invocation_id = str(self._invocations)
+        self._completions[invocation_id] = asyncio.get_running_loop().create_future()
+        await self._ws.send_str(
+            json.dumps(
+                {
+                    "type": 1,
+                    "invocationId": invocation_id,
+                    "target": target,
+                    "arguments": arguments,
+                }
+            )
+            + RECORD_SEPARATOR
+        )
+
+        return invocation_id
+
+    async def completion(
+        self, invocation_id: str, timeout: float = 10
+    ) -> dict[str, Any]:
+        return await asyncio.wait_for(self._completions[invocation_id], timeout)
+
+    def messages(self, invocation_id: str) -> list[tuple[float, dict[str, Any]]]:
+        """The runblockmessages invocations and the completion the client sent for
+        an invocation."""
+        return [
+            (t, m)
+            for t, m in self.received
+            if m.get("invocationId") == invocation_id
+            or (
+                m.get("target") == "runblockmessages"
+                and m["arguments"][0] == invocation_id
+            )
+        ]
+
+    async def _negotiate(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "connectionId": "local",
+                "availableTransports": [
+                    {"transport": "WebSockets", "transferFormats": ["Text"]}
+                ],
+            }
+        )
+
+    async def _connect(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        handshake = await ws.receive_str()
+        assert json.loads(handshake.rstrip(RECORD_SEPARATOR))["protocol"] == "json"
+        await ws.send_str("{}" + RECORD_SEPARATOR)
+
+        self._ws = ws
+        self.connected.set()
+
+        async for raw in ws:
+            if raw.type != WSMsgType.TEXT:
+                continue
+
+            for item in raw.data.split(RECORD_SEPARATOR):
+                if not item:
+                    continue
+
+                message = json.loads(item)
+                self.received.append((time.perf_counter(), message))
+
+                future = self._completions.get(message.get("invocationId", ""))
+                if message.get("type") == 3 and future and not future.done():
+                    future.set_result(message)
+
+        return ws
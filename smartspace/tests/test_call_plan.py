@@ -0,0 +1,63 @@
+import gc
+import inspect
+import weakref
+
+import pytest
+
+from smartspace.core import _get_call_plan
+
+
+async def _fn(self, a: int, b: int = 2, *items: int, c: str = "c", **extra: str): ...
+
+
+@pytest.mark.parametrize(
+    "args,kwargs",
+    [
+        ((1,), {}),
+        ((1, 3, 4, 5), {"c": "x", "d": "y"}),
+        ((), {"a": 1, "b": 5}),
+    ],
+)
+def test_call_plan_binds_like_signature(args, kwargs):
+    binding = inspect.signature(_fn).bind(None, *args, **kwargs)
+    binding.apply_defaults()
+    expected = dict(binding.arguments)
+    expected.pop("self")
+
+    bound = _get_call_plan(_fn).bind(args, kwargs)
+
+    assert bound == expected
+    assert list(bound) == list(expected)
+
+
+@pytest.mark.parametrize(
+    "args,kwargs",
+    [
+        ((), {}),
+        ((1,), {"a": 1}),
+    ],
+)
+def test_call_plan_raises_like_signature(args, kwargs):
+    with pytest.raises(TypeError):
+        _get_call_plan(_fn).bind(args, kwargs)
+
+
+def test_call_plan_is_compiled_once_per_function():
+    plan = _get_call_plan(_fn)
+
+    assert _get_call_plan(_fn) is plan
+    assert plan.positional == ("a", "b")
+    assert plan.var_positional == "items"
+    assert plan.var_keyword == "extra"
+    assert not plan.has_return
+
+
+def test_call_plans_do_not_keep_functions_alive():
+    async def fn(self, a: int): ...
+
+    ref = weakref.ref(fn)
+    _get_call_plan(fn)
+    del fn
+    gc.collect()
+
+    assert ref() is None
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from smartspace.core import (
+    Block,
+    MessageCoalescing,
+    Output,
+    OutputChannel,
+    Tool,
+    callback,
+    step,
+)
+from smartspace.models import BlockPinRef, InputValue
+
+
+class Emitter(Block):
+    class Operation(Tool):
+        def run(self, item: Any) -> Any: ...
+
+    operation: Operation
+    items: OutputChannel[int]
+    done: Output[bool]
+
+    @step()
+    async def emit(self, count: int, call_at: int = -1, pause: float = 0):
+        for i in range(count):
+            if i == call_at:
+                await self.operation.call(i).then(lambda result: self.collect(result))
+
+            self.items.send(i)
+            if pause:
+                await asyncio.sleep(pause)
+
+        self.items.close()
+        self.done.send(True)
+
+    @callback()
+    async def collect(self, result: Any): ...
+
+
+async def _run(
+    coalescing: MessageCoalescing | None, **inputs: Any
+) -> list[list[tuple[str, Any]]]:
+    block = Emitter()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="emit", pin=name), value=value)
+            for name, value in inputs.items()
+        ]
+    )
+
+    return [
+        [(o.source.port, getattr(o.value, "data", o.value)) for o in m.outputs]
+        for m in [m async for m in await block._run_function("emit", coalescing)]
+    ]
+
+
+def _flatten(messages: list[list[tuple[str, Any]]]) -> list[tuple[str, Any]]:
+    return [output for outputs in messages for output in outputs]
+
+
+@pytest.mark.asyncio
+async def test_coalescing_merges_outputs_in_order():
+    plain = await _run(None, count=5)
+    merged = await _run(MessageCoalescing(), count=5)
+
+    assert len(plain) == 9
+    assert len(merged) == 1
+    assert _flatten(merged) == _flatten(plain)
+
+
+@pytest.mark.asyncio
+async def test_coalescing_keeps_tool_calls_separate():
+    block = Emitter()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="emit", pin="count"), value=4),
+            InputValue(target=BlockPinRef(port="emit", pin="call_at"), value=2),
+        ]
+    )
+    call = (await block._run_function("emit")).coalesce()
+    messages = [m async for m in call]
+
+    assert [len(m.outputs) for m in messages] == [2, 1, 5]
+    assert not messages[0].redirects and not messages[2].redirects
+    assert messages[1].redirects[0].target == BlockPinRef(port="collect", pin="result")
+
+
+@pytest.mark.asyncio
+async def test_coalescing_limits_outputs_per_message():
+    merged = await _run(MessageCoalescing(max_outputs=2), count=5)
+
+    assert [len(outputs) for outputs in merged[:3]] == [2, 2, 2]
+    assert _flatten(merged) == _flatten(await _run(None, count=5))
+
+
+@pytest.mark.asyncio
+async def test_coalescing_waits_for_max_delay():
+    without_delay = await _run(MessageCoalescing(), count=3, call_at=-1, pause=0.01)
+    with_delay = await _run(
+        MessageCoalescing(max_delay=1), count=3, call_at=-1, pause=0.01
+    )
+
+    assert len(without_delay) > 1
+    assert len(with_delay) == 1
+    assert _flatten(with_delay) == _flatten(without_delay)
@@ -0,0 +1,307 @@
+import asyncio
+import datetime
+import json
+from typing import Any
+
+import pytest
+from pysignalr.client import SignalRClient
+from pysignalr.messages import CompletionMessage, InvocationMessage
+from pysignalr.protocol.json import MessageEncoder
+
+from smartspace.cli.debug import (
+    DebugOptions,
+    DebugProtocol,
+    DebugRunner,
+    JSONFragment,
+    encode_json,
+    parse_block_limits,
+)
+from smartspace.core import (
+    Block,
+    BlockSet,
+    MessageRecord,
+    OutputChannel,
+    OutputRecord,
+    step,
+)
+from smartspace.models import (
+    BlockPinRef,
+    BlockRunData,
+    FileChunk,
+    FileChunks,
+    FileWithContent,
+    InputValue,
+)
+from smartspace.tests.signalr_server import LocalSignalRServer
+
+
+class SlowStreamer(Block):
+    tokens: OutputChannel[str]
+
+    @step(output_name="text")
+    async def generate(self, count: int, delay: float) -> str:
+        for i in range(count):
+            await asyncio.sleep(delay)
+            self.tokens.send(f"token {i}")
+
+        return "done"
+
+
+class Sleeper(Block):
+    @step(output_name="slept")
+    async def sleep(self, delay: float) -> float:
+        name = self.__class__.__name__
+        _in_flight[name] = _in_flight.get(name, 0) + 1
+        _max_in_flight[name] = max(_max_in_flight.get(name, 0), _in_flight[name])
+        _in_flight["*"] = _in_flight.get("*", 0) + 1
+        _max_in_flight["*"] = max(_max_in_flight.get("*", 0), _in_flight["*"])
+
+        await asyncio.sleep(delay)
+
+        _in_flight[name] -= 1
+        _in_flight["*"] -= 1
+        return delay
+
+
+class OtherSleeper(Sleeper): ...
+
+
+_in_flight: dict[str, int] = {}
+_max_in_flight: dict[str, int] = {}
+
+
+def _request(name: str, function: str, **inputs: Any) -> list:
+    return [
+        BlockRunData(
+            name=name,
+            version="1.0.0",
+            function=function,
+            context=None,
+            state=None,
+            inputs=[
+                InputValue(target=BlockPinRef(port=function, pin=pin), value=value)
+                for pin, value in inputs.items()
+            ],
+            dynamic_ports=None,
+            dynamic_output_pins=None,
+            dynamic_input_pins=None,
+        ).model_dump(by_alias=True, mode="json")
+    ]
+
+
+async def _serve(
+    options: DebugOptions, requests: list[list]
+) -> tuple[LocalSignalRServer, list[str], list[dict], float]:
+    _in_flight.clear()
+    _max_in_flight.clear()
+
+    async with LocalSignalRServer() as server:
+        client = SignalRClient(server.url, protocol=DebugProtocol(), headers={})
+        runner = DebugRunner(client, options)
+        runner.block_set = BlockSet()
+        for block_type in (SlowStreamer, Sleeper, OtherSleeper):
+            runner.block_set.add(block_type)
+
+        task = asyncio.ensure_future(client.run())
+        try:
+            start = asyncio.get_running_loop().time()
+            invocation_ids = [
+                await server.invoke("run_block", request) for request in requests
+            ]
+            completions = await asyncio.gather(
+                *(server.completion(i, timeout=30) for i in invocation_ids)
+            )
+            elapsed = asyncio.get_running_loop().time() - start
+            await runner.join()
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # Lets the websocket connection close before the event loop does
+            await asyncio.sleep(0.1)
+
+    return server, invocation_ids, completions, elapsed
+
+
+async def _run(options: DebugOptions, count: int = 3, delay: float = 0.2):
+    server, invocation_ids, completions, elapsed = await _serve(
+        options, [_request("SlowStreamer", "generate", count=count, delay=delay)]
+    )
+
+    return server.messages(invocation_ids[0]), completions[0], elapsed
+
+
+def _tokens(messages: list[dict]) -> list[str]:
+    return [
+        o["value"]["data"]
+        for m in messages
+        for o in m["outputs"]
+        if o["source"]["port"] == "tokens"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_completion_mode_sends_all_messages_at_the_end():
+    messages, completion, _ = await _run(DebugOptions(delay_after_run=0))
+
+    assert [m["type"] for _, m in messages] == [3]
+    assert _tokens(completion["result"]) == ["token 0", "token 1", "token 2"]
+    assert completion["result"][-2]["outputs"][0]["value"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_stream_mode_sends_messages_as_they_are_produced():
+    messages, completion, elapsed = await _run(
+        DebugOptions(stream=True, delay_after_run=0)
+    )
+
+    chunks = [(t, m["arguments"][1]) for t, m in messages if m["type"] == 1]
+    items = [(t, item) for t, chunk in chunks for item in chunk]
+    completed_at = messages[-1][0]
+
+    assert messages[-1][1]["type"] == 3
+    assert completion["result"] == []
+    # Stream items are only accepted for stream invocations
+    assert all(m["type"] != 2 for _, m in messages)
+    assert all("invocationId" not in m for _, m in messages[:-1])
+    assert _tokens([item for _, item in items]) == ["token 0", "token 1", "token 2"]
+    assert items[-2][1]["outputs"][0]["value"] == "done"
+
+    # The first token arrives long before the run completes
+    assert completed_at - items[0][0] >= 0.3
+    assert elapsed >= 0.6
+
+
+@pytest.mark.asyncio
+async def test_stream_mode_batches_messages_that_are_ready():
+    messages, completion, _ = await _run(
+        DebugOptions(stream=True, max_chunk_messages=50, delay_after_run=0),
+        count=200,
+        delay=0,
+    )
+
+    chunks = [m["arguments"][1] for _, m in messages if m["type"] == 1]
+
+    assert _tokens([item for chunk in chunks for item in chunk]) == [
+        f"token {i}" for i in range(200)
+    ]
+    assert len(chunks) < 200
+    assert max(len(chunk) for chunk in chunks) <= 50
+
+
+def _sleeps(name: str, count: int, delay: float) -> list[list]:
+    return [_request(name, "sleep", delay=delay) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_runs_are_serialized_by_default():
+    _, _, completions, elapsed = await _serve(
+        DebugOptions(delay_after_run=0), _sleeps("Sleeper", 5, 0.1)
+    )
+
+    assert all(c["result"][0]["outputs"][0]["value"] == 0.1 for c in completions)
+    assert _max_in_flight["*"] == 1
+    assert elapsed >= 0.5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_under_load():
+    _, _, completions, elapsed = await _serve(
+        DebugOptions(max_concurrent_runs=20, delay_after_run=0),
+        _sleeps("Sleeper", 200, 0.1),
+    )
+
+    assert len(completions) == 200
+    assert all("error" not in c for c in completions)
+    assert _max_in_flight["*"] == 20
+    # 10 rounds of 0.1s, where serialized runs would take 20s
+    assert 1 <= elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_block_limits():
+    _, _, completions, _ = await _serve(
+        DebugOptions(
+            max_concurrent_runs=0,
+            block_limits={"Sleeper": 2},
+            delay_after_run=0,
+        ),
+        _sleeps("Sleeper", 10, 0.1) + _sleeps("OtherSleeper", 10, 0.1),
+    )
+
+    assert len(completions) == 20
+    assert _max_in_flight["Sleeper"] == 2
+    assert _max_in_flight["OtherSleeper"] == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_run_completes_with_an_error():
+    _, _, completions, _ = await _serve(
+        DebugOptions(delay_after_run=0), [_request("Missing", "run")]
+    )
+
+    assert "Could not find block" in completions[0]["error"]
+    assert "result" not in completions[0]
+
+
+def test_parse_block_limits():
+    assert parse_block_limits(["A=1", "B=10"]) == {"A": 1, "B": 10}
+
+    for value in ["A", "A=0", "=2", "A=x"]:
+        with pytest.raises(ValueError):
+            parse_block_limits([value])
+
+
+def _record() -> MessageRecord:
+    parent = FileWithContent(id="1", name="a.txt", content="some content")
+    chunks = FileChunks(
+        parent=parent,
+        chunks=[
+            FileChunk(
+                index=0,
+                position=0,
+                content="some",
+                name="a.txt",
+                parentInfo=parent.as_info(),
+            )
+        ],
+    )
+    return MessageRecord(
+        outputs=[
+            OutputRecord("chunks", "", chunks),
+            OutputRecord("raw", "", b"bytes"),
+            OutputRecord("at", "", datetime.datetime(2024, 1, 1)),
+        ]
+    )
+
+
+def test_encode_json_writes_fragments_as_they_are():
+    assert encode_json({"a": JSONFragment(b'{"b":1}'), "c": [1, 2]}) == (
+        b'{"a":{"b":1},"c":[1,2]}'
+    )
+    assert encode_json({"a": [JSONFragment(b"[1]"), "x"]}) == b'{"a":[[1],"x"]}'
+    assert encode_json({"a": ["1", [JSONFragment(b"{}")]]}) == b'{"a":["1",[{}]]}'
+
+
+def test_protocol_encodes_fragments_like_dumped_messages():
+    record = _record()
+    stdlib = DebugProtocol(lambda data: MessageEncoder().encode(data).encode())
+    fast = DebugProtocol()
+
+    for fragment_message, dumped_message in [
+        (
+            CompletionMessage("1", [JSONFragment(record.dump_json())], headers={}),
+            CompletionMessage("1", [record.dump()], headers={}),
+        ),
+        (
+            InvocationMessage(
+                None, "runblockmessages", ["1", [JSONFragment(record.dump_json())]]
+            ),
+            InvocationMessage(None, "runblockmessages", ["1", [record.dump()]]),
+        ),
+    ]:
+        encoded = fast.encode(fragment_message)
+        expected = stdlib.encode(dumped_message)
+
+        assert json.loads(encoded.rstrip("\x1e")) == json.loads(expected.rstrip("\x1e"))
+        assert encoded.endswith("\x1e") == expected.endswith("\x1e")
+        assert "error" not in json.loads(encoded.rstrip("\x1e"))
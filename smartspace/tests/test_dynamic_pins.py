@@ -0,0 +1,61 @@
+from typing import Any
+
+from smartspace.core import Block, OutputChannel, Tool, step
+from smartspace.models import BlockPinRef
+
+
+class SendValues(Tool[..., None]):
+    def run(self, *values: Any, **named: Any) -> None: ...
+
+
+class DynamicPinsBlock(Block):
+    tools: list[SendValues]
+    named_tools: dict[str, SendValues]
+
+    @step()
+    async def run(self, *values: int, **named: str): ...
+
+
+def test_dynamic_pins_are_created_on_their_ports():
+    block = DynamicPinsBlock()
+    block._load(
+        dynamic_ports=["tools.0", "tools.1", "named_tools.a"],
+        dynamic_input_pins=[
+            BlockPinRef(port="run", pin="values.1"),
+            BlockPinRef(port="run", pin="named.x"),
+        ],
+        dynamic_output_pins=[
+            BlockPinRef(port="tools.1", pin="values.0"),
+            BlockPinRef(port="tools.1", pin="values.1"),
+            BlockPinRef(port="named_tools.a", pin="named.y"),
+        ],
+    )
+
+    assert block.run.values == [None, None]  # type: ignore
+    assert block.run.named == {"x": None}  # type: ignore
+
+    assert block.tools[0].values == []  # type: ignore
+    assert [o.pin for o in block.tools[1].values] == [  # type: ignore
+        BlockPinRef(port="tools.1", pin="values"),
+        BlockPinRef(port="tools.1", pin="values"),
+    ]
+    assert block.tools[1].output_names == ["values.0", "values.1"]
+
+    named = block.named_tools["a"]
+    assert isinstance(named.named["y"], OutputChannel)  # type: ignore
+    assert named.output_names == ["named.y"]
+
+
+def test_dynamic_output_pins_on_many_ports():
+    size = 2000
+    block = DynamicPinsBlock()
+    block._load(
+        dynamic_ports=[f"tools.{i}" for i in range(size)],
+        dynamic_output_pins=[
+            BlockPinRef(port=f"tools.{i}", pin="values.0") for i in range(size)
+        ],
+    )
+
+    assert len(block.tools) == size
+    assert all(len(tool.values) == 1 for tool in block.tools)  # type: ignore
+    assert sum(len(pins) for pins in block._dynamic_outputs.values()) == size
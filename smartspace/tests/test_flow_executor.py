@@ -0,0 +1,468 @@
+import asyncio
+from typing import Annotated, Any
+
+import pytest
+
+from smartspace.blocks.loops import Collect, ForEach, Map
+from smartspace.core import (
+    Block,
+    BlockError,
+    BlockSet,
+    Input,
+    Output,
+    OutputChannel,
+    StreamingOutput,
+    Tool,
+    callback,
+    step,
+)
+from smartspace.flow_executor import BlockTool, FlowExecutor, run_block
+from smartspace.models import (
+    BlockPinRef,
+    Connection,
+    FlowBlock,
+    FlowBlockConstant,
+    FlowConstant,
+    FlowDefinition,
+    FlowInput,
+    FlowOutput,
+    FlowPinRef,
+    FlowVariable,
+)
+
+
+class Double(Block):
+    @step(output_name="doubled")
+    async def double(self, value: int) -> int:
+        return value * 2
+
+
+class Add(Block):
+    @step(output_name="sum")
+    async def add(self, a: int, b: Annotated[int, Input(sticky=True)]) -> int:
+        return a + b
+
+
+class Sleeper(Block):
+    @step(output_name="slept")
+    async def sleep(self, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+
+class Failing(Block):
+    @step(output_name="never")
+    async def fail(self, value: Any) -> Any:
+        raise ValueError("broken")
+
+
+class Writer(Block):
+    text: StreamingOutput[str]
+
+    @step(output_name="length")
+    async def write(self, words: list[str]) -> int:
+        text = ""
+        for word in words:
+            text += word
+            self.text.update(text)
+            await asyncio.sleep(0)
+
+        self.text.finalize(text)
+        return len(text)
+
+
+class Splitter(Block):
+    pieces: OutputChannel[str]
+
+    @step()
+    async def split(self, text: str):
+        for piece in text.split():
+            self.pieces.send(piece)
+
+        self.pieces.close()
+
+
+class Square(Block):
+    @step(output_name="squared")
+    async def square(self, item: int) -> int:
+        return item * item
+
+
+class Summer(Block):
+    class Add(Tool):
+        def run(self, first: int, *rest: int) -> int: ...
+
+    add: Add
+    total: Output[int]
+
+    @step()
+    async def sum(self, values: list[int]):
+        await self.add.call(values[0], *values[1:]).then(
+            lambda result: self.done(result)
+        )
+
+    @callback()
+    async def done(self, result: int):
+        self.total.send(result)
+
+
+_received: list[Any] = []
+
+
+class Recorder(Block):
+    @step()
+    async def record(self, value: Any):
+        _received.append(value)
+
+
+def _block_set() -> BlockSet:
+    block_set = BlockSet()
+    for block_type in (
+        Double,
+        Add,
+        Sleeper,
+        Failing,
+        Writer,
+        Splitter,
+        Recorder,
+        Map,
+        Collect,
+        ForEach,
+    ):
+        block_set.add(block_type)
+
+    return block_set
+
+
+def _pin(node: str, port: str | None = None, pin: str | None = None) -> FlowPinRef:
+    return FlowPinRef(node=node, port=port, pin=pin)
+
+
+def _flow(
+    blocks: dict[str, str | FlowBlock],
+    connections: list[tuple[FlowPinRef, FlowPinRef]],
+    inputs: list[str] = [],
+    outputs: list[str] = [],
+    constants: dict[str, Any] = {},
+    variables: list[str] = [],
+) -> FlowDefinition:
+    return FlowDefinition(
+        inputs={name: FlowInput.from_type(Any) for name in inputs},
+        outputs={name: FlowOutput.from_type(Any) for name in outputs},
+        variables={
+            name: FlowVariable(json_schema=FlowInput.from_type(Any).json_schema)
+            for name in variables
+        },
+        constants={
+            name: FlowConstant(value=value) for name, value in constants.items()
+        },
+        blocks={
+            name: block
+            if isinstance(block, FlowBlock)
+            else FlowBlock(name=block, version="1.0.0")
+            for name, block in blocks.items()
+        },
+        connections=[
+            Connection(source=source, target=target) for source, target in connections
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_values_are_routed_through_blocks():
+    flow = _flow(
+        {"first": "Double", "second": "Double"},
+        [
+            (_pin("value"), _pin("first", "double", "value")),
+            (_pin("first", "double", "doubled"), _pin("second", "double", "value")),
+            (_pin("first", "double", "doubled"), _pin("once")),
+            (_pin("second", "double", "doubled"), _pin("twice")),
+            (_pin("second", "double", "doubled"), _pin("result")),
+        ],
+        inputs=["value"],
+        outputs=["once", "twice"],
+        variables=["result"],
+    )
+
+    result = await FlowExecutor(flow, _block_set()).run({"value": 3})
+
+    assert result.outputs == {"once": 6, "twice": 12}
+    assert result.variables == {"result": 12}
+    assert result.runs == {"first": 1, "second": 1}
+
+
+@pytest.mark.asyncio
+async def test_variable_writes_reach_their_readers():
+    flow = _flow(
+        {"double": "Double", "record": "Recorder"},
+        [
+            (_pin("value"), _pin("double", "double", "value")),
+            (_pin("double", "double", "doubled"), _pin("result")),
+            (_pin("result"), _pin("record", "record", "value")),
+        ],
+        inputs=["value"],
+        variables=["result"],
+    )
+    _received.clear()
+
+    result = await FlowExecutor(flow, _block_set()).run(
+        {"value": 3}, variables={"result": 1}
+    )
+
+    # The initial value is read at start, and the write after it
+    assert _received == [1, 6]
+    assert result.variables == {"result": 6}
+    assert result.runs == {"double": 1, "record": 2}
+
+
+@pytest.mark.asyncio
+async def test_sticky_inputs_and_constants():
+    flow = _flow(
+        {
+            "splitter": "Splitter",
+            "length": "Double",
+            "add": FlowBlock(
+                name="Add",
+                version="1.0.0",
+                constants=[
+                    FlowBlockConstant(target=BlockPinRef(port="add", pin="b"), value=1)
+                ],
+            ),
+            "record": "Recorder",
+        },
+        [
+            (_pin("numbers"), _pin("splitter", "split", "text")),
+            (_pin("splitter", "pieces", ""), _pin("add", "add", "a")),
+            (_pin("add", "add", "sum"), _pin("record", "record", "value")),
+            (_pin("offset"), _pin("length", "double", "value")),
+        ],
+        constants={"numbers": "1 2 3"},
+        inputs=["offset"],
+    )
+    _received.clear()
+
+    result = await FlowExecutor(flow, _block_set()).run({"offset": 5})
+
+    # The sticky constant is used for every value from the channel, whose close
+    # is not sent to the pin as it is not a channel
+    assert sorted(_received) == [2, 3, 4]
+    assert result.runs["add"] == 3
+
+
+@pytest.mark.asyncio
+async def test_channels_and_state_scopes():
+    flow = _flow(
+        {
+            "first": "ForEach",
+            "second": "ForEach",
+            "collect": "Collect",
+            "record": "Recorder",
+        },
+        [
+            (_pin("a"), _pin("first", "foreach", "items")),
+            (_pin("b"), _pin("second", "foreach", "items")),
+            (_pin("first", "item", ""), _pin("collect", "collect", "item")),
+            (_pin("second", "item", ""), _pin("collect", "collect", "item")),
+            (_pin("collect", "items", ""), _pin("collected")),
+            (_pin("collect", "items", ""), _pin("record", "record", "value")),
+        ],
+        inputs=["a", "b"],
+        variables=["collected"],
+    )
+    executor = FlowExecutor(flow, _block_set())
+
+    result = await executor.run({"a": [1, 2, 3]})
+    assert result.variables["collected"] == [1, 2, 3]
+
+    # Each ForEach run is a channel, with its own Collect state
+    _received.clear()
+    await executor.run({"a": [1, 2, 3], "b": [4, 5]})
+
+    assert sorted(_received) == [[1, 2, 3], [4, 5]]
+
+
+def _map_flow(synchronous: bool = False) -> FlowDefinition:
+    return _flow(
+        {
+            "map": FlowBlock(
+                name="Map",
+                version="1.0.0",
+                constants=[
+                    FlowBlockConstant(
+                        target=BlockPinRef(port="synchronous", pin=""),
+                        value=synchronous,
+                    )
+                ],
+            ),
+            "double": "Double",
+        },
+        [
+            (_pin("items"), _pin("map", "map", "items")),
+            (_pin("map", "run", "item"), _pin("double", "double", "value")),
+            (_pin("double", "double", "doubled"), _pin("map", "run", "return")),
+            (_pin("map", "results", ""), _pin("results")),
+        ],
+        inputs=["items"],
+        outputs=["results"],
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("synchronous", [False, True])
+async def test_tool_calls_are_redirected_to_the_callback(synchronous: bool):
+    items = list(range(50))
+
+    result = await FlowExecutor(_map_flow(synchronous), _block_set()).run(
+        {"items": items}
+    )
+
+    assert result.outputs["results"] == [i * 2 for i in items]
+    assert result.runs == {"map": 51, "double": 50}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_executions_of_a_stateful_flow():
+    executor = FlowExecutor(_map_flow(), _block_set())
+
+    results = await asyncio.gather(
+        *(executor.run({"items": [i] * 10}) for i in range(10))
+    )
+
+    assert [r.outputs["results"] for r in results] == [[i * 2] * 10 for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_streaming_outputs():
+    flow = _flow(
+        {"writer": "Writer", "record": "Recorder"},
+        [
+            (_pin("words"), _pin("writer", "write", "words")),
+            (_pin("writer", "text", ""), _pin("text")),
+            (_pin("writer", "text", ""), _pin("record", "record", "value")),
+        ],
+        inputs=["words"],
+        outputs=["text"],
+    )
+    _received.clear()
+
+    result = await FlowExecutor(flow, _block_set()).run({"words": ["a", "b", "c"]})
+
+    assert result.outputs["text"] == "abc"
+    # Blocks only get the final value
+    assert _received == ["abc"]
+
+
+@pytest.mark.asyncio
+async def test_independent_blocks_run_concurrently():
+    flow = _flow(
+        {f"sleep{i}": "Sleeper" for i in range(10)},
+        [(_pin("delay"), _pin(f"sleep{i}", "sleep", "delay")) for i in range(10)],
+        inputs=["delay"],
+    )
+    executor = FlowExecutor(flow, _block_set())
+
+    start = asyncio.get_running_loop().time()
+    await executor.run({"delay": 0.2})
+    assert asyncio.get_running_loop().time() - start < 0.5
+
+    start = asyncio.get_running_loop().time()
+    await FlowExecutor(flow, _block_set(), max_concurrent_runs=5).run({"delay": 0.2})
+    assert asyncio.get_running_loop().time() - start >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_block_errors_stop_the_execution():
+    flow = _flow(
+        {"fail": "Failing", "sleep": "Sleeper"},
+        [
+            (_pin("value"), _pin("fail", "fail", "value")),
+            (_pin("delay"), _pin("sleep", "sleep", "delay")),
+        ],
+        inputs=["value", "delay"],
+    )
+
+    start = asyncio.get_running_loop().time()
+    with pytest.raises(BlockError) as e:
+        await FlowExecutor(flow, _block_set()).run({"value": 1, "delay": 10})
+
+    assert e.value.data == {"node": "fail", "function": "fail"}
+    assert isinstance(e.value.__cause__, ValueError)
+    assert asyncio.get_running_loop().time() - start < 1
+
+
+def test_invalid_flows():
+    with pytest.raises(ValueError, match="Could not find block"):
+        FlowExecutor(_flow({"missing": "Missing"}, []), _block_set())
+
+    with pytest.raises(ValueError, match="no input pin"):
+        FlowExecutor(
+            _flow(
+                {"double": "Double"},
+                [(_pin("value"), _pin("double", "double", "missing"))],
+                inputs=["value"],
+            ),
+            _block_set(),
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("synchronous", [False, True])
+async def test_run_block_with_callable_tools(synchronous: bool):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def double(item: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return item * 2
+
+    result = await run_block(
+        Map,
+        "map",
+        {"items": list(range(20))},
+        tools={"run": double},
+        config={"synchronous": synchronous},
+    )
+
+    assert result.outputs["results"] == [i * 2 for i in range(20)]
+    assert result.runs == {"block": 21, "block.run": 20}
+    assert max_in_flight == (1 if synchronous else 20)
+
+
+@pytest.mark.asyncio
+async def test_run_block_with_block_tools():
+    result = await run_block(
+        Map, "map", {"items": [1, 2, 3]}, tools={"run": BlockTool(Square, "square")}
+    )
+
+    assert result.outputs["results"] == [1, 4, 9]
+    assert result.runs == {"block": 4, "tools.run": 3}
+
+
+@pytest.mark.asyncio
+async def test_tool_arguments():
+    result = await run_block(
+        Summer,
+        "sum",
+        {"values": [1, 2, 3, 4]},
+        tools={"add": lambda first, *rest: first * 100 + sum(rest)},
+    )
+
+    assert result.outputs["total"] == 109
+
+
+@pytest.mark.asyncio
+async def test_tool_errors():
+    def fail(item: int) -> int:
+        raise ValueError("broken")
+
+    with pytest.raises(BlockError) as e:
+        await run_block(Map, "map", {"items": [1]}, tools={"run": fail})
+
+    assert e.value.data == {"node": "block", "tool": "run"}
+
+    with pytest.raises(ValueError, match="no tool port"):
+        await run_block(Map, "map", {"items": [1]}, tools={"missing": fail})
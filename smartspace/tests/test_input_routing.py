@@ -0,0 +1,147 @@
+from typing import Annotated, Any
+
+import pytest
+
+from pydantic import BaseModel
+
+from smartspace.core import Block, Config, Output, step
+from smartspace.models import BlockPinRef, InputValue
+
+
+class Option:
+    condition: Annotated[str, Config()] = ""
+    tags: dict[str, Annotated[str, Config()]]
+    output: Output[Any]
+
+
+class RoutedBlock(Block):
+    limit: Annotated[int, Config()] = 0
+    options: list[Option]
+    named: dict[str, Option]
+
+    @step()
+    async def run(self, value: int, *items: int, **extra: str): ...
+
+
+class Leaf(BaseModel):
+    value: int
+
+
+class Wrap(BaseModel):
+    first: Leaf
+    second: Leaf
+
+
+class Tree(BaseModel):
+    children: list["Tree"] = []
+
+
+class ModelBlock(Block):
+    @step()
+    async def run(self, w: Wrap, w2: Wrap, t: Tree, t2: Tree, *leaves: Wrap): ...
+
+
+def _input(port: str, pin: str, value: Any) -> InputValue:
+    return InputValue(target=BlockPinRef(port=port, pin=pin), value=value)
+
+
+def test_inputs_are_routed_to_ports_pins_and_functions():
+    block = RoutedBlock()
+    block._load(
+        dynamic_ports=["options.0", "options.1", "named.a"],
+        inputs=[
+            _input("limit", "", "5"),
+            _input("options.1", "condition", "x > 1"),
+            _input("options.0", "tags.t", "first"),
+            _input("named.a", "condition", "y"),
+            _input("run", "value", "3"),
+            _input("run", "items.1", 2),
+            _input("run", "items.0", 1),
+            _input("run", "extra.key", "v"),
+        ],
+    )
+
+    assert block.limit == 5
+    assert block.options[1].condition == "x > 1"
+    assert block.options[0].tags == {"t": "first"}
+    assert block.named["a"].condition == "y"
+    assert block.run._pending_inputs == {
+        "value": {"": 3},
+        "items": {"1": 2, "0": 1},
+        "extra": {"key": "v"},
+    }
+
+
+def test_unvalidated_values_are_kept():
+    block = RoutedBlock()
+    block._load(inputs=[_input("limit", "", "not a number")])
+
+    assert block.limit == "not a number"
+
+
+def test_routes_are_compiled_once_per_class():
+    router = RoutedBlock()._plan.input_router
+
+    assert router.get("limit", "") is router.get("limit", "")
+    assert router.get("run", "items.7") is router.get("run", "items.7")
+    assert RoutedBlock()._plan.input_router is router
+
+
+def test_list_port_indexes_must_be_integers():
+    block = RoutedBlock()
+
+    with pytest.raises(ValueError, match="Indexes on list Ports"):
+        block._load(inputs=[_input("options.x", "condition", "")])
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_batched_inputs_match_unbatched(batched: bool):
+    block = RoutedBlock()
+    block._set_inputs(
+        [
+            _input("limit", "", "not a number"),
+            _input("run", "value", "3"),
+            _input("run", "items.0", "x"),
+            _input("run", "items.1", 2),
+        ],
+        batched=batched,
+    )
+
+    assert block.limit == "not a number"
+    assert block.run._pending_inputs == {
+        "value": {"": 3},
+        "items": {"0": "x", "1": 2},
+    }
+
+
+def test_input_batches_are_cached_per_shape():
+    router = RoutedBlock()._plan.input_router
+    targets = (("limit", ""), ("run", "items.0"))
+
+    assert router.get_batch(targets) is router.get_batch(targets)
+    assert router.get_batch(targets) is not router.get_batch(targets[::-1])
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_pins_that_share_a_model_type(batched: bool):
+    wrap = {"first": {"value": "1"}, "second": {"value": 2}}
+    tree = {"children": [{"children": []}]}
+    block = ModelBlock()
+    block._set_inputs(
+        [
+            _input("run", "w", wrap),
+            _input("run", "w2", wrap),
+            _input("run", "t", tree),
+            _input("run", "t2", {"children": "invalid"}),
+            _input("run", "leaves.0", wrap),
+            _input("run", "leaves.1", wrap),
+        ],
+        batched=batched,
+    )
+
+    inputs = block.run._pending_inputs
+    expected = Wrap(first=Leaf(value=1), second=Leaf(value=2))
+    assert inputs["w"][""] == inputs["w2"][""] == expected
+    assert inputs["leaves"] == {"0": expected, "1": expected}
+    assert inputs["t"][""] == Tree(children=[Tree()])
+    assert inputs["t2"][""] == {"children": "invalid"}
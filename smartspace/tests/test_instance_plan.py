@@ -0,0 +1,48 @@
+from typing import Annotated, Any
+
+from smartspace.core import Block, Config, Output, OutputChannel, step
+
+
+class PlannedBlock(Block):
+    options: Annotated[dict[str, Any], Config()] = {"a": [1]}
+    count: Annotated[int, Config()] = 3
+    result: Output[int]
+    channel: OutputChannel[int]
+    values: list[Output[Any]]
+
+    @step(output_name="output")
+    async def run(self, value: int = 1) -> int:
+        return value
+
+
+def test_instance_plan_is_compiled_once_per_class():
+    a = PlannedBlock()
+    b = PlannedBlock()
+
+    assert a._plan is b._plan
+    assert a._plan.functions == ("run",)
+    assert a.run is not b.run
+    assert a.run._block is a
+
+
+def test_instances_get_ports_from_plan():
+    block = PlannedBlock()
+
+    assert block.count == 3
+    assert block.values == []
+    assert isinstance(block.result, Output)
+    assert isinstance(block.channel, OutputChannel)
+    assert block.channel.pin.port == "channel"
+    assert block.run.value == 1
+    assert block._dynamic_ports == {"values": []}
+
+
+def test_mutable_defaults_are_not_shared_between_instances():
+    a = PlannedBlock()
+    a.options["a"].append(2)
+    a.options["b"] = []
+
+    b = PlannedBlock()
+
+    assert b.options == {"a": [1]}
+    assert PlannedBlock.options == {"a": [1]}
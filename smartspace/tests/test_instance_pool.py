@@ -0,0 +1,98 @@
+from typing import Annotated, Any
+
+import pytest
+
+from smartspace.core import Block, BlockSet, Config, Output, State, Tool, step
+from smartspace.models import BlockPinRef, InputValue, StateValue
+
+
+class Pooled(Block):
+    class Lookup(Tool):
+        def run(self, key: str) -> Any: ...
+
+    prefix: Annotated[str, Config()] = ">"
+    count: Annotated[int, State()] = 0
+    lookup: Lookup
+    items: list[Output[str]]
+    result: Output[str]
+
+    @step()
+    async def run(self, value: str, *extra: str):
+        self.count += 1
+        self.scratch = value
+        await self.lookup.call(value)
+        self.result.send(f"{self.prefix}{value}{''.join(extra)}{self.count}")
+
+
+def _input(port: str, pin: str, value: Any) -> InputValue:
+    return InputValue(target=BlockPinRef(port=port, pin=pin), value=value)
+
+
+async def _run(block: Block, **load) -> list[Any]:
+    block._load(**load)
+    return [
+        output.value
+        for message in [m async for m in await block._run_function("run")]
+        for output in message.outputs
+        if output.source.port == "result"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pooled_instances_do_not_leak_state():
+    block_set = BlockSet()
+    block_set.add(Pooled)
+    pool = block_set.enable_instance_pool(["Pooled"])
+
+    with block_set.instance(Pooled) as block:
+        first = block
+        assert await _run(
+            block,
+            state=[StateValue(state="count", value=5)],
+            inputs=[
+                _input("prefix", "", "#"),
+                _input("run", "value", "a"),
+                _input("run", "extra.0", "b"),
+            ],
+            dynamic_ports=["items.0"],
+        ) == ["#ab6"]
+
+    with block_set.instance(Pooled) as block:
+        assert block is first
+        assert not hasattr(block, "scratch")
+        assert block.items == []
+        assert block.get_messages() == []
+        assert block.run._pending_inputs == {}
+        assert await _run(block, inputs=[_input("run", "value", "c")]) == [">c1"]
+
+    assert (pool.created, pool.reused) == (1, 1)
+    assert len(block._tools) == 1
+
+
+def test_instance_pool_is_opt_in_per_block():
+    block_set = BlockSet()
+    block_set.enable_instance_pool(["Other"])
+
+    with block_set.instance(Pooled) as first:
+        pass
+
+    with block_set.instance(Pooled) as second:
+        assert second is not first
+
+
+def test_failed_instances_are_not_pooled():
+    block_set = BlockSet()
+    block_set.add(Pooled)
+    pool = block_set.enable_instance_pool()
+
+    with pytest.raises(ValueError):
+        with block_set.instance(Pooled) as first:
+            raise ValueError("failed")
+
+    with block_set.instance(Pooled) as second:
+        assert second is not first
+
+    with block_set.instance(Pooled) as third:
+        assert third is second
+
+    assert (pool.created, pool.reused) == (2, 1)
@@ -0,0 +1,153 @@
+import os
+from typing import Annotated, Any, Generic, TypeVar
+
+import pytest
+
+from smartspace.core import Block, Config, Output, State, step
+from smartspace.interface_cache import InterfaceCache
+from smartspace.models import BlockPinRef, InputValue
+from smartspace.utils.type_registry import type_registry
+
+T = TypeVar("T")
+
+
+class CachedBlock(Block):
+    prefix: Annotated[str, Config()] = ">"
+    total: Annotated[int, State()] = 0
+    items: list[Output[Any]]
+
+    @step(output_name="result")
+    async def run(self, value: int, *extra: int) -> str:
+        self.total += value + sum(extra)
+        return f"{self.prefix}{self.total}"
+
+
+class OtherCachedBlock(Block):
+    @step()
+    async def run(self, values: list[str]) -> int:
+        return len(values)
+
+
+class GenericCachedBlock(Block, Generic[T]):
+    @step()
+    async def run(self, value: T) -> T:
+        return value
+
+
+@pytest.fixture(autouse=True)
+def reset_class_interface():
+    yield
+    for block_type in (CachedBlock, OtherCachedBlock, GenericCachedBlock):
+        block_type._class_interface = None
+        block_type._type_adapters_ready = False
+
+
+def test_interface_cache_hit_returns_same_interface(tmp_path):
+    expected = CachedBlock._get_interface().model_copy(deep=True)
+    CachedBlock._class_interface = None
+
+    cold = InterfaceCache(tmp_path)
+    assert cold.load(CachedBlock) == expected
+    assert (cold.hits, cold.misses) == (0, 1)
+
+    CachedBlock._class_interface = None
+
+    warm = InterfaceCache(tmp_path)
+    assert warm.load(CachedBlock) == expected
+    assert (warm.hits, warm.misses) == (1, 0)
+    assert not CachedBlock._type_adapters_ready
+
+
+@pytest.mark.asyncio
+async def test_interface_cache_rebuilds_type_adapters_lazily(tmp_path):
+    InterfaceCache(tmp_path).load(CachedBlock)
+    CachedBlock._class_interface = None
+    CachedBlock._input_pin_type_adapters = {}
+
+    InterfaceCache(tmp_path).load(CachedBlock)
+    block = CachedBlock()
+    assert CachedBlock._type_adapters_ready
+
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="run", pin="value"), value="2"),
+            InputValue(target=BlockPinRef(port="run", pin="extra.0"), value="3"),
+        ],
+        dynamic_output_pins=[BlockPinRef(port="items", pin="")],
+    )
+    call = await block._run_function("run")
+    messages = [m async for m in call]
+
+    assert messages[0].outputs[0].value == ">5"
+    assert CachedBlock.interface().ports["run"].inputs["value"].json_schema == {
+        "type": "integer"
+    }
+
+
+def test_interface_cache_skips_generic_port_schemas(tmp_path, monkeypatch):
+    InterfaceCache(tmp_path).load(GenericCachedBlock)
+    GenericCachedBlock._class_interface = None
+
+    InterfaceCache(tmp_path).load(GenericCachedBlock)
+    built: list[Any] = []
+    monkeypatch.setattr(type_registry, "json_schema", built.append)
+    GenericCachedBlock._ensure_type_adapters()
+
+    assert built == []
+    assert GenericCachedBlock.interface().ports["T"].inputs[""].json_schema
+
+
+def test_interface_cache_key_changes_with_pydantic_version(tmp_path, monkeypatch):
+    cache = InterfaceCache(tmp_path)
+    key = cache.key(CachedBlock)
+
+    monkeypatch.setattr("smartspace.interface_cache.pydantic.VERSION", "0.0.0")
+
+    assert InterfaceCache(tmp_path).key(CachedBlock) != key
+
+
+def test_interface_cache_clear(tmp_path):
+    cache = InterfaceCache(tmp_path)
+    cache.load(CachedBlock)
+    assert cache.get(CachedBlock) is not None
+
+    cache.clear()
+
+    assert cache.get(CachedBlock) is None
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_interface_cache_warmup(tmp_path, monkeypatch, processes):
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    block_types = [CachedBlock, OtherCachedBlock]
+    expected = [t._get_interface().model_copy(deep=True) for t in block_types]
+    for block_type in block_types:
+        block_type._class_interface = None
+    progress: list[tuple[int, int]] = []
+
+    report = InterfaceCache(tmp_path).warmup(
+        block_types, processes=processes, progress=lambda *p: progress.append(p)
+    )
+
+    assert (report.blocks, report.cached, report.generated) == (2, 0, 2)
+    assert report.processes == processes
+    assert not report.failed
+    assert progress[-1] == (2, 2)
+    assert [t._class_interface for t in block_types] == expected
+
+    for block_type in block_types:
+        block_type._class_interface = None
+    report = InterfaceCache(tmp_path).warmup(block_types, processes=processes)
+
+    assert (report.cached, report.generated) == (2, 0)
+
+
+def test_interface_cache_warmup_is_serial_with_one_cpu(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    block_types = [CachedBlock, OtherCachedBlock]
+    for block_type in block_types:
+        block_type._class_interface = None
+
+    report = InterfaceCache(tmp_path).warmup(block_types, processes=4)
+
+    assert (report.generated, report.processes) == (2, 1)
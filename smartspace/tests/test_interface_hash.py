@@ -0,0 +1,100 @@
+import subprocess
+import sys
+from typing import Annotated, Any
+
+from smartspace.core import Block, BlockSet, Config, step
+
+
+class Hashed_1(Block):
+    limit: Annotated[int, Config()] = 0
+
+    @step()
+    async def run(self, value: int) -> int: ...
+
+    @step()
+    async def reset(self): ...
+
+
+class Changed:
+    class Hashed_1(Block):
+        limit: Annotated[int, Config()] = 0
+
+        @step()
+        async def run(self, value: str) -> int: ...
+
+        @step()
+        async def reset(self): ...
+
+
+class _Unset:
+    pass
+
+
+_UNSET = _Unset()
+
+
+class Sentinel(Block):
+    @step()
+    async def run(self, value: Any = _UNSET): ...
+
+
+class Other(Block):
+    @step()
+    async def run(self): ...
+
+
+def test_content_hash_is_stable_and_does_not_affect_equality():
+    interface = Hashed_1._get_interface()
+    copy = Hashed_1.interface()
+
+    assert interface.content_hash == copy.content_hash
+    assert interface == Hashed_1.interface()
+    assert interface.ports["run"].content_hash == copy.ports["run"].content_hash
+    assert interface.content_hash != Changed.Hashed_1._get_interface().content_hash
+
+
+def test_content_hash_follows_changes():
+    interface = Hashed_1.interface()
+    content_hash = interface.content_hash
+    port_hash = interface.ports["run"].content_hash
+
+    interface.ports["run"].inputs["value"].json_schema["type"] = "string"
+
+    assert interface.ports["run"].content_hash != port_hash
+    assert interface.content_hash != content_hash
+    assert interface.model_copy(deep=True).content_hash == interface.content_hash
+
+
+def test_block_set_diff():
+    old = BlockSet()
+    old.add(Hashed_1)
+    old.add(Other)
+    new = BlockSet()
+    new.add(Changed.Hashed_1)
+
+    assert old.diff(old) == ({}, {}, {})
+
+    diff = old.diff(new)
+
+    assert diff.added == {}
+    assert diff.removed == {"Other": ["1.0.0"]}
+    assert diff.updated == {"Hashed": {"1.0.0": ["run"]}}
+    assert new.diff(old).added == {"Other": ["1.0.0"]}
+    assert old.interface_hashes()["Hashed"]["1.0.0"] == (
+        Hashed_1._get_interface().content_hash
+    )
+
+
+def test_content_hash_is_the_same_in_every_process():
+    script = (
+        "from smartspace.tests.test_interface_hash import Sentinel;"
+        "print(Sentinel._get_interface().content_hash)"
+    )
+    hashes = {
+        subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        for _ in range(2)
+    }
+
+    assert len(hashes) == 1
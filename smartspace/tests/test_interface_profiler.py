@@ -0,0 +1,37 @@
+from typing import Any
+
+import smartspace.core
+from smartspace.core import Block, Output, step
+from smartspace.interface_profiler import InterfaceProfile, profile_block_set
+
+
+class ProfiledBlock(Block):
+    items: list[Output[Any]]
+
+    @step(output_name="result")
+    async def run(self, value: int, names: list[str]) -> str: ...
+
+
+def test_profile_records_blocks_ports_pins_and_types():
+    original = smartspace.core._get_pins
+
+    profile = profile_block_set([ProfiledBlock], fresh_registry=False)
+
+    assert smartspace.core._get_pins is original
+
+    [block] = profile.top("block")
+    assert block.block == "ProfiledBlock"
+    assert block.seconds > 0
+    assert block.schema_bytes == sum(r.schema_bytes for r in profile.top("pin"))
+
+    ports = {(r.port, r.name) for r in profile.top("port")}
+    assert ("run", "_get_function_pins") in ports
+    assert ("items", "_get_pins") in ports
+
+    pins = {(r.port, r.name) for r in profile.top("pin")}
+    assert {("run", "value"), ("run", "names"), ("run", "result")} <= pins
+
+    types = {(r.port, r.name) for r in profile.top("type")}
+    assert ("run", "list[str] (schema)") in types
+
+    assert InterfaceProfile.model_validate_json(profile.model_dump_json()) == profile
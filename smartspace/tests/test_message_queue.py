@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from smartspace.blocks.loops import ForEach
+from smartspace.core import (
+    Block,
+    BlockMessageQueue,
+    MessageRecord,
+    Output,
+    OutputRecord,
+    step,
+)
+from smartspace.models import BlockPinRef, InputValue
+
+
+class Producer(Block):
+    value: Output[int]
+
+    @step()
+    async def produce(self, count: int, sync: bool = False):
+        for i in range(count):
+            if sync:
+                self.value.send(i)
+            else:
+                await self.value.asend(i)
+
+
+def _load(block: Block, port: str, **inputs):
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port=port, pin=name), value=value)
+            for name, value in inputs.items()
+        ]
+    )
+
+
+def test_put_nowait_ignores_maxsize():
+    queue = BlockMessageQueue(1)
+    for i in range(3):
+        queue.put_nowait(MessageRecord(outputs=[OutputRecord("a", "", i)]))
+
+    assert queue.qsize() == 3
+    assert queue.stats().max_messages == 3
+    assert queue.stats().max_outputs == 3
+
+
+@pytest.mark.asyncio
+async def test_put_waits_while_full():
+    queue = BlockMessageQueue(1)
+    await queue.put(MessageRecord())
+    put = asyncio.ensure_future(queue.put(MessageRecord()))
+    await asyncio.sleep(0)
+
+    assert not put.done()
+
+    queue.get_nowait()
+    await put
+
+    assert queue.stats().waits == 1
+    assert queue.stats().max_messages == 1
+
+
+@pytest.mark.asyncio
+async def test_bounded_run_applies_backpressure():
+    block = Producer()
+    _load(block, "produce", count=50)
+
+    call = await block._run_function("produce", max_queued_messages=5)
+    values = []
+    async for message in call:
+        values.extend(o.value for o in message.outputs)
+        await asyncio.sleep(0)
+
+    assert values == list(range(50))
+    # The final messages of a run are always queued without waiting
+    assert call.queue_stats().max_outputs <= 5
+    assert call.queue_stats().waits > 0
+
+
+@pytest.mark.asyncio
+async def test_bounded_run_accepts_sync_sends():
+    block = Producer()
+    _load(block, "produce", count=50, sync=True)
+
+    call = await block._run_function("produce", max_queued_messages=5)
+    values = [o.value async for message in call for o in message.outputs]
+
+    assert values == list(range(50))
+    assert call.queue_stats().max_messages > 5
+
+
+@pytest.mark.asyncio
+async def test_unbounded_run_records_high_water_mark():
+    block = ForEach()
+    _load(block, "foreach", items=list(range(20)))
+
+    call = await block._run_function("foreach")
+    messages = [m async for m in call]
+
+    assert len(messages) == 23
+    assert call.queue_stats().max_outputs >= 20
+    assert call.queue_stats().waits == 0
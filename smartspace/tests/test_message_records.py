@@ -0,0 +1,139 @@
+import datetime
+from typing import Any
+
+import pytest
+from pydantic import BaseModel, Field
+
+from smartspace.core import (
+    Block,
+    InputRecord,
+    MessageRecord,
+    OutputChannel,
+    OutputRecord,
+    RedirectRecord,
+    StateRecord,
+    StreamingOutput,
+    Tool,
+    callback,
+    step,
+)
+from smartspace.enums import ChannelEvent, StreamingEvent
+from smartspace.models import (
+    BlockPinRef,
+    BlockRunMessage,
+    InputValue,
+    OutputChannelMessage,
+    OutputValue,
+    StreamingOutputMessage,
+)
+
+
+class Aliased(BaseModel):
+    some_value: int = Field(alias="someValue")
+    at: datetime.datetime
+
+
+class Recorder(Block):
+    class Operation(Tool):
+        def run(self, item: Any) -> Any: ...
+
+    operation: Operation
+    items: OutputChannel[int]
+    text: StreamingOutput[str]
+
+    @step(output_name="result")
+    async def run(self, count: int) -> int:
+        for i in range(count):
+            self.items.send(i)
+
+        self.text.update("a")
+        self.text.finalize("ab")
+        await self.operation.call(1).then(lambda result: self.collect(result))
+        return count
+
+    @callback()
+    async def collect(self, result: Any): ...
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        1,
+        None,
+        {"a": [1, 2]},
+        Aliased(someValue=1, at=datetime.datetime(2024, 1, 1)),
+        ChannelEvent.DATA,
+        b"bytes",
+    ],
+)
+def test_record_dump_matches_model_dump(value):
+    record = MessageRecord(
+        outputs=[
+            OutputRecord("a", "", value),
+            OutputRecord("a", "b", value, ChannelEvent.DATA),
+            OutputRecord("a", "c", value, StreamingEvent.FINALIZE),
+        ],
+        inputs=[InputRecord("c", "d", value)],
+        redirects=[RedirectRecord("a", "return", "c", "e")],
+        states=[StateRecord("s", value)],
+    )
+    message = record.to_message()
+
+    assert record.dump() == message.model_dump(by_alias=True, mode="json")
+    assert record.dump_json() == message.model_dump_json(by_alias=True).encode()
+
+
+def test_record_to_message():
+    message = MessageRecord(
+        outputs=[
+            OutputRecord("a", "", 1, ChannelEvent.CLOSE),
+            OutputRecord("b", "", 2, StreamingEvent.UPDATE),
+        ],
+    ).to_message()
+
+    assert message == BlockRunMessage(
+        outputs=[
+            OutputValue(
+                source=BlockPinRef(port="a", pin=""),
+                value=OutputChannelMessage(event=ChannelEvent.CLOSE, data=1),
+            ),
+            OutputValue(
+                source=BlockPinRef(port="b", pin=""),
+                value=StreamingOutputMessage(event=StreamingEvent.UPDATE, data=2),
+            ),
+        ]
+    )
+
+
+def _load(block: Recorder):
+    block._load(
+        inputs=[InputValue(target=BlockPinRef(port="run", pin="count"), value=2)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_records_are_converted_when_read():
+    block = Recorder()
+    _load(block)
+    records = [r async for r in (await block._run_function("run")).records()]
+
+    block = Recorder()
+    _load(block)
+    messages = [m async for m in await block._run_function("run")]
+
+    assert all(isinstance(r, MessageRecord) for r in records)
+    assert [r.to_message() for r in records] == messages
+    assert messages[4].redirects[0].target == BlockPinRef(port="collect", pin="result")
+    assert messages[5].outputs[0].value == 2
+    assert messages[5].states == []
+
+
+@pytest.mark.asyncio
+async def test_get_messages_returns_models():
+    block = Recorder()
+    await block.run(1)
+
+    messages = block.get_messages()
+
+    assert all(isinstance(m, BlockRunMessage) for m in messages)
+    assert messages[0].outputs[0].source == BlockPinRef(port="items", pin="")
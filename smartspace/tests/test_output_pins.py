@@ -0,0 +1,76 @@
+from typing import Any
+
+import pytest
+
+from smartspace.core import (
+    Block,
+    Output,
+    OutputChannel,
+    StreamingOutput,
+    Tool,
+    step,
+)
+from smartspace.models import BlockPinRef, InputValue
+
+
+class EchoTool(Tool[[str], str]):
+    def run(self, value: str) -> str: ...
+
+
+class ManyOutputsBlock(Block):
+    items: list[Output[Any]]
+    stream: StreamingOutput[str]
+    echo: EchoTool
+
+    @step()
+    async def unpack(self, values: list[Any]):
+        for item, value in zip(self.items, values):
+            item.send(value)
+
+
+def test_output_pins_have_no_instance_dict():
+    for output in (
+        Output(BlockPinRef(port="a", pin="")),
+        OutputChannel(BlockPinRef(port="a", pin="")),
+        StreamingOutput(BlockPinRef(port="a", pin="")),
+    ):
+        assert not hasattr(output, "__dict__")
+
+    with pytest.raises(AttributeError):
+        Output(BlockPinRef(port="a", pin="")).value = 1  # type: ignore
+
+
+def test_output_pin_ref_is_built_on_first_use():
+    output = Output(("items.3", ""))
+
+    assert output.pin == BlockPinRef(port="items.3", pin="")
+    assert output.pin is output.pin
+
+
+def test_tool_subclasses_keep_their_pins():
+    block = ManyOutputsBlock()
+
+    assert block.echo.port_name == "echo"
+    assert block.echo.output_names == ["value"]
+    assert isinstance(block.echo.value, OutputChannel)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_dynamic_outputs_send_to_their_pins():
+    block = ManyOutputsBlock()
+    block._load(
+        dynamic_ports=[f"items.{i}" for i in range(3)],
+        inputs=[
+            InputValue(target=BlockPinRef(port="unpack", pin="values"), value=[1, 2, 3])
+        ],
+    )
+
+    messages = [m async for m in await block._run_function("unpack")]
+
+    values = [
+        (o.source, o.value)
+        for m in messages
+        for o in m.outputs
+        if o.source.port.startswith("items.")
+    ]
+    assert values == [(BlockPinRef(port=f"items.{i}", pin=""), i + 1) for i in range(3)]
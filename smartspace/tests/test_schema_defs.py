@@ -0,0 +1,92 @@
+import pydantic_core
+from pydantic import BaseModel
+
+from smartspace.core import Block, Output, step
+from smartspace.models import FileChunks
+from smartspace.schema_defs import (
+    DEFS,
+    compact_block_set,
+    compact_interface,
+    expand_block_set,
+    expand_interface,
+)
+
+
+class Item(BaseModel):
+    name: str
+
+
+class ChunkBlock(Block):
+    chunks: Output[FileChunks]
+
+    @step()
+    async def run(self, first: FileChunks, second: list[FileChunks]) -> FileChunks: ...
+
+
+class ItemBlock(Block):
+    @step()
+    async def run(self, items: list[Item]): ...
+
+
+def _dump(block_type: type[Block]) -> dict:
+    return block_type.interface().model_dump(mode="json", by_alias=True)
+
+
+def test_definitions_are_hoisted_and_expanded():
+    interface = _dump(ChunkBlock)
+
+    compacted = compact_interface(interface)
+
+    assert set(interface["ports"]["run"]["inputs"]["first"]["schema"][DEFS]) < set(
+        compacted[DEFS]
+    )
+    for port in compacted["ports"].values():
+        for pin in [*port["inputs"].values(), *port["outputs"].values()]:
+            assert DEFS not in pin["schema"]
+
+    assert expand_interface(compacted) == interface
+
+
+def test_conflicting_definitions_are_renamed():
+    first = {"$defs": {"Item": {"type": "string"}}, "$ref": "#/$defs/Item"}
+    second = {"$defs": {"Item": {"type": "integer"}}, "$ref": "#/$defs/Item"}
+    interface = {
+        "ports": {
+            "run": {
+                "inputs": {
+                    "a": {"schema": first},
+                    "b": {"schema": second},
+                },
+                "outputs": {},
+            }
+        }
+    }
+
+    compacted = compact_interface(interface)
+
+    assert compacted[DEFS] == {
+        "Item": {"type": "string"},
+        "Item_2": {"type": "integer"},
+    }
+    assert compacted["ports"]["run"]["inputs"]["b"]["schema"] == {
+        "$ref": "#/$defs/Item_2"
+    }
+    assert expand_interface(compacted)["ports"]["run"]["inputs"]["b"]["schema"] == {
+        "$defs": {"Item_2": {"type": "integer"}},
+        "$ref": "#/$defs/Item_2",
+    }
+
+
+def test_block_set_definitions_are_shared_across_blocks():
+    payload = pydantic_core.to_jsonable_python(
+        {
+            "ChunkBlock": {"1.0.0": ChunkBlock.interface()},
+            "ItemBlock": {"1.0.0": ItemBlock.interface()},
+        }
+    )
+
+    compacted = compact_block_set(payload)
+
+    assert "FileChunks" in compacted[DEFS]
+    assert DEFS not in compacted["ChunkBlock"]["1.0.0"]
+    assert expand_block_set(compacted) == payload
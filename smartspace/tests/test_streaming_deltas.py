@@ -0,0 +1,174 @@
+import asyncio
+from typing import Annotated, Any
+
+import pytest
+
+from smartspace.core import Block, Metadata, StreamingDeltas, StreamingOutput, step
+from smartspace.enums import StreamingEvent
+from smartspace.models import (
+    BlockPinRef,
+    InputValue,
+    StreamingDelta,
+    StreamingOutputMessage,
+    apply_streaming_message,
+)
+
+
+class Writer(Block):
+    text: Annotated[StreamingOutput[str], Metadata(delta=True)]
+    keyframed: Annotated[
+        StreamingOutput[Any], Metadata(delta=True, delta_keyframe_interval=3)
+    ]
+    throttled: Annotated[
+        StreamingOutput[str], Metadata(delta=True, min_bytes_changed=5)
+    ]
+
+    @step()
+    async def write(self, pin: str, snapshots: list[Any], yield_every: int = 1):
+        output: StreamingOutput[Any] = getattr(self, pin)
+        for i, snapshot in enumerate(snapshots):
+            output.update(snapshot)
+            if yield_every and (i + 1) % yield_every == 0:
+                await asyncio.sleep(0)
+
+        output.finalize(snapshots[-1])
+
+
+def _appends(count: int) -> list[str]:
+    return ["".join(f"token{i} " for i in range(n)) for n in range(1, count + 1)]
+
+
+async def _messages(pin: str, snapshots: list[Any], yield_every: int = 1):
+    block = Writer()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="write", pin=name), value=value)
+            for name, value in {
+                "pin": pin,
+                "snapshots": snapshots,
+                "yield_every": yield_every,
+            }.items()
+        ]
+    )
+
+    return [
+        output["value"]
+        async for record in (await block._run_function("write")).records()
+        for output in record.dump()["outputs"]
+        if output["source"]["port"] == pin
+    ]
+
+
+def _values(messages: list[dict[str, Any]]) -> list[Any]:
+    values = []
+    value = None
+    for message in messages:
+        value = apply_streaming_message(value, message)
+        values.append(value)
+
+    return values
+
+
+def test_deltas_from_metadata():
+    assert StreamingDeltas.from_metadata({}) is None
+    assert StreamingDeltas.from_metadata({"delta": True}) == StreamingDeltas(100)
+    assert StreamingDeltas.from_metadata(
+        {"delta": True, "delta_keyframe_interval": 10}
+    ) == StreamingDeltas(10)
+
+    with pytest.raises(Exception):
+        StreamingDeltas.from_metadata({"delta": True, "delta_keyframe_interval": 0})
+
+
+def test_apply_streaming_message():
+    delta = StreamingDelta(offset=3, text="d")
+
+    assert apply_streaming_message("abc", {"event": "Delta", "data": delta}) == "abcd"
+    assert (
+        apply_streaming_message(
+            "abx", {"event": "Delta", "data": {"offset": 2, "text": "c"}}
+        )
+        == "abc"
+    )
+    assert (
+        apply_streaming_message(
+            "abc", StreamingOutputMessage(event=StreamingEvent.UPDATE, data="x")
+        )
+        == "x"
+    )
+
+    with pytest.raises(ValueError):
+        apply_streaming_message(None, {"event": "Delta", "data": delta})
+
+
+@pytest.mark.asyncio
+async def test_appends_are_sent_as_deltas():
+    snapshots = _appends(50)
+    messages = await _messages("text", snapshots)
+
+    assert [m["event"] for m in messages] == ["Update"] + ["Delta"] * 49 + ["Finalize"]
+    assert messages[1]["data"] == {"offset": len(snapshots[0]), "text": "token1 "}
+    assert _values(messages) == snapshots + [snapshots[-1]]
+
+
+@pytest.mark.asyncio
+async def test_patches_and_keyframes():
+    snapshots = ["Hello", "Hello wor", "Hello world", "Help", "Help me", "x", 1, "a"]
+    messages = await _messages("keyframed", snapshots)
+
+    assert [m["event"] for m in messages] == [
+        "Update",
+        "Delta",
+        "Delta",
+        "Delta",
+        # A keyframe after 3 deltas
+        "Update",
+        # Nothing in common with the previous snapshot
+        "Update",
+        # Not a string
+        "Update",
+        "Update",
+        "Finalize",
+    ]
+    assert messages[3]["data"] == {"offset": 3, "text": "p"}
+    assert _values(messages) == snapshots + ["a"]
+
+
+@pytest.mark.asyncio
+async def test_replaced_deltas_are_relative_to_the_last_read_snapshot():
+    # Without yielding, every snapshot replaces the previous one in the queue
+    snapshots = _appends(40)
+    messages = await _messages("throttled", snapshots, yield_every=0)
+
+    assert [m["event"] for m in messages] == ["Update", "Finalize"]
+    assert _values(messages) == [snapshots[-1], snapshots[-1]]
+
+    # The consumer reads every 5th snapshot, the 4 before it are replaced
+    messages = await _messages("throttled", snapshots, yield_every=5)
+
+    assert [m["event"] for m in messages] == ["Update"] + ["Delta"] * 7 + ["Finalize"]
+    assert _values(messages) == snapshots[4::5] + [snapshots[-1]]
+
+
+@pytest.mark.asyncio
+async def test_model_messages_rebuild_the_final_value():
+    block = Writer()
+    snapshots = _appends(20)
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="write", pin="pin"), value="text"),
+            InputValue(
+                target=BlockPinRef(port="write", pin="snapshots"), value=snapshots
+            ),
+        ]
+    )
+
+    value = None
+    values = []
+    async for message in await block._run_function("write"):
+        for output in message.outputs:
+            if output.source.port == "text":
+                value = apply_streaming_message(value, output.value)
+                values.append(value)
+
+    assert values == snapshots + [snapshots[-1]]
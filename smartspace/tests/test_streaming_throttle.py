@@ -0,0 +1,194 @@
+import asyncio
+from typing import Annotated
+
+import pytest
+
+from smartspace.core import (
+    Block,
+    Metadata,
+    Output,
+    StreamingOutput,
+    StreamingThrottle,
+    step,
+)
+from smartspace.enums import StreamingEvent
+from smartspace.models import BlockPinRef, InputValue
+
+
+class Streamer(Block):
+    text: StreamingOutput[str]
+    limited: Annotated[StreamingOutput[str], Metadata(max_updates_per_second=10)]
+    sized: Annotated[StreamingOutput[str], Metadata(min_bytes_changed=10)]
+
+    @step()
+    async def stream(
+        self,
+        pin: str,
+        count: int,
+        delay: float = 0,
+        finalize: bool = True,
+        wait_after: float = 0,
+        fail: bool = False,
+    ):
+        output: StreamingOutput[str] = getattr(self, pin)
+        text = ""
+        for i in range(count):
+            text += "x"
+            output.update(text)
+            if delay:
+                await asyncio.sleep(delay)
+
+        if wait_after:
+            await asyncio.sleep(wait_after)
+
+        if fail:
+            raise ValueError("failed")
+
+        if finalize:
+            output.finalize(text)
+
+
+class Response:
+    value: Output[str]
+    stream: Annotated[StreamingOutput[str], Metadata(max_updates_per_second=5)]
+
+
+class PortBlock(Block):
+    response: Response
+
+    @step()
+    async def run(self): ...
+
+
+async def _run(pin: str, count: int, **inputs):
+    block = Streamer()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="stream", pin=name), value=value)
+            for name, value in {"pin": pin, "count": count, **inputs}.items()
+        ]
+    )
+
+    call = await block._run_function("stream")
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    received = [
+        (loop.time() - start, output.event, output.value)
+        async for record in call.records()
+        for output in record.outputs
+        if output.port == pin
+    ]
+
+    return received, call
+
+
+def test_throttle_from_metadata():
+    assert StreamingThrottle.from_metadata({}) is None
+    assert StreamingThrottle.from_metadata(
+        {"max_updates_per_second": 4, "description": "x"}
+    ) == StreamingThrottle(max_updates_per_second=4)
+
+    with pytest.raises(Exception):
+        StreamingThrottle.from_metadata({"max_updates_per_second": 0})
+
+
+def test_throttle_is_set_per_pin():
+    block = Streamer()
+    assert block.text._throttler is None
+    assert block.limited._throttler is not None
+    assert block.limited._throttler.throttle == StreamingThrottle(10)
+    assert block.sized._throttler is not None
+    assert block.sized._throttler.throttle == StreamingThrottle(None, 10)
+
+    port_block = PortBlock()
+    assert port_block.response.stream._throttler is not None
+    assert port_block.response.stream._throttler.throttle == StreamingThrottle(5)
+
+
+@pytest.mark.asyncio
+async def test_unthrottled_pin_sends_every_snapshot():
+    received, _ = await _run("text", 20, delay=0.001)
+
+    assert [v for _, _, v in received] == ["x" * i for i in range(1, 21)] + ["x" * 20]
+
+
+@pytest.mark.asyncio
+async def test_max_updates_per_second():
+    received, _ = await _run("limited", 50, delay=0.01)
+    updates = [(t, v) for t, e, v in received if e == StreamingEvent.UPDATE]
+
+    # About 0.5s of updates at no more than 10 a second
+    assert 4 <= len(updates) <= 7
+    # The last snapshot is flushed by finalize, the others by the interval
+    sent = updates[:-1]
+    assert all(b[0] - a[0] >= 0.08 for a, b in zip(sent, sent[1:]))
+
+    # The latest snapshot is always sent before the final value
+    assert updates[-1][1] == "x" * 50
+    assert received[-1][1:] == (StreamingEvent.FINALIZE, "x" * 50)
+
+
+@pytest.mark.asyncio
+async def test_held_snapshot_is_sent_after_the_interval():
+    received, _ = await _run("limited", 3, delay=0, finalize=False, wait_after=0.5)
+
+    assert [v for _, _, v in received] == ["x", "xxx"]
+    assert 0.08 <= received[1][0] < 0.3
+
+
+@pytest.mark.asyncio
+async def test_min_bytes_changed():
+    received, _ = await _run("sized", 95, delay=0.001)
+    updates = [v for _, e, v in received if e == StreamingEvent.UPDATE]
+
+    assert updates[:3] == ["x", "x" * 11, "x" * 21]
+    assert updates[-1] == "x" * 95
+    assert len(updates) == 11
+    assert received[-1][1:] == (StreamingEvent.FINALIZE, "x" * 95)
+
+
+@pytest.mark.asyncio
+async def test_held_snapshot_is_sent_when_the_function_returns():
+    received, _ = await _run("sized", 5, delay=0.001, finalize=False)
+
+    assert [v for _, _, v in received] == ["x", "xxxxx"]
+
+
+@pytest.mark.asyncio
+async def test_held_snapshot_is_sent_when_the_function_raises():
+    block = Streamer()
+    block._load(
+        inputs=[
+            InputValue(target=BlockPinRef(port="stream", pin=name), value=value)
+            for name, value in {
+                "pin": "limited",
+                "count": 3,
+                "delay": 0,
+                "finalize": True,
+                "wait_after": 0,
+                "fail": True,
+            }.items()
+        ]
+    )
+    call = await block._run_function("stream")
+    received = []
+    with pytest.raises(ValueError):
+        async for record in call.records():
+            received.extend(output.value for output in record.outputs)
+
+    # "x" was sent, and replaced in the queue by the held snapshot
+    assert received == ["xxx"]
+
+    # The throttle's timer was cancelled, so nothing is queued after the run
+    await asyncio.sleep(0.2)
+    assert call.values.empty()
+
+
+@pytest.mark.asyncio
+async def test_superseded_snapshots_are_dropped_from_the_queue():
+    # Without awaiting, the consumer reads nothing until the function returns,
+    # so each snapshot replaces the previous one in the queue
+    received, call = await _run("sized", 100)
+
+    assert [v for _, _, v in received] == ["x" * 100, "x" * 100]
+    assert call.queue_stats().superseded_snapshots == 10
@@ -0,0 +1,110 @@
+from typing import Annotated, Any, Generic, TypeVar, Union
+
+from smartspace.core import Block, Output, step
+from smartspace.utils.type_registry import LazyTypeAdapter, TypeRegistry, type_registry
+
+T = TypeVar("T")
+
+
+class FirstGenericBlock(Block, Generic[T]):
+    output: Output[T]
+
+    @step()
+    async def run(self, value: T, text: str): ...
+
+
+class SecondGenericBlock(Block, Generic[T]):
+    @step()
+    async def run(self, value: list[T], text: str): ...
+
+
+def test_type_adapters_are_interned():
+    registry = TypeRegistry()
+
+    assert registry.type_adapter(dict[str, Any]) is registry.type_adapter(
+        dict[str, Any]
+    )
+    assert registry.json_schema(str) is registry.json_schema(str)
+    assert registry.stats().adapters == 2
+
+
+def test_equal_types_with_different_schemas_are_not_shared():
+    registry = TypeRegistry()
+
+    assert registry.json_schema(Union[int, str]) == {
+        "anyOf": [{"type": "integer"}, {"type": "string"}]
+    }
+    assert registry.json_schema(Union[str, int]) == {
+        "anyOf": [{"type": "string"}, {"type": "integer"}]
+    }
+
+
+def test_unhashable_types_are_not_interned():
+    registry = TypeRegistry()
+    unhashable = Annotated[int, {"not": "hashable"}]
+
+    registry.type_adapter(unhashable)
+
+    assert registry.stats().adapters == 0
+    assert registry.stats().misses == 1
+
+
+def test_pins_share_adapters_across_block_classes():
+    FirstGenericBlock._get_interface()
+    SecondGenericBlock._get_interface()
+
+    first = FirstGenericBlock._input_pin_type_adapters
+    second = SecondGenericBlock._input_pin_type_adapters
+
+    assert first["run"]["text"] is second["run"]["text"]
+    assert first["T"][""].validator is second["T"][""].validator
+
+
+def test_lazy_type_adapters_are_built_on_first_use():
+    registry = TypeRegistry()
+    adapter = registry.lazy_type_adapter(list[int])
+
+    assert isinstance(adapter, LazyTypeAdapter)
+    assert registry.stats().adapters == 0
+
+    assert adapter.validate_python(["1"]) == [1]
+    assert adapter.json_schema() == {"items": {"type": "integer"}, "type": "array"}
+    assert adapter.core_schema is registry.type_adapter(list[int]).core_schema
+    assert registry.stats().materialized == 1
+    assert registry.lazy_type_adapter(list[int]) is registry.type_adapter(list[int])
+
+
+class FirstListBlock(Block):
+    @step()
+    async def run(self, values: list[str]): ...
+
+
+class SecondListBlock(Block):
+    @step()
+    async def run(self, values: list[str]): ...
+
+
+def test_pin_schemas_are_not_shared():
+    first = FirstListBlock._get_interface().ports["run"].inputs["values"]
+    second = SecondListBlock._get_interface().ports["run"].inputs["values"]
+
+    first.json_schema["items"]["type"] = "integer"
+
+    assert second.json_schema["items"] == {"type": "string"}
+
+
+U = TypeVar("U")
+
+
+class ThirdGenericBlock(Block, Generic[U]):
+    @step()
+    async def run(self, value: U): ...
+
+
+def test_generic_ports_do_not_build_validation_adapters():
+    materialized = type_registry.stats().materialized
+
+    interface = ThirdGenericBlock._get_interface()
+
+    assert interface.ports["U"].inputs[""].default == {}
+    assert type_registry.stats().materialized == materialized
@@ -0,0 +1,179 @@
+"""Interning registry for pydantic ``TypeAdapter``s and JSON schemas.
+
+Most pins are typed with a handful of ubiquitous types (``str``, ``Any``,
+``list[Any]``, ``dict[str, Any]``...) and every generic port gets a
+``dict[str, Any]`` adapter. Building a ``TypeAdapter`` compiles a core schema
+and validator, so sharing one adapter (and one JSON schema) per distinct type
+across every pin of every block class cuts both interface generation time and
+resident memory.
+
+Types are keyed on the type itself together with its ``repr``, because some
+types compare equal while producing different schemas (``Union[int, str]`` and
+``Union[str, int]`` are equal, but their ``anyOf`` order differs). Unhashable
+types are never interned.
+
+Interned JSON schemas are shared, so callers must treat them as read-only and
+copy them before handing them out in models that can be modified, such as pin
+interfaces.
+
+Validation adapters for pins that may never be validated in a given worker
+(hidden outputs, generic schema ports, callback inputs...) are handed out as
+``LazyTypeAdapter``s, which only build their core schema and validator the
+first time they are used.
+"""
+
+import json
+from typing import Any, NamedTuple, Union
+
+from pydantic import TypeAdapter
+from pydantic_core import CoreSchema
+
+
+class TypeRegistryStats(NamedTuple):
+    adapters: int
+    schemas: int
+    hits: int
+    misses: int
+    schema_bytes: int
+    deferred: int
+    materialized: int
+
+
+class LazyTypeAdapter:
+    """Stands in for the TypeAdapter of a type, which is only built, through the
+    registry, the first time the proxy is used."""
+
+    __slots__ = ("_type", "_registry", "_adapter")
+
+    def __init__(self, t: Any, registry: "TypeRegistry"):
+        self._type = t
+        self._registry = registry
+        self._adapter: TypeAdapter | None = None
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        if self._adapter is None:
+            self._adapter = self._registry.type_adapter(self._type)
+            self._registry.materialized += 1
+
+        return self._adapter
+
+    @property
+    def core_schema(self) -> CoreSchema:
+        return self.adapter.core_schema
+
+    @property
+    def validator(self) -> Any:
+        return self.adapter.validator
+
+    def validate_python(self, obj: Any, **kwargs: Any) -> Any:
+        return self.adapter.validate_python(obj, **kwargs)
+
+    def validate_json(self, data: str | bytes | bytearray, **kwargs: Any) -> Any:
+        return self.adapter.validate_json(data, **kwargs)
+
+    def dump_python(self, instance: Any, **kwargs: Any) -> Any:
+        return self.adapter.dump_python(instance, **kwargs)
+
+    def dump_json(self, instance: Any, **kwargs: Any) -> bytes:
+        return self.adapter.dump_json(instance, **kwargs)
+
+    def json_schema(self, **kwargs: Any) -> dict[str, Any]:
+        return self.adapter.json_schema(**kwargs)
+
+    def __repr__(self) -> str:
+        if self._adapter is None:
+            return f"LazyTypeAdapter({self._type!r})"
+
+        return repr(self._adapter)
+
+
+TypeAdapterLike = Union[TypeAdapter, LazyTypeAdapter]
+
+
+class TypeRegistry:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.deferred = 0
+        self.materialized = 0
+        self._adapters: dict[tuple[Any, str], TypeAdapter] = {}
+        self._schemas: dict[tuple[Any, str], dict[str, Any]] = {}
+        self._schema_bytes = 0
+
+    def type_adapter(self, t: Any) -> TypeAdapter:
+        key = self._key(t)
+        if key is None:
+            self.misses += 1
+            return TypeAdapter(t)
+
+        adapter = self._adapters.get(key)
+        if adapter is not None:
+            self.hits += 1
+            return adapter
+
+        self.misses += 1
+        adapter = self._adapters[key] = TypeAdapter(t)
+        return adapter
+
+    def lazy_type_adapter(self, t: Any) -> TypeAdapterLike:
+        """Gets the interned adapter for the type if it has been built, or a
+        LazyTypeAdapter that builds it on first use."""
+        key = self._key(t)
+        if key is not None:
+            adapter = self._adapters.get(key)
+            if adapter is not None:
+                self.hits += 1
+                return adapter
+
+        self.deferred += 1
+        return LazyTypeAdapter(t, self)
+
+    def json_schema(self, t: Any) -> dict[str, Any]:
+        """Gets the JSON schema of the type. The schema is shared and must not be
+        mutated."""
+        key = self._key(t)
+        if key is None:
+            self.misses += 1
+            return TypeAdapter(t).json_schema()
+
+        schema = self._schemas.get(key)
+        if schema is not None:
+            self.hits += 1
+            return schema
+
+        self.misses += 1
+        schema = self._schemas[key] = self.type_adapter(t).json_schema()
+        self._schema_bytes += len(json.dumps(schema))
+        return schema
+
+    def stats(self) -> TypeRegistryStats:
+        """Counts of interned adapters and schemas, lookups, the approximate size
+        of the interned schemas when serialized, and how many lazy adapters were
+        handed out and later built."""
+        return TypeRegistryStats(
+            adapters=len(self._adapters),
+            schemas=len(self._schemas),
+            hits=self.hits,
+            misses=self.misses,
+            schema_bytes=self._schema_bytes,
+            deferred=self.deferred,
+            materialized=self.materialized,
+        )
+
+    def clear(self):
+        self._adapters.clear()
+        self._schemas.clear()
+        self._schema_bytes = 0
+
+    @staticmethod
+    def _key(t: Any) -> tuple[Any, str] | None:
+        try:
+            hash(t)
+        except TypeError:
+            return None
+
+        return (t, repr(t))
+
+
+type_registry = TypeRegistry()
@@ -1,21 +1,22 @@
 import inspect
 from typing import Annotated, Callable
 
-from pydantic import TypeAdapter
 from typing_extensions import get_origin
 
+from smartspace.utils.type_registry import TypeAdapterLike, type_registry
+
 
 def _issubclass(cls, base):
     return inspect.isclass(cls) and issubclass(get_origin(cls) or cls, base)
 
 
-def _get_type_adapter(annotation: type) -> TypeAdapter:
+def _get_type_adapter(annotation: type) -> TypeAdapterLike:
     if get_origin(annotation) is Annotated:
-        return TypeAdapter(annotation.__args__[0])
+        return type_registry.lazy_type_adapter(annotation.__args__[0])
     elif annotation is inspect.Parameter.empty:
-        return TypeAdapter(object)
+        return type_registry.lazy_type_adapter(object)
     else:
-        return TypeAdapter(annotation)
+        return type_registry.lazy_type_adapter(annotation)
 
 
 def get_return_type(callable: Callable):